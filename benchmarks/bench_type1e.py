@@ -0,0 +1,170 @@
+"""Type1E ベンチマーク
+
+フレーム作成・応答変換・PLCSimulator 相手の読み書き往復を計測し、
+ops/s と p50/p95/p99 レイテンシを表示します。
+JSON で結果を保存し、前回結果と比較して性能低下を検出できます。
+
+Usage:
+  python benchmarks/bench_type1e.py                          # 全ケース
+  python benchmarks/bench_type1e.py -k roundtrip             # 名前でケースを絞り込み
+  python benchmarks/bench_type1e.py --json result.json       # 結果を保存
+  python benchmarks/bench_type1e.py --compare baseline.json  # 比較 (低下時は終了コード 1)
+"""
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+
+from pymcprotocol_fxseries import PLCSimulator, Type1E
+from pymcprotocol_fxseries.type1e_frame import _make_binary_frame
+import pymcprotocol_fxseries.type1e_const as const
+
+SEED = 1218
+
+class Case:
+  """ベンチマークケース
+
+  Args:
+    name(str):    ケース名
+    func:         計測対象 (引数なし)
+    inner(int):   1サンプルあたりの実行回数 (短い処理はまとめて計測する)
+  """
+  def __init__(self, name, func, inner=1):
+    self.name = name
+    self.func = func
+    self.inner = inner
+
+def _percentile(sorted_values, pct):
+  index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+  return sorted_values[index]
+
+def measure(case, samples, warmup):
+  """ケースを計測
+
+  Returns:
+    result(dict): ops_per_sec, p50_us, p95_us, p99_us, samples
+  """
+  func, inner = case.func, case.inner
+  for _ in range(warmup):
+    func()
+
+  latencies = []
+  total_start = time.perf_counter_ns()
+  for _ in range(samples):
+    start = time.perf_counter_ns()
+    for _ in range(inner):
+      func()
+    latencies.append((time.perf_counter_ns() - start) / inner)
+  total = time.perf_counter_ns() - total_start
+
+  latencies.sort()
+  return {
+    "ops_per_sec": samples * inner / (total / 1e9),
+    "p50_us": _percentile(latencies, 50) / 1000,
+    "p95_us": _percentile(latencies, 95) / 1000,
+    "p99_us": _percentile(latencies, 99) / 1000,
+    "samples": samples * inner,
+  }
+
+def codec_cases():
+  """フレーム作成・応答変換 (通信なし)"""
+  rng = random.Random(SEED)
+  plc = Type1E()
+  words = {n: [rng.randrange(-32768, 32768) for _ in range(n)] for n in (64, 256)}
+  bits = [rng.randrange(2) for _ in range(256)]
+  word_data = {n: plc._encode_wordunits(v) for n, v in words.items()}
+  bit_data = plc._encode_bitunits(bits)
+
+  cases = [
+    Case("encode/make_send_data", lambda: plc._make_send_data(const.Command.WORD_READ, "D1000", 64), 100),
+    Case("encode/make_send_data_uncached",
+      lambda: _make_binary_frame.__wrapped__(const.Command.WORD_READ, "D1000", 64, plc.pc, plc.watch_timer, 0), 100),
+    Case("encode/bits_256", lambda: plc._encode_bitunits(bits), 100),
+  ]
+  for n in (64, 256):
+    cases.append(Case(f"encode/words_{n}", lambda v=words[n]: plc._encode_wordunits(v), 100))
+    cases.append(Case(f"decode/words_{n}", lambda d=word_data[n], n=n: plc._decode_wordunits(d, n), 100))
+  cases.append(Case("decode/bits_256", lambda: plc._decode_bitunits(bit_data, 256), 100))
+  return cases
+
+def roundtrip_cases(plc):
+  """PLCSimulator 相手の読み書き往復"""
+  rng = random.Random(SEED)
+  cases = []
+  for n in (1, 64, 256, 1024):
+    cases.append(Case(f"roundtrip/read_words_{n}", lambda n=n: plc.batchread_wordunits("D0", n)))
+  for n in (64, 1024):
+    values = [rng.randrange(-32768, 32768) for _ in range(n)]
+    cases.append(Case(f"roundtrip/write_words_{n}", lambda v=values: plc.batchwrite_wordunits("D0", v)))
+  cases.append(Case("roundtrip/read_bits_256", lambda: plc.batchread_bitunits("M0", 256)))
+  values = [rng.randrange(2) for _ in range(256)]
+  cases.append(Case("roundtrip/write_bits_256", lambda: plc.batchwrite_bitunits("M0", values)))
+  return cases
+
+def compare(results, baseline, threshold):
+  """前回結果と比較し、ops/s が threshold(%) 以上低下したケース名を返す"""
+  regressions = []
+  print(f"\n{'case':<32}{'baseline':>14}{'current':>14}{'change':>10}")
+  for name, result in results.items():
+    base = baseline.get("results", {}).get(name)
+    if base is None:
+      continue
+    change = (result["ops_per_sec"] / base["ops_per_sec"] - 1) * 100
+    mark = ""
+    if change <= -threshold:
+      regressions.append(name)
+      mark = "  << regression"
+    print(f"{name:<32}{base['ops_per_sec']:>14.1f}{result['ops_per_sec']:>14.1f}{change:>9.1f}%{mark}")
+  return regressions
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+  parser.add_argument("-k", dest="keyword", default="", help="ケース名に含まれる文字列で絞り込み")
+  parser.add_argument("--samples", type=int, default=200, help="サンプル数 (デフォルト: 200)")
+  parser.add_argument("--warmup", type=int, default=20, help="ウォームアップ回数 (デフォルト: 20)")
+  parser.add_argument("--latency", type=float, default=0.0, help="シミュレータの応答遅延 (秒)")
+  parser.add_argument("--json", dest="json_path", help="結果を JSON で保存")
+  parser.add_argument("--compare", dest="baseline_path", help="比較する前回結果 (JSON)")
+  parser.add_argument("--threshold", type=float, default=10.0, help="性能低下とみなす ops/s の低下率 %% (デフォルト: 10)")
+  args = parser.parse_args(argv)
+
+  results = {}
+  with PLCSimulator(latency=args.latency) as sim, Type1E(*sim.address) as plc:
+    plc.set_chunksize(wordread=const.PointLimit.FRAME_MAX, wordwrite=const.PointLimit.FRAME_MAX)
+    print(f"{'case':<32}{'ops/s':>12}{'p50(us)':>10}{'p95(us)':>10}{'p99(us)':>10}")
+    for case in codec_cases() + roundtrip_cases(plc):
+      if args.keyword not in case.name:
+        continue
+      result = measure(case, args.samples, args.warmup)
+      results[case.name] = result
+      print(f"{case.name:<32}{result['ops_per_sec']:>12.1f}{result['p50_us']:>10.1f}"
+            f"{result['p95_us']:>10.1f}{result['p99_us']:>10.1f}")
+
+  report = {
+    "meta": {
+      "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+      "python": platform.python_version(),
+      "implementation": platform.python_implementation(),
+      "platform": platform.platform(),
+      "samples": args.samples,
+      "warmup": args.warmup,
+      "latency": args.latency,
+      "seed": SEED,
+    },
+    "results": results,
+  }
+  if args.json_path:
+    with open(args.json_path, "w", encoding="utf-8") as f:
+      json.dump(report, f, indent=2)
+
+  if args.baseline_path:
+    with open(args.baseline_path, encoding="utf-8") as f:
+      baseline = json.load(f)
+    if compare(results, baseline, args.threshold):
+      return 1
+  return 0
+
+if __name__ == "__main__":
+  sys.exit(main())
@@ -1,5 +1,22 @@
 
 from pymcprotocol_fxseries.type1e import Type1E
+from pymcprotocol_fxseries.async_type1e import AsyncType1E
+from pymcprotocol_fxseries.read_plan import ReadPlan
+from pymcprotocol_fxseries.scheduler import ScanScheduler
+from pymcprotocol_fxseries.subscription import Subscription
+from pymcprotocol_fxseries.simulator import PLCSimulator
+from pymcprotocol_fxseries.metrics import Metrics, MetricsHook
+from pymcprotocol_fxseries.shared import SharedType1E
+from pymcprotocol_fxseries.parallel import ParallelType1E
+from pymcprotocol_fxseries.poller import MultiPoller
+from pymcprotocol_fxseries.cache import CachedType1E
+from pymcprotocol_fxseries.device_image import DeviceImagePublisher, DeviceImageReader
+from pymcprotocol_fxseries.tags import Tag, TagDatabase
+from pymcprotocol_fxseries.device_address import DeviceAddress, get_address
+from pymcprotocol_fxseries.write_buffer import WriteBuffer
+from pymcprotocol_fxseries.capture import CaptureRecord, FrameCapture, read_capture
+from pymcprotocol_fxseries.historian import Historian
 from pymcprotocol_fxseries.mcprotocol_error import (
   MCProtocolError,
-  UnsupportedComandError )
+  UnsupportedComandError,
+  VerifyError )
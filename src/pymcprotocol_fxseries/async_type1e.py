@@ -0,0 +1,208 @@
+import asyncio
+from typing import Literal
+
+from pymcprotocol_fxseries.datatype import WordOrder
+from pymcprotocol_fxseries.type1e_frame import Type1EFrame, WordOutput, BitOutput
+
+class AsyncType1E(Type1EFrame):
+  """ PLC FXシリーズ 通信用モジュール (asyncio版)
+
+  asyncio のストリームで通信します。送信データ作成・応答解析・分割送信の手順は
+  Type1E と共通 (Type1EFrame) です。
+
+  Public:
+    - connect / close:      接続 / 切断 (await)
+    - set_commtype          通信方式
+    - set_accessopt:        オプション設定
+    - set_chunksize:        1フレームあたりの点数上限設定
+    - batchread_wordunits:  ワード読み込み (await)
+    - batchread_bitunits:   ビット読み込み (await)
+    - batchwrite_wordunits: ワード書き込み (await)
+    - batchwrite_bitunits:  ビット書き込み (await)
+    - batchread_typed / batchwrite_typed:   型指定読み書き (await)
+    - batchread_string / batchwrite_string: 文字列読み書き (await)
+
+  Example:
+    async with AsyncType1E("192.168.0.10", 5000) as plc:
+      values = await plc.batchread_wordunits("D1000", 10)
+  """
+
+  def __init__(self
+    , ip: str=None
+    , port: int=None
+    , timeout: float=2
+
+    , commtype: Literal["binary", "ascii"]=None
+  ):
+    super().__init__(commtype)
+
+    # -- 接続ポート --
+    self.soc_ip = ip
+    self.soc_port = port
+    self.soc_timeout = timeout
+
+    self.reader = None
+    self.writer = None
+    # 1フレームの送受信を他のタスクと混在させないためのロック
+    self._lock = asyncio.Lock()
+
+  # *** (public) 接続 ***
+
+  async def connect(self, ip: str=None, port: int=None, timeout: float=None):
+    """PLCに接続します。
+
+    指定がなければ、インスタンス生成時に設定した `soc_ip` と `soc_port` を使用します。
+    既に接続済みの場合は、自動的に既存接続を閉じて再接続します。
+
+    Args:
+      ip (str, optional): 接続先PLCのIPv4アドレス。
+      port (int, optional): 接続先PLCのポート番号。
+      timeout (float, optional): 通信タイムアウト（秒）。指定した場合はインスタンス設定値を更新。
+
+    Raises:
+      ValueError: IPまたはポートが指定されていない場合。
+      ConnectionError: TCP接続に失敗した場合。
+    """
+    ip = ip or self.soc_ip
+    port = port or self.soc_port
+    if timeout is not None:
+      self.soc_timeout = timeout
+
+    if ip is None or port is None:
+      raise ValueError("IP or port is missing")
+
+    if self.writer:
+      await self.close()
+
+    try:
+      self.reader, self.writer = await asyncio.wait_for(
+        asyncio.open_connection(ip, port), self.soc_timeout)
+    except (OSError, asyncio.TimeoutError) as e:
+      self.reader = self.writer = None
+      raise ConnectionError(f"Connection failed ({ip}:{port}): {e!r}")
+
+  async def close(self):
+    """PLCとの通信切断
+    """
+    if self.writer:
+      writer = self.writer
+      self.reader = self.writer = None
+      try:
+        writer.close()
+        await writer.wait_closed()
+      except Exception:
+        pass
+
+  async def __aenter__(self):
+    await self.connect()
+    return self
+
+  async def __aexit__(self, exc_type, exc_value, traceback):
+    await self.close()
+
+  # *** (private) ストリーム ***
+
+  async def _request(self, send_data:bytes, command:int, size:int):
+    """1フレーム送受信し、応答データ部を返す
+
+    タイムアウト時は送受信の対応が崩れるため、接続を閉じてから TimeoutError を送出します。
+
+    Args:
+      send_data(bytes): 送信データ
+      command(int):     サブヘッダ番号
+      size(int):        デバイス点数
+
+    Returns:
+      answer_data(bytes): 応答データ (サブヘッダ・終了コードを除く)
+    """
+    async with self._lock:
+      if not self.writer:
+        raise ConnectionError("Socket is not connected. Please use connect method")
+
+      self._log_send_data(send_data)
+      try:
+        recv_data = await asyncio.wait_for(
+          self._exchange(send_data, command, size), self.soc_timeout)
+      except asyncio.TimeoutError:
+        await self.close()
+        raise TimeoutError(f"No response within {self.soc_timeout} sec") from None
+      except (OSError, asyncio.IncompleteReadError) as e:
+        await self.close()
+        raise ConnectionError(f"Connection lost: {e!r}") from None
+
+    self._check_cmd_answer(recv_data)
+    return recv_data[self._get_answerdata_index():]
+
+  async def _exchange(self, send_data:bytes, command:int, size:int):
+    """送信し、1フレーム分の応答を受信"""
+    self.writer.write(send_data)
+    await self.writer.drain()
+
+    index = self._get_answerdata_index()
+    recv_data = await self.reader.readexactly(index)
+    remain_size = self._get_remain_size(recv_data, command, size)
+    if remain_size:
+      recv_data += await self.reader.readexactly(remain_size)
+    return recv_data
+
+  async def _run(self, procedure):
+    """送受信手順 (Type1EFrame._proc_*) を実行
+
+    Args:
+      procedure(generator): 送受信手順
+
+    Returns:
+      手順の戻り値
+    """
+    try:
+      request = next(procedure)
+      while True:
+        request = procedure.send(await self._request(*request))
+    except StopIteration as e:
+      return e.value
+
+  # *** (public) PLC通信 ***
+
+  async def batchread_wordunits(self, headdevice:str, readsize: int
+    , output: WordOutput="list", signed: bool=True
+  ) -> list[int]:
+    """ワード単位読み込み (Type1E.batchread_wordunits 参照)"""
+    return await self._run(self._proc_batchread_wordunits(headdevice, readsize, output, signed))
+
+  async def batchread_bitunits(self, headdevice:str, readsize: int
+    , output: BitOutput="list"
+  ) -> list[int]:
+    """ビット単位読み込み (Type1E.batchread_bitunits 参照)"""
+    return await self._run(self._proc_batchread_bitunits(headdevice, readsize, output))
+
+  async def batchwrite_wordunits(self, headdevice: str, values: list[int]):
+    """ワード単位書き込み (Type1E.batchwrite_wordunits 参照)"""
+    return await self._run(self._proc_batchwrite_wordunits(headdevice, values))
+
+  async def batchwrite_bitunits(self, headdevice: str, values: list[int]):
+    """ビット単位書き込み (Type1E.batchwrite_bitunits 参照)"""
+    return await self._run(self._proc_batchwrite_bitunits(headdevice, values))
+
+  async def batchread_typed(self, headdevice:str, count: int, dtype: str
+    , wordorder: WordOrder="little"
+  ) -> list:
+    """型指定読み込み (Type1E.batchread_typed 参照)"""
+    return await self._run(self._proc_batchread_typed(headdevice, count, dtype, wordorder))
+
+  async def batchwrite_typed(self, headdevice:str, values: list, dtype: str
+    , wordorder: WordOrder="little"
+  ):
+    """型指定書き込み (Type1E.batchwrite_typed 参照)"""
+    return await self._run(self._proc_batchwrite_typed(headdevice, values, dtype, wordorder))
+
+  async def batchread_string(self, headdevice:str, length: int, encoding: str="ascii") -> str:
+    """文字列読み込み (Type1E.batchread_string 参照)"""
+    return await self._run(self._proc_batchread_string(headdevice, length, encoding))
+
+  async def batchwrite_string(self, headdevice:str, text: str, encoding: str="ascii"):
+    """文字列書き込み (Type1E.batchwrite_string 参照)"""
+    return await self._run(self._proc_batchwrite_string(headdevice, text, encoding))
+
+  async def download_recipe(self, headdevice:str, values, gap: int=16, verify: bool=False) -> dict:
+    """レシピの差分書き込み (Type1E.download_recipe 参照)"""
+    return await self._run(self._proc_download_recipe(headdevice, values, gap, verify))
@@ -0,0 +1,222 @@
+"""読み込みキャッシュ
+
+Type1E の前段に置き、読み込んだデバイス範囲の受信データを TTL の間保持します。
+
+  - 要求範囲がキャッシュ済みブロックに含まれていれば通信せずに返す (部分範囲も可)
+  - TTL はデフォルト値のほか、デバイス種類・デバイス範囲ごとに設定可能
+  - 同じクライアント経由の書き込みは、重なる範囲のキャッシュを無効化
+  - ヒット / ミス / 無効化の件数を集計
+
+Example:
+  cache = CachedType1E(plc, ttl=0.05)
+  cache.set_ttl("M", 0.01)           # デバイス種類ごと
+  cache.set_ttl(("D100", 50), 1.0)    # デバイス範囲ごと (0 の場合はキャッシュしない)
+  cache.batchread_wordunits("D0", 100)
+  cache.batchread_wordunits("D10", 5)   # キャッシュから返す
+"""
+import threading
+import time
+
+from pymcprotocol_fxseries import datatype
+from pymcprotocol_fxseries.type1e_frame import pack_nibbles, unpack_nibbles
+from pymcprotocol_fxseries.utility import parse_device
+import pymcprotocol_fxseries.type1e_const as const
+
+class _CacheBlock:
+  """キャッシュ済みブロック
+
+  Attributes:
+    num(int):      先頭デバイス番号
+    end(int):      最終デバイス番号 + 1
+    step(int):     1点あたりのデバイス番号の増分
+    data(bytes):   受信データ (ワード: 2byte/点, ビット: 1byte/点)
+    stored(float): 読み込み時刻 (time.monotonic())
+  """
+  __slots__ = ("num", "end", "step", "data", "stored")
+
+  def __init__(self, num, end, step, data, stored):
+    self.num = num
+    self.end = end
+    self.step = step
+    self.data = data
+    self.stored = stored
+
+class CachedType1E:
+  """読み込みキャッシュ付きクライアント
+
+  Args:
+    plc(Type1E):  接続済みクライアント
+    ttl(float):   デフォルトの TTL (秒)
+    max_blocks(int): デバイス種類・コマンドごとに保持するブロック数の上限
+
+  Attributes:
+    hits(int):          キャッシュから返した読み込み数
+    misses(int):        PLC から読み込んだ数
+    invalidations(int): 書き込みで無効化したブロック数
+  """
+
+  def __init__(self, plc, ttl:float=0.1, max_blocks:int=64):
+    self.plc = plc
+    self.ttl = ttl
+    self.max_blocks = max_blocks
+
+    # デバイス種類 -> TTL / [(デバイス種類, 先頭デバイス番号, 最終デバイス番号 + 1, TTL)]
+    self._type_ttls = {}
+    self._range_ttls = []
+    # (コマンド, デバイス種類) -> [_CacheBlock]
+    self._blocks = {}
+    self._lock = threading.RLock()
+
+    self.hits = 0
+    self.misses = 0
+    self.invalidations = 0
+
+  # *** (public) 設定・集計 ***
+
+  def set_ttl(self, target, ttl:float):
+    """TTL 設定
+
+    Args:
+      target: デバイス種類 (ex: "D") もしくは (先頭デバイス, 点数) (ex: ("D100", 50))
+      ttl(float): TTL (秒)。0 の場合はキャッシュしない
+    """
+    if ttl < 0:
+      raise ValueError("ttl must be 0 or more")
+    if isinstance(target, str):
+      const.DeviceConstants.get_binary_devicecode(target)
+      self._type_ttls[target] = ttl
+      return
+    headdevice, size = target
+    devicetype, num = parse_device(headdevice)
+    self._range_ttls.append((devicetype, num, num + size, ttl))
+
+  def get_ttl(self, devicetype:str, num:int, end:int) -> float:
+    """範囲に適用する TTL (範囲指定 > デバイス種類 > デフォルト。範囲指定は後から設定したものを優先)"""
+    for range_type, head, tail, ttl in reversed(self._range_ttls):
+      if range_type == devicetype and head < end and num < tail:
+        return ttl
+    return self._type_ttls.get(devicetype, self.ttl)
+
+  def clear(self):
+    """キャッシュを全て破棄"""
+    with self._lock:
+      self._blocks.clear()
+
+  def stats(self):
+    """集計値
+
+    Returns:
+      (dict): hits, misses, invalidations, hit_ratio, blocks
+    """
+    total = self.hits + self.misses
+    return {
+      "hits": self.hits,
+      "misses": self.misses,
+      "invalidations": self.invalidations,
+      "hit_ratio": self.hits / total if total else 0.0,
+      "blocks": sum(len(blocks) for blocks in self._blocks.values()),
+    }
+
+  # *** (private) キャッシュ ***
+
+  def _read(self, command:int, headdevice:str, size:int):
+    """受信データ (ワード: 2byte/点, ビット: 1byte/点) をキャッシュ経由で取得"""
+    devicetype, num = parse_device(headdevice)
+    step = self.plc._device_step(headdevice, command)
+    end = num + size * step
+    width = 2 if command == const.Command.WORD_READ else 1
+    ttl = self.get_ttl(devicetype, num, end)
+
+    key = (command, devicetype)
+    with self._lock:
+      if ttl > 0:
+        now = time.monotonic()
+        for block in self._blocks.get(key, ()):
+          if block.num <= num and end <= block.end and (num - block.num) % block.step == 0 \
+              and block.step == step and now - block.stored <= ttl:
+            self.hits += 1
+            offset = (num - block.num) // step * width
+            return block.data[offset:offset + size * width]
+
+      self.misses += 1
+      recv_buf = self.plc._run(self.plc._proc_batchread(command, headdevice, size))
+      data = bytes(recv_buf) if width == 2 else bytes(unpack_nibbles(recv_buf, size))
+      if ttl > 0:
+        self._store(key, _CacheBlock(num, end, step, data, time.monotonic()))
+      return data
+
+  def _store(self, key, new_block:_CacheBlock):
+    # 新しいブロックに含まれる古いブロックは不要
+    blocks = [block for block in self._blocks.get(key, ())
+              if not (new_block.num <= block.num and block.end <= new_block.end)]
+    blocks.insert(0, new_block)
+    del blocks[self.max_blocks:]
+    self._blocks[key] = blocks
+
+  def _invalidate(self, headdevice:str, size:int, command:int):
+    """書き込み範囲と重なるブロックを破棄"""
+    devicetype, num = parse_device(headdevice)
+    end = num + size * self.plc._device_step(headdevice, command)
+    with self._lock:
+      for key, blocks in self._blocks.items():
+        if key[1] != devicetype:
+          continue
+        kept = [block for block in blocks if block.end <= num or end <= block.num]
+        self.invalidations += len(blocks) - len(kept)
+        self._blocks[key] = kept
+
+  # *** (public) 読み込み ***
+
+  def batchread_wordunits(self, headdevice:str, readsize:int, output:str="list", signed:bool=True):
+    """ワード単位読み込み (Type1E.batchread_wordunits 参照)"""
+    data = self._read(const.Command.WORD_READ, headdevice, readsize)
+    return self.plc._decode_wordunits(data, readsize, output, signed)
+
+  def batchread_bitunits(self, headdevice:str, readsize:int, output:str="list"):
+    """ビット単位読み込み (Type1E.batchread_bitunits 参照)"""
+    data = self._read(const.Command.BIT_READ, headdevice, readsize)
+    return self.plc._decode_bitunits(pack_nibbles(data), readsize, output)
+
+  def batchread_typed(self, headdevice:str, count:int, dtype:str, wordorder:str="little"):
+    """型指定読み込み (Type1E.batchread_typed 参照)"""
+    data = self._read(const.Command.WORD_READ, headdevice, count * datatype.get_wordcount(dtype))
+    return datatype.decode_words(data, dtype, count, wordorder)
+
+  def batchread_string(self, headdevice:str, length:int, encoding:str="ascii"):
+    """文字列読み込み (Type1E.batchread_string 参照)"""
+    data = self._read(const.Command.WORD_READ, headdevice, (length + 1) // 2)
+    return datatype.decode_string(data[:length], encoding)
+
+  # *** (public) 書き込み ***
+
+  def batchwrite_wordunits(self, headdevice:str, values):
+    """ワード単位書き込み (重なるキャッシュを無効化)"""
+    size = len(self.plc._encode_wordunits(values)) // 2
+    try:
+      return self.plc.batchwrite_wordunits(headdevice, values)
+    finally:
+      # 分割書き込みの途中で失敗した場合も無効化する
+      self._invalidate(headdevice, size, const.Command.WORD_WRITE)
+
+  def batchwrite_bitunits(self, headdevice:str, values):
+    """ビット単位書き込み (重なるキャッシュを無効化)"""
+    try:
+      return self.plc.batchwrite_bitunits(headdevice, values)
+    finally:
+      self._invalidate(headdevice, len(values), const.Command.BIT_WRITE)
+
+  def batchwrite_typed(self, headdevice:str, values:list, dtype:str, wordorder:str="little"):
+    """型指定書き込み (重なるキャッシュを無効化)"""
+    size = len(values) * datatype.get_wordcount(dtype)
+    try:
+      return self.plc.batchwrite_typed(headdevice, values, dtype, wordorder)
+    finally:
+      self._invalidate(headdevice, size, const.Command.WORD_WRITE)
+
+  def batchwrite_string(self, headdevice:str, text:str, encoding:str="ascii"):
+    """文字列書き込み (重なるキャッシュを無効化)"""
+    size = len(datatype.encode_string(text, encoding)) // 2
+    try:
+      return self.plc.batchwrite_string(headdevice, text, encoding)
+    finally:
+      self._invalidate(headdevice, size, const.Command.WORD_WRITE)
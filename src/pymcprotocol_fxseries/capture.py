@@ -0,0 +1,142 @@
+"""フレームキャプチャ
+
+Type1E の送受信フレーム (リクエスト・応答の組) を時刻付きで追記専用のバイナリファイルに記録します。
+記録したファイルは read_capture() で読み出し、ReplayServer (replay.py) で再生できます。
+
+ファイル形式 (リトルエンディアン):
+  ファイルヘッダ [magic "FXCP"(4)] [version(2)] [予約(2)]
+  レコード       [レコード長(4)] [送信時刻 time.time()(8)] [応答時間 us(4)] [リクエスト長(2)]
+                 [リクエストフレーム] [応答フレーム]
+  レコード長は レコード長フィールドを除くバイト数。
+  書き込み途中で終了した末尾の不完全なレコードは読み出し時に無視します。
+
+Example:
+  with FrameCapture("traffic.fxcap") as capture:
+    plc.set_capture(capture)
+    plc.batchread_wordunits("D0", 10)
+
+  for record in read_capture("traffic.fxcap"):
+    print(record.timestamp, record.request.hex(), record.response.hex())
+"""
+import struct
+import threading
+
+MAGIC = b"FXCP"
+VERSION = 1
+
+_FILE_HEADER = struct.Struct("<4sHxx")
+_RECORD_HEADER = struct.Struct("<IdIH")
+_LENGTH = struct.Struct("<I")
+
+class CaptureRecord:
+  """キャプチャレコード
+
+  Attributes:
+    timestamp(float): 送信時刻 (time.time())
+    rtt(float):       送信から応答受信までの時間 (秒)
+    request(bytes):   リクエストフレーム
+    response(bytes):  応答フレーム
+  """
+  __slots__ = ("timestamp", "rtt", "request", "response")
+
+  def __init__(self, timestamp:float, rtt:float, request:bytes, response:bytes):
+    self.timestamp = timestamp
+    self.rtt = rtt
+    self.request = request
+    self.response = response
+
+  def __repr__(self):
+    return f"CaptureRecord({self.timestamp:.6f}, rtt={self.rtt * 1e3:.3f}ms, " \
+      f"request={self.request.hex()}, response={len(self.response)} bytes)"
+
+class FrameCapture:
+  """フレームキャプチャ (追記専用ファイル)
+
+  記録はバッファ付きの追記のみで、送受信ごとのコストは struct.pack と write 1回です。
+
+  Args:
+    path(str):      ファイルパス (既存のファイルには追記)
+    buffering(int): 書き込みバッファのバイト数 (-1 の場合はデフォルト)
+
+  Attributes:
+    records(int):   このインスタンスで記録したレコード数
+  """
+
+  def __init__(self, path, buffering:int=-1):
+    self.path = path
+    self.records = 0
+    self._lock = threading.Lock()
+    self._file = open(path, "ab", buffering=buffering)
+    if self._file.tell() == 0:
+      self._file.write(_FILE_HEADER.pack(MAGIC, VERSION))
+
+  def record(self, timestamp:float, rtt:float, request, response):
+    """リクエスト・応答の組を記録
+
+    Args:
+      timestamp(float): 送信時刻 (time.time())
+      rtt(float):       応答時間 (秒)
+      request(bytes):   リクエストフレーム
+      response(bytes):  応答フレーム
+    """
+    header = _RECORD_HEADER.pack(
+      _RECORD_HEADER.size - _LENGTH.size + len(request) + len(response),
+      timestamp, min(int(rtt * 1e6), 0xFFFFFFFF), len(request))
+    with self._lock:
+      if self._file is None:
+        return
+      self._file.write(b"".join((header, request, response)))
+      self.records += 1
+
+  def flush(self):
+    """バッファをファイルへ書き出す"""
+    with self._lock:
+      if self._file is not None:
+        self._file.flush()
+
+  def close(self):
+    with self._lock:
+      if self._file is not None:
+        self._file.close()
+        self._file = None
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    self.close()
+
+def read_capture(path):
+  """キャプチャファイルを読み出す
+
+  Args:
+    path(str): ファイルパス
+
+  Yields:
+    record(CaptureRecord): レコード (記録順)
+
+  Raises:
+    ValueError: キャプチャファイルでない場合。
+  """
+  with open(path, "rb") as f:
+    header = f.read(_FILE_HEADER.size)
+    if len(header) < _FILE_HEADER.size:
+      return
+    magic, version = _FILE_HEADER.unpack(header)
+    if magic != MAGIC or version != VERSION:
+      raise ValueError(f"Not a frame capture file: {path}")
+
+    body_size = _RECORD_HEADER.size - _LENGTH.size
+    while True:
+      prefix = f.read(_LENGTH.size)
+      if len(prefix) < _LENGTH.size:
+        return
+      (length,) = _LENGTH.unpack(prefix)
+      body = f.read(length)
+      if len(body) < length or length < body_size:
+        # 書き込み途中のレコード
+        return
+      _, timestamp, rtt_us, request_size = _RECORD_HEADER.unpack(prefix + body[:body_size])
+      request = body[body_size:body_size + request_size]
+      response = body[body_size + request_size:]
+      yield CaptureRecord(timestamp, rtt_us / 1e6, request, response)
@@ -0,0 +1,165 @@
+"""複数ワードにまたがるデータ型の変換
+
+D/R レジスタに格納された 32bit整数・実数・BCD・文字列を、
+ワード列 (リトルエンディアン) と相互変換します。
+数値型は struct の書式を型・点数ごとにキャッシュし、1回の pack/unpack で変換します。
+
+ワード順 (wordorder):
+  - "little": 下位ワードが若番 (FX シリーズの DINT / REAL の格納順)
+  - "big":    上位ワードが若番
+"""
+from functools import lru_cache
+import struct
+from typing import Literal
+
+WordOrder = Literal["little", "big"]
+
+#          型名:     (struct書式, 1値あたりのワード数)
+DATATYPES = {
+  "int16":   ("h", 1),
+  "uint16":  ("H", 1),
+  "int32":   ("i", 2),
+  "uint32":  ("I", 2),
+  "float32": ("f", 2),
+  "float64": ("d", 4),
+  "bcd16":   ("H", 1),  # 4桁BCD
+  "bcd32":   ("I", 2),  # 8桁BCD
+}
+
+# BCD 1バイト (2桁) -> 0~99 (BCDとして不正な値は -1)
+_BCD_DECODE = tuple(
+  (b >> 4) * 10 + (b & 0x0F) if (b >> 4) <= 9 and (b & 0x0F) <= 9 else -1
+  for b in range(256)
+)
+# 0~99 -> BCD 1バイト
+_BCD_ENCODE = bytes(((v // 10) << 4) | (v % 10) for v in range(100))
+
+def get_wordcount(dtype:str) -> int:
+  """1値あたりのワード数
+
+  Raises:
+    ValueError: 未対応の型の場合。
+  """
+  try:
+    return DATATYPES[dtype][1]
+  except KeyError:
+    raise ValueError(f"dtype must be one of {', '.join(DATATYPES)}: {dtype!r}")
+
+@lru_cache(maxsize=256)
+def get_struct(dtype:str, count:int) -> struct.Struct:
+  """型・点数ごとの struct (キャッシュ)"""
+  get_wordcount(dtype)
+  return struct.Struct(f"<{count}{DATATYPES[dtype][0]}")
+
+def _check_wordorder(wordorder:str):
+  if wordorder not in ("little", "big"):
+    raise ValueError(f"wordorder must be 'little' or 'big': {wordorder!r}")
+
+def swap_words(data, wordcount:int) -> bytearray:
+  """値ごとにワード順を反転 (スライス代入による一括処理)
+
+  Args:
+    data(bytes):    ワード列
+    wordcount(int): 1値あたりのワード数
+
+  Returns:
+    swapped(bytearray): ワード順を反転したワード列
+  """
+  swapped = bytearray(len(data))
+  step = wordcount * 2
+  for i in range(wordcount):
+    src = (wordcount - 1 - i) * 2
+    dst = i * 2
+    swapped[dst::step] = data[src::step]
+    swapped[dst+1::step] = data[src+1::step]
+  return swapped
+
+def _decode_bcd(values, dtype:str):
+  nbytes = DATATYPES[dtype][1] * 2
+  result = []
+  for value in values:
+    decoded = 0
+    for byte in value.to_bytes(nbytes, "big"):
+      digits = _BCD_DECODE[byte]
+      if digits < 0:
+        raise ValueError(f"Invalid BCD value: 0x{value:0{nbytes*2}X}")
+      decoded = decoded * 100 + digits
+    result.append(decoded)
+  return result
+
+def _encode_bcd(values, dtype:str):
+  nbytes = DATATYPES[dtype][1] * 2
+  limit = 10 ** (nbytes * 2)
+  result = []
+  for value in values:
+    if not 0 <= value < limit:
+      raise ValueError(f"BCD value must be 0 <= value < {limit}: {value}")
+    encoded = bytearray(nbytes)
+    for i in range(nbytes - 1, -1, -1):
+      value, encoded[i] = value // 100, _BCD_ENCODE[value % 100]
+    result.append(int.from_bytes(encoded, "big"))
+  return result
+
+def decode_words(data, dtype:str, count:int, wordorder:WordOrder="little") -> list:
+  """ワード列 -> 値リスト
+
+  Args:
+    data(bytes):     ワード列 (リトルエンディアン)
+    dtype(str):      型名 (DATATYPES 参照)
+    count(int):      値の数
+    wordorder(str):  ワード順 ("little" もしくは "big")
+
+  Returns:
+    values(list): 値リスト
+  """
+  wordcount = get_wordcount(dtype)
+  _check_wordorder(wordorder)
+  data = memoryview(data)[:count * wordcount * 2]
+  if wordcount > 1 and wordorder == "big":
+    data = swap_words(data, wordcount)
+
+  values = list(get_struct(dtype, count).unpack(data))
+  if dtype.startswith("bcd"):
+    values = _decode_bcd(values, dtype)
+  return values
+
+def encode_words(values, dtype:str, wordorder:WordOrder="little") -> bytes:
+  """値リスト -> ワード列 (リトルエンディアン)
+
+  Args:
+    values(list):    値リスト
+    dtype(str):      型名 (DATATYPES 参照)
+    wordorder(str):  ワード順 ("little" もしくは "big")
+
+  Returns:
+    data(bytes): ワード列
+  """
+  wordcount = get_wordcount(dtype)
+  _check_wordorder(wordorder)
+  if dtype.startswith("bcd"):
+    values = _encode_bcd(values, dtype)
+
+  try:
+    data = get_struct(dtype, len(values)).pack(*values)
+  except (struct.error, OverflowError) as e:
+    # float32 の範囲外は OverflowError
+    raise ValueError(f"Exceeeded {dtype} value range: {e}")
+
+  if wordcount > 1 and wordorder == "big":
+    return bytes(swap_words(data, wordcount))
+  return data
+
+def decode_string(data, encoding:str="ascii") -> str:
+  """ワード列 -> 文字列 (1ワードに2文字、下位バイトが先。NUL 以降は切り捨て)"""
+  raw = bytes(data)
+  end = raw.find(b"\x00")
+  if end >= 0:
+    raw = raw[:end]
+  return raw.decode(encoding)
+
+def encode_string(text:str, encoding:str="ascii") -> bytes:
+  """文字列 -> ワード列 (奇数バイトの場合は NUL で埋める)"""
+  raw = text.encode(encoding)
+  if len(raw) % 2 != 0:
+    raw += b"\x00"
+  return raw
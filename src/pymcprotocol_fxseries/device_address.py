@@ -0,0 +1,98 @@
+"""デバイスアドレス
+
+デバイス名の解析結果と、フレームに埋め込むデバイス部 (バイナリ) を保持します。
+同じデバイス名は get_address() でキャッシュした同一オブジェクトを返すため、
+スキャンを繰り返す場合もデバイス名の解析・エンコードは初回のみです。
+
+X/Y のデバイス番号は8進で扱います (ex: "X17" -> 15, "Y100" -> 64)。
+
+Example:
+  address = get_address("X17")
+  address.number          # -> 15
+  address.offset(1).name  # -> "X20"
+  plc.batchread_bitunits(address, 8)
+"""
+from functools import lru_cache
+
+from pymcprotocol_fxseries.utility import format_device, parse_device
+import pymcprotocol_fxseries.type1e_const as const
+
+class DeviceAddress:
+  """デバイスアドレス
+
+  Args:
+    devicetype(str): デバイス種類
+    number(int):     デバイス番号 (X/Y は8進を変換した値)
+
+  Attributes:
+    devicetype(str): デバイス種類
+    number(int):     デバイス番号
+    code(int):       バイナリのデバイスコード
+    is_bit(bool):    ビットデバイスなら True
+    binary(bytes):   フレームのデバイス部 [先頭デバイス番号(4)] [デバイスコード(2)]
+
+  Raises:
+    DeviceCodeError: 未対応のデバイス種類の場合。
+    ValueError:      デバイス番号が範囲外の場合。
+  """
+  __slots__ = ("devicetype", "number", "code", "is_bit", "binary")
+
+  def __init__(self, devicetype:str, number:int):
+    if number < 0:
+      raise ValueError(f"Invalid device number, {devicetype}{number}")
+    self.devicetype = devicetype
+    self.number = number
+    self.code = const.DeviceConstants.get_binary_devicecode(devicetype)
+    self.is_bit = const.DeviceConstants.is_bit_device(devicetype)
+    self.binary = number.to_bytes(4, "little") + self.code.to_bytes(2, "little")
+
+  @classmethod
+  def parse(cls, device:str) -> "DeviceAddress":
+    """デバイス名から作成 (キャッシュなし。通常は get_address() を使用)"""
+    return cls(*parse_device(device))
+
+  @property
+  def name(self) -> str:
+    """デバイス名 (ex: "D100", "X17")"""
+    return format_device(self.devicetype, self.number)
+
+  def offset(self, points:int) -> "DeviceAddress":
+    """デバイス番号を points 進めたアドレス"""
+    if points == 0:
+      return self
+    return _offset_address(self.devicetype, self.number + points)
+
+  def __eq__(self, other):
+    if not isinstance(other, DeviceAddress):
+      return NotImplemented
+    return self.devicetype == other.devicetype and self.number == other.number
+
+  def __hash__(self):
+    return hash((self.devicetype, self.number))
+
+  def __str__(self):
+    return self.name
+
+  def __repr__(self):
+    return f"DeviceAddress({self.name})"
+
+@lru_cache(maxsize=4096)
+def _offset_address(devicetype:str, number:int) -> DeviceAddress:
+  return DeviceAddress(devicetype, number)
+
+@lru_cache(maxsize=4096)
+def _get_address(device:str) -> DeviceAddress:
+  return _offset_address(*parse_device(device))
+
+def get_address(device) -> DeviceAddress:
+  """デバイス名 (もしくは DeviceAddress) から DeviceAddress を取得 (キャッシュ)
+
+  Args:
+    device(str | DeviceAddress): デバイス名 (ex: "D100")
+
+  Returns:
+    address(DeviceAddress): デバイスアドレス
+  """
+  if isinstance(device, DeviceAddress):
+    return device
+  return _get_address(device)
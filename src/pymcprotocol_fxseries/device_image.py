@@ -0,0 +1,330 @@
+"""共有メモリのデバイスイメージ
+
+パブリッシャが Type1E で指定範囲を周期的に読み込み、multiprocessing.shared_memory に書き込みます。
+別プロセスのリーダーは、通信もコピーもせずにデバイス範囲の memoryview を取得できます。
+
+共有メモリの構成 (リトルエンディアン):
+  ヘッダ   [magic "FXDI"(4)] [version(2)] [範囲数(2)] [シーケンス番号(8)] [更新時刻 time.time()(8)]
+  範囲表   [デバイス種類(4)] [種別 0:ワード 1:ビット(1)] [予約(3)] [先頭番号(4)] [点数(4)] [データ位置(4)] x 範囲数
+  データ   ワード: 2byte/点 (実行環境のバイト順), ビット: 1byte/点 (0 or 1)
+
+シーケンス番号は seqlock として使用します (書き込み中は奇数)。
+リーダーは begin() で取得した番号が validate() で変わっていなければ、その間に読んだ値が一貫しています。
+
+Example:
+  # パブリッシャ (PLC に接続するプロセス)
+  publisher = DeviceImagePublisher(plc, [("D0", 1000), ("M0", 512)], name="line1", period=0.1)
+  publisher.start()
+
+  # リーダー (別プロセス)
+  reader = DeviceImageReader("line1")
+  while True:
+    seq = reader.begin()
+    values = reader.view("D100", 10)   # memoryview ('H')
+    total = sum(values)
+    if reader.validate(seq):
+      break
+  del values
+  reader.close()
+"""
+from array import array
+from multiprocessing import shared_memory
+import struct
+import sys
+import threading
+import time
+
+from pymcprotocol_fxseries.type1e_frame import unpack_nibbles
+from pymcprotocol_fxseries.utility import format_device, parse_device
+import pymcprotocol_fxseries.type1e_const as const
+
+MAGIC = b"FXDI"
+VERSION = 1
+
+_HEADER = struct.Struct("<4sHHQd")
+_RANGE = struct.Struct("<4sBxxxIII")
+_SEQ = struct.Struct("<Q")
+_SEQ_OFFSET = 8
+_TIME_OFFSET = 16
+
+_WORD = 0
+_BIT = 1
+
+# このプロセスで作成した共有メモリ名 (リーダーが resource_tracker の登録を解除しないようにする)
+_created_names = set()
+
+class ImageRange:
+  """デバイスイメージ上の範囲
+
+  Attributes:
+    devicetype(str): デバイス種類
+    head(int):       先頭デバイス番号
+    size(int):       点数
+    kind(int):       0: ワード, 1: ビット
+    offset(int):     データ位置 (共有メモリ先頭からのバイト数)
+  """
+  __slots__ = ("devicetype", "head", "size", "kind", "offset")
+
+  def __init__(self, devicetype:str, head:int, size:int, kind:int, offset:int=0):
+    self.devicetype = devicetype
+    self.head = head
+    self.size = size
+    self.kind = kind
+    self.offset = offset
+
+  @property
+  def width(self):
+    """1点あたりのバイト数"""
+    return 2 if self.kind == _WORD else 1
+
+  @property
+  def nbytes(self):
+    return self.size * self.width
+
+  def __repr__(self):
+    return f"ImageRange({format_device(self.devicetype, self.head)}, size={self.size})"
+
+def _layout(ranges):
+  """範囲表とデータ位置を決め、共有メモリのサイズを返す"""
+  position = _HEADER.size + _RANGE.size * len(ranges)
+  for image_range in ranges:
+    # ワードは memoryview.cast できるよう 8 バイト境界に揃える
+    position = (position + 7) & ~7
+    image_range.offset = position
+    position += image_range.nbytes
+  return max(position, 1)
+
+class DeviceImagePublisher:
+  """デバイスイメージのパブリッシャ
+
+  Args:
+    plc(Type1E):     接続済みクライアント
+    ranges(list):    (先頭デバイス, 点数) のリスト。ビットデバイスはビット単位、それ以外はワード単位で読み込む
+    name(str):       共有メモリ名 (None の場合は自動で決める。リーダーには publisher.name を渡す)
+    period(float):   start() での読み込み周期 (秒)
+
+  Attributes:
+    ranges(list[ImageRange]): 範囲
+    updates(int):    更新回数
+    errors(int):     読み込みエラー回数
+    last_error(Exception): 最後の読み込みエラー
+  """
+
+  def __init__(self, plc, ranges:list, name:str=None, period:float=0.1):
+    self.plc = plc
+    self.period = period
+    self.ranges = []
+    for headdevice, size in ranges:
+      devicetype, head = parse_device(headdevice)
+      const.DeviceConstants.get_binary_devicecode(devicetype)
+      kind = _BIT if const.DeviceConstants.is_bit_device(devicetype) else _WORD
+      self.ranges.append(ImageRange(devicetype, head, size, kind))
+
+    self._shm = shared_memory.SharedMemory(name=name, create=True, size=_layout(self.ranges))
+    _created_names.add(self._shm.name)
+    buf = self._shm.buf
+    _HEADER.pack_into(buf, 0, MAGIC, VERSION, len(self.ranges), 0, 0.0)
+    for i, r in enumerate(self.ranges):
+      _RANGE.pack_into(buf, _HEADER.size + _RANGE.size * i,
+        r.devicetype.encode("ascii"), r.kind, r.head, r.size, r.offset)
+
+    self.updates = 0
+    self.errors = 0
+    self.last_error = None
+    self._stop_event = threading.Event()
+    self._thread = None
+
+  @property
+  def name(self) -> str:
+    """共有メモリ名"""
+    return self._shm.name
+
+  def publish_once(self):
+    """全範囲を読み込み、デバイスイメージを更新
+
+    読み込みは全て終えてから、seqlock の中で一度に書き込みます。
+    """
+    plc = self.plc
+    data = []
+    for r in self.ranges:
+      headdevice = format_device(r.devicetype, r.head)
+      if r.kind == _WORD:
+        recv_buf = plc._run(plc._proc_batchread(const.Command.WORD_READ, headdevice, r.size))
+        if sys.byteorder != "little":
+          words = array("H", bytes(recv_buf))
+          words.byteswap()
+          recv_buf = words.tobytes()
+        data.append(recv_buf)
+      else:
+        recv_buf = plc._run(plc._proc_batchread(const.Command.BIT_READ, headdevice, r.size))
+        data.append(unpack_nibbles(recv_buf, r.size))
+
+    buf = self._shm.buf
+    seq = _SEQ.unpack_from(buf, _SEQ_OFFSET)[0]
+    _SEQ.pack_into(buf, _SEQ_OFFSET, seq + 1)
+    for r, values in zip(self.ranges, data):
+      buf[r.offset:r.offset + r.nbytes] = values
+    struct.pack_into("<d", buf, _TIME_OFFSET, time.time())
+    _SEQ.pack_into(buf, _SEQ_OFFSET, seq + 2)
+    self.updates += 1
+
+  def run_forever(self):
+    """stop() が呼ばれるまで周期的に更新 (読み込みエラーは集計して継続)"""
+    next_due = time.monotonic()
+    while not self._stop_event.is_set():
+      try:
+        self.publish_once()
+      except Exception as e:
+        self.errors += 1
+        self.last_error = e
+      next_due += self.period
+      wait = next_due - time.monotonic()
+      if wait < 0:
+        # 周期を超過した場合は遅れた分をスキップ
+        next_due = time.monotonic()
+        wait = 0
+      if self._stop_event.wait(wait):
+        break
+
+  def start(self):
+    """別スレッドで周期更新を開始"""
+    if self._thread is not None and self._thread.is_alive():
+      return
+    self._stop_event.clear()
+    self._thread = threading.Thread(target=self.run_forever, name="DeviceImagePublisher", daemon=True)
+    self._thread.start()
+
+  def stop(self, timeout:float=None):
+    """周期更新を停止"""
+    self._stop_event.set()
+    if self._thread is not None:
+      self._thread.join(timeout)
+      self._thread = None
+
+  def close(self):
+    """周期更新を停止し、共有メモリを破棄"""
+    self.stop()
+    _created_names.discard(self._shm.name)
+    self._shm.close()
+    self._shm.unlink()
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    self.close()
+
+class DeviceImageReader:
+  """デバイスイメージのリーダー
+
+  view() で得た memoryview を保持したままでは close() できません (先に release() もしくは破棄すること)。
+
+  Args:
+    name(str): 共有メモリ名 (DeviceImagePublisher.name)
+
+  Attributes:
+    ranges(list[ImageRange]): 範囲
+  """
+
+  def __init__(self, name:str):
+    self._shm = _attach(name)
+    buf = self._shm.buf
+    magic, version, count, _, _ = _HEADER.unpack_from(buf, 0)
+    if magic != MAGIC or version != VERSION:
+      self._shm.close()
+      raise ValueError(f"Not a device image: {name}")
+
+    self.ranges = []
+    self._index = {}
+    for i in range(count):
+      devicetype, kind, head, size, offset = _RANGE.unpack_from(buf, _HEADER.size + _RANGE.size * i)
+      image_range = ImageRange(devicetype.rstrip(b"\x00").decode("ascii"), head, size, kind, offset)
+      self.ranges.append(image_range)
+      self._index.setdefault(image_range.devicetype, []).append(image_range)
+
+  @property
+  def sequence(self) -> int:
+    """シーケンス番号 (更新のたびに 2 増える。奇数は書き込み中)"""
+    return _SEQ.unpack_from(self._shm.buf, _SEQ_OFFSET)[0]
+
+  @property
+  def timestamp(self) -> float:
+    """最終更新時刻 (time.time(), 未更新の場合は 0)"""
+    return struct.unpack_from("<d", self._shm.buf, _TIME_OFFSET)[0]
+
+  def begin(self, timeout:float=1.0) -> int:
+    """読み取り開始 (書き込み中でないシーケンス番号を返す)
+
+    Raises:
+      TimeoutError: timeout 秒以内に書き込みが終わらない場合。
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+      seq = self.sequence
+      if not seq & 1:
+        return seq
+      if time.monotonic() > deadline:
+        raise TimeoutError("Device image is being written")
+      time.sleep(0)
+
+  def validate(self, seq:int) -> bool:
+    """begin() 以降に更新されていなければ True"""
+    return self.sequence == seq
+
+  def _find(self, headdevice:str, size:int):
+    devicetype, num = parse_device(headdevice)
+    for image_range in self._index.get(devicetype, ()):
+      if image_range.head <= num and num + size <= image_range.head + image_range.size:
+        return image_range, num - image_range.head
+    raise KeyError(f"{headdevice} + {size} points is not in the device image")
+
+  def view(self, headdevice:str, size:int) -> memoryview:
+    """デバイス範囲のビュー (コピーなし)
+
+    Returns:
+      view(memoryview): ワード: 'H' (符号なし16bit), ビット: 'B' (0 or 1)
+        ※ 共有メモリを直接参照するため、値の一貫性は begin() / validate() で確認すること
+    """
+    image_range, offset = self._find(headdevice, size)
+    start = image_range.offset + offset * image_range.width
+    view = self._shm.buf[start:start + size * image_range.width]
+    return view.cast("H") if image_range.kind == _WORD else view
+
+  def read(self, headdevice:str, size:int, signed:bool=False) -> array:
+    """デバイス範囲の一貫したコピー (seqlock で更新中の値を避ける)
+
+    Returns:
+      values(array.array): ワード: 'H' ('h' if signed), ビット: 'B'
+    """
+    image_range, _ = self._find(headdevice, size)
+    typecode = ("h" if signed else "H") if image_range.kind == _WORD else "B"
+    while True:
+      seq = self.begin()
+      view = self.view(headdevice, size)
+      values = array(typecode, view.cast("B").tobytes() if image_range.kind == _WORD else view)
+      view.release()
+      if self.validate(seq):
+        return values
+
+  def close(self):
+    """共有メモリから切り離す"""
+    self._shm.close()
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    self.close()
+
+def _attach(name:str) -> shared_memory.SharedMemory:
+  """既存の共有メモリに接続 (リーダーの終了時に共有メモリが破棄されないようにする)"""
+  if sys.version_info >= (3, 13):
+    return shared_memory.SharedMemory(name=name, track=False)
+  shm = shared_memory.SharedMemory(name=name)
+  if shm.name not in _created_names:
+    try:
+      from multiprocessing import resource_tracker
+      resource_tracker.unregister(shm._name, "shared_memory")
+    except Exception:
+      pass
+  return shm
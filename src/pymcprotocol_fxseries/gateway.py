@@ -0,0 +1,307 @@
+"""ゲートウェイ (複数クライアント -> 1本の PLC 接続)
+
+ローカルの多数のクライアント (HMI・ヒストリアン・スクリプトなど) から 1E フレームを受け付け、
+1本の PLC 接続 (SharedType1E) に順に送信します。クライアントは接続先をゲートウェイに
+向けるだけで、Type1E をそのまま使用できます。
+
+  - 同時に届いた隣接・重複する読み込みは1フレームにまとめて送信 (SharedType1E 参照)
+  - 同一内容の読み込みは cache_ttl 秒の間、前回の応答をそのまま返す
+    (同じ読み込みが送信中の場合は、その応答を共有する)
+  - 書き込みはそのまま転送し、キャッシュを破棄する
+  - 結合した読み込みが異常応答となった場合は、各フレームをそのまま転送し直して
+    PLC の応答 (終了コード) を返す
+  - TCP もしくは Unix ソケットで待ち受け (バイナリ通信のみ)
+  - PLC との通信エラー時は要求元のクライアントを切断し、PLC へは再接続してから次のフレームを送信
+
+結合した読み込みでは、クライアントが指定した PC番号・監視タイマは使用しません。
+
+Usage:
+  python -m pymcprotocol_fxseries.gateway --plc 192.168.0.10:5000 --listen 127.0.0.1:5010
+
+Example:
+  with Gateway(Type1E("192.168.0.10", 5000), port=5010):
+    with Type1E("127.0.0.1", 5010) as plc:
+      plc.batchread_wordunits("D0", 10)
+"""
+import argparse
+from concurrent.futures import Future
+import os
+import socket
+import socketserver
+import threading
+import time
+
+from pymcprotocol_fxseries.mcprotocol_error import MCProtocolError
+from pymcprotocol_fxseries.shared import SharedType1E
+from pymcprotocol_fxseries.type1e import Type1E
+from pymcprotocol_fxseries.type1e_frame import (
+  get_request_data_size,
+  parse_request_header
+)
+from pymcprotocol_fxseries.utility import recv_exact
+import pymcprotocol_fxseries.type1e_const as const
+
+class _GatewayHandler(socketserver.BaseRequestHandler):
+  def handle(self):
+    gateway = self.server.gateway
+    gateway._connections.add(self.request)
+    try:
+      while True:
+        header = recv_exact(self.request, const.REQUEST_HEADER_SIZE)
+        command, *_, size = parse_request_header(header)
+        data = recv_exact(self.request, get_request_data_size(command, size))
+        self.request.sendall(gateway.handle_request(header + data))
+    except (EOFError, OSError):
+      # クライアントの切断、もしくは PLC との通信エラー (クライアントを切断する)
+      pass
+    finally:
+      gateway._connections.discard(self.request)
+
+class _TCPServer(socketserver.ThreadingTCPServer):
+  daemon_threads = True
+  allow_reuse_address = True
+
+if hasattr(socketserver, "ThreadingUnixStreamServer"):
+  class _UnixServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+else:
+  _UnixServer = None
+
+class Gateway:
+  """ゲートウェイ
+
+  Args:
+    plc(Type1E):       PLC への接続 (未接続のもの。start() で接続する)
+    host(str):         待ち受けアドレス
+    port(int):         待ち受けポート (0 の場合は空きポートを自動で割り当て)
+    unix_path(str):    Unix ソケットのパス (指定時は TCP の代わりに使用)
+    cache_ttl(float):  同一読み込みの応答を再利用する時間 (秒, 0 の場合は再利用しない)
+    merge(bool):       同時に届いた読み込みを結合する
+
+  Attributes:
+    requests(int):   受け付けたフレーム数
+    cache_hits(int): キャッシュ (送信中の応答の共有を含む) から応答したフレーム数
+    forwarded(int):  そのまま転送したフレーム数 (書き込み・結合しない読み込み)
+  """
+
+  def __init__(self
+    , plc: Type1E
+    , host: str="127.0.0.1"
+    , port: int=0
+    , unix_path: str=None
+    , cache_ttl: float=0.05
+    , merge: bool=True
+  ):
+    self.shared = SharedType1E(plc=plc, merge=merge)
+    self.host = host
+    self.port = port
+    self.unix_path = unix_path
+    self.cache_ttl = cache_ttl
+
+    self.requests = 0
+    self.cache_hits = 0
+    self.forwarded = 0
+
+    self._lock = threading.Lock()
+    # 書き込みの開始・完了ごとに更新 (それより前に送信した読み込みの応答は再利用しない)
+    self._generation = 0
+    # 読み込みフレーム (PC番号・監視タイマを除く) -> (応答時刻, 応答)
+    self._cache = {}
+    # 読み込みフレーム -> (世代, 送信中の Future)
+    self._inflight = {}
+    self._server = None
+    self._thread = None
+    self._connections = set()
+
+  # *** (public) フレーム処理 ***
+
+  def handle_request(self, frame:bytes) -> bytes:
+    """リクエストフレームを PLC へ送信し、応答フレームを返す
+
+    Raises:
+      OSError: PLC との通信エラー
+    """
+    command, _, _, num, devicecode, size = parse_request_header(frame)
+    with self._lock:
+      self.requests += 1
+    if command not in (const.Command.BIT_READ, const.Command.WORD_READ):
+      self._invalidate()
+      try:
+        return self._forward(frame, command, size)
+      finally:
+        self._invalidate()
+
+    key = bytes(frame[0:1]) + bytes(frame[4:const.REQUEST_HEADER_SIZE])
+    with self._lock:
+      generation = self._generation
+      entry = self._cache.get(key)
+      if entry is not None and time.monotonic() - entry[0] <= self.cache_ttl:
+        self.cache_hits += 1
+        return entry[1]
+      inflight = self._inflight.get(key)
+      owner = inflight is None or inflight[0] != generation
+      if owner:
+        response = Future()
+        self._inflight[key] = (generation, response)
+      else:
+        response = inflight[1]
+        self.cache_hits += 1
+    if not owner:
+      # 同じ読み込みが送信中の場合は応答を共有する
+      return response.result()
+
+    try:
+      result = self._read(frame, command, num, devicecode, size)
+    except BaseException as e:
+      with self._lock:
+        self._release(key, response)
+      response.set_exception(e)
+      raise
+    self._store(key, generation, response, result)
+    response.set_result(result)
+    return result
+
+  def _invalidate(self):
+    """キャッシュを破棄し、送信中の読み込みの応答を以降の読み込みで共有しないようにする"""
+    with self._lock:
+      self._generation += 1
+      self._cache.clear()
+
+  def _read(self, frame, command, num, devicecode, size):
+    try:
+      devicetype = const.DeviceConstants.get_devicename(devicecode)
+    except const.DeviceCodeError:
+      return self._forward(frame, command, size)
+
+    try:
+      data = self.shared.submit_read(command, devicetype, num, size).result()
+    except MCProtocolError:
+      # 異常応答は PLC の応答をそのまま返す
+      return self._forward(frame, command, size)
+    return bytes(((command | 0x80) & 0xFF, const.EndCode.NORMAL)) + data
+
+  def _forward(self, frame, command, size):
+    with self._lock:
+      self.forwarded += 1
+    return self.shared.submit(lambda plc: _transfer(plc, frame, command, size)).result()
+
+  def _release(self, key, future):
+    """送信中の読み込みを取り除く (_lock を保持して呼ぶこと)"""
+    inflight = self._inflight.get(key)
+    if inflight is not None and inflight[1] is future:
+      del self._inflight[key]
+
+  def _store(self, key, generation, future, response):
+    with self._lock:
+      self._release(key, future)
+      # 送信中に書き込みがあった場合は、書き込み前の値の可能性があるためキャッシュしない
+      if self.cache_ttl <= 0 or generation != self._generation:
+        return
+      now = time.monotonic()
+      if len(self._cache) >= 1024:
+        self._cache = {k: v for k, v in self._cache.items() if now - v[0] <= self.cache_ttl}
+      self._cache[key] = (now, response)
+
+  # *** (public) サーバ ***
+
+  @property
+  def address(self):
+    """待ち受けアドレス ((host, port) もしくは Unix ソケットのパス)"""
+    if self._server is not None:
+      address = self._server.server_address
+      return address if isinstance(address, str) else address[:2]
+    return self.unix_path or (self.host, self.port)
+
+  def start(self):
+    """PLC に接続し、別スレッドで待ち受けを開始"""
+    if self._server is not None:
+      return self
+    self.shared.connect()
+    if self.unix_path:
+      if _UnixServer is None:
+        raise ValueError("Unix sockets are not supported on this platform")
+      if os.path.exists(self.unix_path):
+        os.unlink(self.unix_path)
+      self._server = _UnixServer(self.unix_path, _GatewayHandler)
+    else:
+      self._server = _TCPServer((self.host, self.port), _GatewayHandler)
+    self._server.gateway = self
+    self._thread = threading.Thread(target=self._server.serve_forever,
+      kwargs={"poll_interval": 0.05}, name="Gateway", daemon=True)
+    self._thread.start()
+    return self
+
+  def stop(self):
+    """待ち受けを停止し、クライアントと PLC を切断"""
+    if self._server is None:
+      return
+    self._server.shutdown()
+    self._server.server_close()
+    for conn in list(self._connections):
+      try:
+        conn.shutdown(socket.SHUT_RDWR)
+        conn.close()
+      except OSError:
+        pass
+    self._thread.join()
+    self._server = None
+    self._thread = None
+    if self.unix_path and os.path.exists(self.unix_path):
+      os.unlink(self.unix_path)
+    self.shared.close()
+
+  def __enter__(self):
+    return self.start()
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    self.stop()
+
+  def stats(self):
+    """集計値
+
+    Returns:
+      (dict): requests, cache_hits, forwarded, merged (結合により削減した読み込み回数)
+    """
+    return {
+      "requests": self.requests,
+      "cache_hits": self.cache_hits,
+      "forwarded": self.forwarded,
+      "merged": self.shared.frames_saved,
+    }
+
+def _transfer(plc:Type1E, frame:bytes, command:int, size:int) -> bytes:
+  """フレームをそのまま送信し、応答フレームを返す
+
+  通信エラー (タイムアウトを含む) の場合は、SharedType1E が PLC との接続を閉じて
+  次の要求の前に再接続します (遅れて届いた応答を次のフレームの応答としない)。
+  """
+  plc._send(frame)
+  return bytes(plc._recv(command, size))
+
+def _parse_address(text:str):
+  host, _, port = text.rpartition(":")
+  return host or "127.0.0.1", int(port)
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(description="1E フレームのゲートウェイ (複数クライアント -> 1本の PLC 接続)")
+  parser.add_argument("--plc", required=True, help="PLC のアドレス (ip:port)")
+  parser.add_argument("--listen", default="127.0.0.1:5010", help="待ち受けアドレス (host:port, デフォルト: 127.0.0.1:5010)")
+  parser.add_argument("--unix", dest="unix_path", help="Unix ソケットで待ち受ける場合のパス")
+  parser.add_argument("--cache-ttl", type=float, default=0.05, help="同一読み込みの応答を再利用する時間 (秒)")
+  parser.add_argument("--timeout", type=float, default=2, help="PLC 通信タイムアウト (秒)")
+  args = parser.parse_args(argv)
+
+  plc_host, plc_port = _parse_address(args.plc)
+  host, port = _parse_address(args.listen)
+  gateway = Gateway(Type1E(plc_host, plc_port, args.timeout), host, port, args.unix_path, args.cache_ttl)
+  with gateway:
+    print(f"Gateway listening on {gateway.address} -> {plc_host}:{plc_port}")
+    try:
+      while True:
+        time.sleep(1)
+    except KeyboardInterrupt:
+      pass
+  return 0
+
+if __name__ == "__main__":
+  raise SystemExit(main())
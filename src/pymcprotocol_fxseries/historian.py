@@ -0,0 +1,357 @@
+"""ヒストリアン (リングバッファ)
+
+指定デバイスを ReadPlan で周期的に読み込み、固定長・型付き・列指向のリングバッファ
+(時刻列 + デバイスごとの値の列) に記録します。path を指定するとファイルにメモリマップし、
+再起動後も履歴を引き継ぎます。
+
+  - 時刻: float64 (time.time()), 値: 16bit整数 (signed=False の場合は符号なし。ビットデバイスは 0 or 1)
+  - 範囲の取得は二分探索で位置を求め、リングバッファが折り返していなければコピーせずにビューを返す
+  - 時間幅ごとの min / max / avg への間引き (トレンド表示用)
+
+ファイル形式 (リトルエンディアン):
+  ヘッダ   [magic "FXHS"(4)] [version(2)] [列数(2)] [容量(4)] [記録済みサンプル数(8)] [型 'h' or 'H'(1)] [予約(3)]
+  列名     [デバイス名(16)] x 列数
+  データ   [時刻 float64 x 容量] [値 int16 x 容量] x 列数   (8バイト境界から, 実行環境のバイト順)
+
+Example:
+  historian = Historian(plc, [("D0", 200), "M8000"], capacity=72000, period=0.05, path="trend.fxhs")
+  historian.start()
+  ...
+  timestamps, values = historian.query("D10", start=time.time() - 60)
+  buckets = historian.downsample("D10", 1.0, start=time.time() - 3600)
+"""
+from array import array
+from bisect import bisect_left
+import mmap
+import os
+import struct
+import threading
+import time
+
+from pymcprotocol_fxseries.read_plan import ReadPlan
+from pymcprotocol_fxseries.utility import expand_devices
+
+MAGIC = b"FXHS"
+VERSION = 1
+NAME_SIZE = 16
+
+_HEADER = struct.Struct("<4sHHIQ1s3x")
+_WRITTEN_OFFSET = 12
+_WRITTEN = struct.Struct("<Q")
+
+class Historian:
+  """ヒストリアン
+
+  Args:
+    plc(Type1E | AsyncType1E): 読み込みに使用するクライアント (append() のみで使う場合は None)
+    devices(list):   デバイス名 (ex: "D100") もしくは (先頭デバイス, 点数) のタプル
+    capacity(int):   保持するサンプル数 (古いものから上書き)
+    period(float):   start() での読み込み周期 (秒)
+    path(str):       メモリマップするファイル (None の場合はメモリ上のみ)。
+                     既存のファイルは、デバイス・容量・型が一致すれば履歴を引き継ぐ
+    signed(bool):    値を符号付き16bitとして扱う
+    gap(int):        読み込みプランの gap (ReadPlan 参照)
+
+  Attributes:
+    devices(list[str]): 列のデバイス名
+    errors(int):        読み込みエラー回数
+    last_error(Exception): 最後の読み込みエラー
+  """
+
+  def __init__(self
+    , plc
+    , devices: list
+    , capacity: int
+    , period: float=0.1
+    , path: str=None
+    , signed: bool=True
+    , gap: int=8
+  ):
+    if capacity < 1:
+      raise ValueError("capacity must be 1 or more")
+    self.plc = plc
+    self.devices = expand_devices(devices)
+    if len(set(self.devices)) != len(self.devices):
+      raise ValueError("devices must be unique")
+    for device in self.devices:
+      if len(device.encode("ascii")) > NAME_SIZE:
+        raise ValueError(f"Device name too long: {device}")
+    self.capacity = capacity
+    self.period = period
+    self.path = path
+    self.typecode = "h" if signed else "H"
+    self.plan = ReadPlan(self.devices, gap)
+    self._columns = {device: i for i, device in enumerate(self.devices)}
+
+    self.errors = 0
+    self.last_error = None
+    self._lock = threading.Lock()
+    self._stop_event = threading.Event()
+    self._thread = None
+
+    self._file = None
+    self._buffer = None
+    self._open()
+
+  # *** (private) 記憶領域 ***
+
+  def _layout(self):
+    """(時刻列の位置, 値の列の先頭位置, 全体のバイト数)"""
+    times = _HEADER.size + NAME_SIZE * len(self.devices)
+    times = (times + 7) & ~7
+    values = times + 8 * self.capacity
+    size = values + 2 * self.capacity * len(self.devices)
+    return times, values, size
+
+  def _header(self):
+    header = _HEADER.pack(MAGIC, VERSION, len(self.devices), self.capacity, 0, self.typecode.encode())
+    names = b"".join(device.encode("ascii").ljust(NAME_SIZE, b"\x00") for device in self.devices)
+    return header + names
+
+  def _open(self):
+    times, values, size = self._layout()
+    header = self._header()
+    if self.path is None:
+      self._buffer = bytearray(size)
+      self._buffer[:len(header)] = header
+    else:
+      exists = os.path.exists(self.path) and os.path.getsize(self.path) > 0
+      self._file = open(self.path, "r+b" if exists else "w+b")
+      if exists:
+        stored = self._file.read(len(header))
+        # 記録済みサンプル数を除いて一致すること
+        if len(stored) != len(header) or stored[:_WRITTEN_OFFSET] != header[:_WRITTEN_OFFSET] \
+            or stored[_WRITTEN_OFFSET + 8:] != header[_WRITTEN_OFFSET + 8:] \
+            or os.path.getsize(self.path) != size:
+          self._file.close()
+          raise ValueError(f"History file does not match devices/capacity: {self.path}")
+      else:
+        self._file.truncate(size)
+        self._file.write(header)
+        self._file.flush()
+      self._buffer = mmap.mmap(self._file.fileno(), size)
+
+    view = memoryview(self._buffer)
+    self._times = view[times:values].cast("d")
+    self._values = [
+      view[values + 2 * self.capacity * i:values + 2 * self.capacity * (i + 1)].cast(self.typecode)
+      for i in range(len(self.devices))]
+
+  @property
+  def written(self) -> int:
+    """記録したサンプル数の累計 (上書きしたものを含む)"""
+    return _WRITTEN.unpack_from(self._buffer, _WRITTEN_OFFSET)[0]
+
+  def __len__(self):
+    return min(self.written, self.capacity)
+
+  # *** (public) 記録 ***
+
+  def append(self, values, timestamp:float=None):
+    """サンプルを追加
+
+    Args:
+      values(dict | list): デバイス名 -> 値 (ReadPlan.read の戻り値など)、もしくは列順の値
+      timestamp(float):    時刻 (デフォルト: time.time())
+    """
+    if timestamp is None:
+      timestamp = time.time()
+    if isinstance(values, dict):
+      values = [values[device] for device in self.devices]
+    elif len(values) != len(self.devices):
+      raise ValueError(f"values must have {len(self.devices)} items")
+
+    mask = 0xFFFF
+    with self._lock:
+      written = self.written
+      pos = written % self.capacity
+      self._times[pos] = timestamp
+      for column, value in zip(self._values, values):
+        value = int(value) & mask
+        column[pos] = value - 0x10000 if self.typecode == "h" and value > 0x7FFF else value
+      # 値を書き終えてから記録済みサンプル数を更新
+      _WRITTEN.pack_into(self._buffer, _WRITTEN_OFFSET, written + 1)
+
+  def sample(self):
+    """全デバイスを読み込んで追加 (Type1E の場合)
+
+    Returns:
+      values(dict): デバイス名 -> 値
+    """
+    values = self.plan.read(self.plc)
+    self.append(values)
+    return values
+
+  async def sample_async(self):
+    """全デバイスを読み込んで追加 (AsyncType1E の場合)"""
+    values = await self.plan.read(self.plc)
+    self.append(values)
+    return values
+
+  def run_forever(self):
+    """stop() が呼ばれるまで周期的に記録 (読み込みエラーは集計して継続)"""
+    next_due = time.monotonic()
+    while not self._stop_event.is_set():
+      try:
+        self.sample()
+      except Exception as e:
+        self.errors += 1
+        self.last_error = e
+      next_due += self.period
+      wait = next_due - time.monotonic()
+      if wait < 0:
+        # 周期を超過した場合は遅れた分をスキップ
+        next_due = time.monotonic()
+        wait = 0
+      if self._stop_event.wait(wait):
+        break
+
+  def start(self):
+    """別スレッドで周期記録を開始"""
+    if self._thread is not None and self._thread.is_alive():
+      return
+    self._stop_event.clear()
+    self._thread = threading.Thread(target=self.run_forever, name="Historian", daemon=True)
+    self._thread.start()
+
+  def stop(self, timeout:float=None):
+    """周期記録を停止"""
+    self._stop_event.set()
+    if self._thread is not None:
+      self._thread.join(timeout)
+      self._thread = None
+
+  def flush(self):
+    """メモリマップの内容をファイルへ書き出す"""
+    if self._file is not None:
+      self._buffer.flush()
+
+  def close(self):
+    """周期記録を停止し、ファイルを閉じる
+
+    query() で取得したビューを保持したままでは閉じられません (先に release() もしくは破棄すること)。
+    """
+    self.stop()
+    self._times.release()
+    for column in self._values:
+      column.release()
+    if self._file is not None:
+      self._buffer.flush()
+      self._buffer.close()
+      self._file.close()
+      self._file = None
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    self.close()
+
+  # *** (public) 参照 ***
+
+  def _segments(self):
+    """時刻順の (開始位置, 終了位置) の区間 (折り返している場合は2区間)"""
+    written = self.written
+    if written <= self.capacity:
+      return [(0, written)]
+    pos = written % self.capacity
+    return [(pos, self.capacity), (0, pos)] if pos else [(0, self.capacity)]
+
+  def _select(self, start, end):
+    """start <= 時刻 < end のサンプルの区間"""
+    selected = []
+    for head, tail in self._segments():
+      lo = head if start is None else bisect_left(self._times, start, head, tail)
+      hi = tail if end is None else bisect_left(self._times, end, lo, tail)
+      if lo < hi:
+        selected.append((lo, hi))
+    return selected
+
+  def query(self, device:str, start:float=None, end:float=None):
+    """期間内のサンプル (start <= 時刻 < end)
+
+    Args:
+      device(str):  デバイス名
+      start(float): 開始時刻 (None の場合は最古から)
+      end(float):   終了時刻 (None の場合は最新まで)
+
+    Returns:
+      (timestamps, values): 時刻 (memoryview 'd'), 値 (memoryview 'h' もしくは 'H')
+        ※ リングバッファが折り返している期間はコピー (array.array) を返す。
+           ビューは次の append() で上書きされる可能性があるため、保持する場合はコピーすること
+    """
+    column = self._values[self._columns[device]]
+    with self._lock:
+      selected = self._select(start, end)
+      if not selected:
+        return memoryview(array("d")), memoryview(array(self.typecode))
+      if len(selected) == 1:
+        lo, hi = selected[0]
+        return self._times[lo:hi], column[lo:hi]
+      times = array("d")
+      values = array(self.typecode)
+      for lo, hi in selected:
+        times.frombytes(self._times[lo:hi].cast("B"))
+        values.frombytes(column[lo:hi].cast("B"))
+      return memoryview(times), memoryview(values)
+
+  def latest(self) -> dict:
+    """最新のサンプル
+
+    Returns:
+      (timestamp, values): 時刻, デバイス名 -> 値 (サンプルがない場合は (None, {}))
+    """
+    with self._lock:
+      written = self.written
+      if not written:
+        return None, {}
+      pos = (written - 1) % self.capacity
+      return self._times[pos], {device: self._values[i][pos] for i, device in enumerate(self.devices)}
+
+  def downsample(self, device:str, bucket:float, start:float=None, end:float=None):
+    """時間幅ごとの min / max / avg
+
+    Args:
+      device(str):   デバイス名
+      bucket(float): 時間幅 (秒)
+      start(float), end(float): 期間 (query 参照)。時間幅の区切りは start (省略時は最古の時刻) から
+
+    Returns:
+      (times, mins, maxs, avgs): 時間幅の開始時刻 ('d')、最小値・最大値 (typecode)、平均 ('d') の
+        array.array (サンプルのない時間幅は含まない)
+    """
+    if bucket <= 0:
+      raise ValueError("bucket must be greater than 0")
+    timestamps, values = self.query(device, start, end)
+    times = array("d")
+    mins = array(self.typecode)
+    maxs = array(self.typecode)
+    avgs = array("d")
+    if not len(timestamps):
+      return times, mins, maxs, avgs
+
+    origin = timestamps[0] if start is None else start
+    current = None
+    for timestamp, value in zip(timestamps, values):
+      index = int((timestamp - origin) // bucket)
+      if index != current:
+        if current is not None:
+          times.append(origin + current * bucket)
+          mins.append(low)
+          maxs.append(high)
+          avgs.append(total / count)
+        current = index
+        low = high = total = value
+        count = 1
+      else:
+        if value < low:
+          low = value
+        elif value > high:
+          high = value
+        total += value
+        count += 1
+    times.append(origin + current * bucket)
+    mins.append(low)
+    maxs.append(high)
+    avgs.append(total / count)
+    return times, mins, maxs, avgs
@@ -23,6 +23,20 @@ class UnsupportedComandError(Exception):
     return "This command is not supported by the module you connected." \
          "If you connect with CPU module, please use E71 module."
 
+class VerifyError(Exception):
+  """Read-back values differ from written values.
+
+  Attributes:
+    mismatches(list): (device, expected, actual) の一覧
+  """
+  def __init__(self, mismatches):
+    self.mismatches = mismatches
+
+  def __str__(self):
+    device, expected, actual = self.mismatches[0]
+    return f"verify failed at {len(self.mismatches)} points " \
+         f"(first: {device} expected 0x{expected:04X}, read 0x{actual:04X})"
+
   
 def check_mcprotocol_error(status):
   """Check mc protocol command error.
@@ -0,0 +1,201 @@
+"""通信メトリクス
+
+Type1E の送受信ごとの計測値を受け取るフック (MetricsHook) と、
+固定バケットのヒストグラムで集計する標準実装 (Metrics) を提供します。
+
+計測区間:
+  - encode: 送信データ作成 (送受信手順でフレームを作るまで)
+  - send:   送信
+  - wait:   送信完了から応答1フレーム受信完了まで
+  - decode: 最終応答受信後の値変換
+
+Example:
+  metrics = Metrics()
+  plc.set_metrics(metrics)
+  ...
+  print(metrics.snapshot())
+
+  # 監視システムへの出力はフックで行う
+  class Exporter(MetricsHook):
+    def on_request(self, command, size, sent_bytes, recv_bytes, end_code, encode_ns, send_ns, wait_ns):
+      ...
+  metrics.add_hook(Exporter())
+"""
+from bisect import bisect_left
+
+import pymcprotocol_fxseries.type1e_const as const
+
+# レイテンシのバケット上限 (マイクロ秒)
+DEFAULT_BUCKETS_US = (
+  10, 20, 50, 100, 200, 500,
+  1_000, 2_000, 5_000, 10_000, 20_000, 50_000,
+  100_000, 200_000, 500_000, 1_000_000, 2_000_000, 5_000_000,
+)
+
+COMMAND_NAMES = {
+  const.Command.BIT_READ:   "bit_read",
+  const.Command.WORD_READ:  "word_read",
+  const.Command.BIT_WRITE:  "bit_write",
+  const.Command.WORD_WRITE: "word_write",
+}
+
+class Histogram:
+  """固定バケットのヒストグラム
+
+  Args:
+    buckets(tuple): バケット上限 (昇順)。上限を超える値は最後の (+Inf) バケットに入る
+  """
+  __slots__ = ("buckets", "counts", "count", "total", "max")
+
+  def __init__(self, buckets=DEFAULT_BUCKETS_US):
+    self.buckets = tuple(buckets)
+    self.counts = [0] * (len(self.buckets) + 1)
+    self.count = 0
+    self.total = 0.0
+    self.max = 0.0
+
+  def observe(self, value:float):
+    """値を追加"""
+    self.counts[bisect_left(self.buckets, value)] += 1
+    self.count += 1
+    self.total += value
+    if value > self.max:
+      self.max = value
+
+  @property
+  def mean(self):
+    return self.total / self.count if self.count else 0.0
+
+  def percentile(self, pct:float):
+    """パーセンタイルの推定値 (該当バケットの上限。+Inf バケットの場合は最大値)"""
+    if not self.count:
+      return 0.0
+    rank = pct / 100 * self.count
+    cumulative = 0
+    for i, count in enumerate(self.counts):
+      cumulative += count
+      if cumulative >= rank and count:
+        return self.buckets[i] if i < len(self.buckets) else self.max
+    return self.max
+
+  def snapshot(self):
+    """集計値
+
+    Returns:
+      (dict): count, mean, p50, p95, p99, max, buckets (上限 -> 件数)
+    """
+    buckets = {str(bound): count for bound, count in zip(self.buckets, self.counts)}
+    buckets["+Inf"] = self.counts[-1]
+    return {
+      "count": self.count,
+      "mean": self.mean,
+      "p50": self.percentile(50),
+      "p95": self.percentile(95),
+      "p99": self.percentile(99),
+      "max": self.max,
+      "buckets": buckets,
+    }
+
+class MetricsHook:
+  """計測値を受け取るフック (必要なメソッドのみオーバーライドする)
+
+  時間はすべてナノ秒 (time.perf_counter_ns の差分)。
+  """
+
+  def on_request(self, command:int, size:int, sent_bytes:int, recv_bytes:int, end_code:int
+    , encode_ns:int, send_ns:int, wait_ns:int
+  ):
+    """1フレームの送受信完了 (異常応答を含む)"""
+
+  def on_decode(self, decode_ns:int):
+    """読み書き1回分の値変換完了"""
+
+  def on_error(self, command:int, error:Exception):
+    """送受信エラー (異常応答・通信エラー)"""
+
+  def on_reconnect(self):
+    """再接続"""
+
+class Metrics(MetricsHook):
+  """標準のメトリクス集計
+
+  Attributes:
+    requests(dict):    コマンド名 -> フレーム数
+    points(dict):      コマンド名 -> デバイス点数の合計
+    bytes_sent(int):   送信バイト数
+    bytes_received(int): 受信バイト数
+    errors(dict):      エラー (終了コード "0x...." もしくは例外名) -> 件数
+    reconnects(int):   再接続回数
+    latency(dict):     計測区間 -> Histogram (マイクロ秒)
+  """
+
+  PHASES = ("encode", "send", "wait", "decode", "total")
+
+  def __init__(self, buckets=DEFAULT_BUCKETS_US):
+    self._buckets = buckets
+    self.hooks = []
+    self.reset()
+
+  def reset(self):
+    """集計をクリア"""
+    self.requests = {}
+    self.points = {}
+    self.bytes_sent = 0
+    self.bytes_received = 0
+    self.errors = {}
+    self.reconnects = 0
+    self.latency = {phase: Histogram(self._buckets) for phase in self.PHASES}
+
+  def add_hook(self, hook:MetricsHook):
+    """フックを追加 (計測値をそのまま転送する)"""
+    self.hooks.append(hook)
+
+  def on_request(self, command, size, sent_bytes, recv_bytes, end_code
+    , encode_ns, send_ns, wait_ns
+  ):
+    name = COMMAND_NAMES.get(command, f"0x{command:02X}")
+    self.requests[name] = self.requests.get(name, 0) + 1
+    self.points[name] = self.points.get(name, 0) + size
+    self.bytes_sent += sent_bytes
+    self.bytes_received += recv_bytes
+
+    latency = self.latency
+    latency["encode"].observe(encode_ns / 1000)
+    latency["send"].observe(send_ns / 1000)
+    latency["wait"].observe(wait_ns / 1000)
+    latency["total"].observe((encode_ns + send_ns + wait_ns) / 1000)
+    for hook in self.hooks:
+      hook.on_request(command, size, sent_bytes, recv_bytes, end_code, encode_ns, send_ns, wait_ns)
+
+  def on_decode(self, decode_ns):
+    self.latency["decode"].observe(decode_ns / 1000)
+    for hook in self.hooks:
+      hook.on_decode(decode_ns)
+
+  def on_error(self, command, error):
+    key = getattr(error, "errorcode", None) or type(error).__name__
+    self.errors[key] = self.errors.get(key, 0) + 1
+    for hook in self.hooks:
+      hook.on_error(command, error)
+
+  def on_reconnect(self):
+    self.reconnects += 1
+    for hook in self.hooks:
+      hook.on_reconnect()
+
+  def snapshot(self):
+    """集計値
+
+    Returns:
+      (dict): requests, points, bytes_sent, bytes_received, errors, reconnects,
+              latency_us (計測区間 -> Histogram.snapshot())
+    """
+    return {
+      "requests": dict(self.requests),
+      "points": dict(self.points),
+      "bytes_sent": self.bytes_sent,
+      "bytes_received": self.bytes_received,
+      "errors": dict(self.errors),
+      "reconnects": self.reconnects,
+      "latency_us": {phase: hist.snapshot() for phase, hist in self.latency.items()},
+    }
@@ -0,0 +1,235 @@
+"""複数接続による並列読み込み
+
+同じ PLC に N 本の TCP 接続を張り、大きな一括読み込みや読み込みプランを
+フレーム単位に分割して並列に送受信します。結果は元の順序で組み立てます。
+1フレームずつの往復時間が支配的な場合 (D/R 全域のスナップショットなど) に有効です。
+
+  - 接続エラー (切断・タイムアウト) が起きた接続は切り離し、そのフレームは別の接続で再読み込み
+  - 切り離した接続は reconnect_interval 秒ごとに再接続を試みる
+  - 書き込みは1本の接続で順に送信し、再送しない
+
+Example:
+  with ParallelType1E("192.168.0.10", 5000, connections=4) as plc:
+    values = plc.batchread_wordunits("D0", 8000)
+    values = plc.read_plan(plan)
+"""
+from concurrent.futures import ThreadPoolExecutor, wait
+import queue
+import threading
+import time
+
+from pymcprotocol_fxseries.type1e import Type1E
+from pymcprotocol_fxseries.utility import format_device, parse_device
+import pymcprotocol_fxseries.type1e_const as const
+
+class ParallelType1E:
+  """複数接続による並列読み込みクライアント
+
+  Args:
+    ip, port, timeout, commtype: Type1E と同様
+    connections(int):         接続数 (デフォルト: 4)
+    reconnect_interval(float): 切り離した接続の再接続間隔 (秒)
+
+  Attributes:
+    clients(list[Type1E]): 接続ごとのクライアント
+  """
+
+  def __init__(self
+    , ip: str=None
+    , port: int=None
+    , timeout: float=2
+    , commtype: str=None
+    , connections: int=4
+    , reconnect_interval: float=5.0
+  ):
+    if connections < 1:
+      raise ValueError("connections must be 1 or more")
+
+    self.clients = [Type1E(ip, port, timeout, commtype) for _ in range(connections)]
+    self.reconnect_interval = reconnect_interval
+
+    self._idle = queue.Queue()
+    # 切り離した接続 -> 切り離した時刻
+    self._down = {}
+    self._lock = threading.Lock()
+    self._executor = None
+    self._last_error = None
+
+  # *** (public) 接続 ***
+
+  def connect(self):
+    """全接続を開始 (1本以上接続できれば成功とし、失敗した接続は後で再接続する)
+
+    Raises:
+      ConnectionError: 1本も接続できなかった場合。
+    """
+    self.close()
+    now = time.monotonic()
+    for client in self.clients:
+      try:
+        client.connect()
+        self._idle.put(client)
+      except ConnectionError as e:
+        self._down[client] = now
+        self._last_error = e
+    if len(self._down) == len(self.clients):
+      raise ConnectionError(f"All connections failed: {self._last_error}")
+    self._executor = ThreadPoolExecutor(max_workers=len(self.clients), thread_name_prefix="ParallelType1E")
+
+  def close(self):
+    """全接続を切断"""
+    if self._executor is not None:
+      self._executor.shutdown(wait=True)
+      self._executor = None
+    for client in self.clients:
+      client.close()
+    self._idle = queue.Queue()
+    self._down.clear()
+
+  @property
+  def connected(self) -> int:
+    """使用可能な接続数"""
+    if self._executor is None:
+      return 0
+    return len(self.clients) - len(self._down)
+
+  def __enter__(self):
+    self.connect()
+    return self
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    self.close()
+
+  # *** (public) 通信設定 ***
+
+  def set_chunksize(self, bitread: int=None, wordread: int=None, bitwrite: int=None, wordwrite: int=None):
+    """1フレームあたりの点数上限設定 (Type1E.set_chunksize 参照。全接続に適用)"""
+    for client in self.clients:
+      client.set_chunksize(bitread, wordread, bitwrite, wordwrite)
+
+  def set_accessopt(self, commtype: str=None, pc: int=None, watch_timer: int=None):
+    """通信オプション (Type1E.set_accessopt 参照。全接続に適用)"""
+    for client in self.clients:
+      client.set_accessopt(commtype, pc, watch_timer)
+
+  # *** (private) 接続の割り当て ***
+
+  def _revive(self):
+    """再接続間隔を過ぎた接続の再接続を試みる"""
+    if not self._down:
+      return
+    now = time.monotonic()
+    with self._lock:
+      candidates = [c for c, since in self._down.items() if now - since >= self.reconnect_interval]
+    for client in candidates:
+      try:
+        client.connect()
+      except ConnectionError as e:
+        with self._lock:
+          self._down[client] = time.monotonic()
+        self._last_error = e
+        continue
+      with self._lock:
+        del self._down[client]
+      self._idle.put(client)
+
+  def _acquire(self):
+    while True:
+      with self._lock:
+        if self._executor is None:
+          raise ConnectionError("Socket is not connected. Please use connect method")
+        if len(self._down) == len(self.clients):
+          raise ConnectionError(f"All connections are down: {self._last_error}")
+      try:
+        return self._idle.get(timeout=0.1)
+      except queue.Empty:
+        continue
+
+  def _call(self, func, retry: bool=True):
+    """空いている接続で func(client) を実行
+
+    接続エラー時はその接続を切り離し、retry=True なら別の接続で再実行します。
+    """
+    while True:
+      client = self._acquire()
+      try:
+        result = func(client)
+      except OSError as e:
+        # 切断・タイムアウト (MCProtocolError は接続を継続して使用する)
+        client.close()
+        with self._lock:
+          self._down[client] = time.monotonic()
+        self._last_error = e
+        if retry:
+          continue
+        raise
+      except BaseException:
+        self._idle.put(client)
+        raise
+      self._idle.put(client)
+      return result
+
+  def _gather(self, tasks):
+    """タスクを並列実行し、全タスクの完了を待って結果を順に返す"""
+    futures = [self._executor.submit(task) for task in tasks]
+    wait(futures)
+    return [future.result() for future in futures]
+
+  def _read_raw(self, command:int, headdevice:str, readsize:int):
+    """一括読み込み (フレーム単位で並列に送受信し、受信データを組み立てる)"""
+    self._revive()
+    frame = self.clients[0]
+    if command == const.Command.WORD_READ:
+      limit = frame.wordread_points
+      step = frame._device_step(headdevice, command)
+    else:
+      limit = frame.bitread_points
+      step = 1
+    devicetype, num = parse_device(headdevice)
+
+    def task(start, points):
+      device = format_device(devicetype, num + start * step)
+      return self._call(lambda c: c._run(c._proc_batchread(command, device, points)))
+
+    tasks = [lambda s=start, p=points: task(s, p) for start, points in frame._split_points(readsize, limit)]
+    return b"".join(self._gather(tasks))
+
+  # *** (public) 読み込み ***
+
+  def batchread_wordunits(self, headdevice:str, readsize:int, output:str="list", signed:bool=True):
+    """ワード単位読み込み (Type1E.batchread_wordunits 参照)"""
+    raw = self._read_raw(const.Command.WORD_READ, headdevice, readsize)
+    return self.clients[0]._decode_wordunits(raw, readsize, output, signed)
+
+  def batchread_bitunits(self, headdevice:str, readsize:int, output:str="list"):
+    """ビット単位読み込み (Type1E.batchread_bitunits 参照)"""
+    raw = self._read_raw(const.Command.BIT_READ, headdevice, readsize)
+    return self.clients[0]._decode_bitunits(raw, readsize, output)
+
+  def read_plan(self, plan):
+    """読み込みプランのブロックを並列に読み込む
+
+    Args:
+      plan(ReadPlan): 読み込みプラン
+
+    Returns:
+      values(dict[str, int]): デバイス名 -> 値
+    """
+    self._revive()
+    tasks = [
+      lambda b=block: self._call(lambda c: c._run(c._proc_batchread(b.command, b.headdevice, b.size)))
+      for block in plan.blocks
+    ]
+    return plan.decode(self.clients[0], self._gather(tasks))
+
+  # *** (public) 書き込み ***
+
+  def batchwrite_wordunits(self, headdevice:str, values):
+    """ワード単位書き込み (1本の接続で送信。接続エラー時も再送しない)"""
+    self._revive()
+    return self._call(lambda c: c.batchwrite_wordunits(headdevice, values), retry=False)
+
+  def batchwrite_bitunits(self, headdevice:str, values):
+    """ビット単位書き込み (1本の接続で送信。接続エラー時も再送しない)"""
+    self._revive()
+    return self._call(lambda c: c.batchwrite_bitunits(headdevice, values), retry=False)
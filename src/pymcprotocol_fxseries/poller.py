@@ -0,0 +1,445 @@
+"""selectors による複数 PLC のポーリング
+
+1スレッドで多数の PLC (1E フレーム) への接続を持ち、
+PLC ごとの送受信を状態遷移で進めます (ノンブロッキングソケット)。
+1台が応答しなくても他の PLC のポーリングは止まりません。
+
+  - フレームの作成・応答の解析は Type1EFrame / ReadPlan の送受信手順をそのまま使用
+  - PLC ごとのタイムアウト (接続・応答待ち) と再接続間隔
+  - 結果は ScanResult でコールバック (エラー時は error に例外を設定)
+
+状態遷移:
+  disconnected -> connecting -> idle -> sending -> receiving -> idle ...
+  (タイムアウト・切断時は disconnected に戻り、reconnect_interval 後に再接続)
+
+Example:
+  poller = MultiPoller(timeout=1.0)
+  for i, ip in enumerate(addresses):
+    poller.add(f"plc{i}", ip, 5000, ["D0", ("D100", 20), "M8000"], period=1.0, callback=on_result)
+  poller.start()
+  ...
+  poller.stop()
+"""
+import errno
+import selectors
+import socket
+import threading
+import time
+
+from pymcprotocol_fxseries.read_plan import ReadPlan
+from pymcprotocol_fxseries.scheduler import ScanResult
+from pymcprotocol_fxseries.type1e_frame import Type1EFrame
+from pymcprotocol_fxseries.utility import expand_devices
+import pymcprotocol_fxseries.mcprotocol_error as mcprotocolerror
+
+DISCONNECTED = "disconnected"
+CONNECTING = "connecting"
+IDLE = "idle"
+SENDING = "sending"
+RECEIVING = "receiving"
+
+class PollTarget:
+  """ポーリング対象 PLC 1台分の状態
+
+  Attributes:
+    name(str):       名前
+    address(tuple):  (ip, port)
+    plan(ReadPlan):  読み込みプラン
+    period(float):   周期 (秒)
+    callback:        結果コールバック callback(ScanResult)
+    frame(Type1EFrame): フレーム作成・解析 (set_chunksize などの設定はここで行う)
+    state(str):      状態
+    polls(int):      正常に完了したポーリング回数
+    errors(int):     エラー回数
+    connects(int):   接続回数
+    last_error(Exception): 最後のエラー
+    callback_errors(int): コールバックの例外回数
+    last_callback_error(Exception): 最後のコールバックの例外
+  """
+
+  def __init__(self, name:str, address:tuple, plan:ReadPlan, period:float, callback=None):
+    self.name = name
+    self.address = address
+    self.plan = plan
+    self.period = period
+    self.callback = callback
+    self.frame = Type1EFrame()
+
+    self.state = DISCONNECTED
+    self.polls = 0
+    self.errors = 0
+    self.connects = 0
+    self.last_error = None
+    self.callback_errors = 0
+    self.last_callback_error = None
+
+    self.sock = None
+    # 接続・応答待ちの期限 / 次回ポーリング時刻 / 再接続時刻 (time.monotonic())
+    self.deadline = None
+    self.next_poll = 0.0
+    self.reconnect_at = 0.0
+
+    self._procedure = None
+    self._scheduled = 0.0
+    self._started = 0.0
+    self._command = None
+    self._size = None
+    self._out = None
+    self._in = bytearray()
+    self._expected = 0
+    self._header_done = False
+
+  def __repr__(self):
+    return f"PollTarget({self.name!r}, {self.address}, state={self.state})"
+
+class MultiPoller:
+  """複数 PLC のポーリング
+
+  Args:
+    timeout(float):            接続・応答待ちのタイムアウト (秒)
+    reconnect_interval(float): 切断後の再接続間隔 (秒)
+    gap(int):                  読み込みプランの連結する最大の空き点数 (ReadPlan 参照)
+  """
+
+  def __init__(self, timeout:float=2.0, reconnect_interval:float=5.0, gap:int=8):
+    self.timeout = timeout
+    self.reconnect_interval = reconnect_interval
+    self.gap = gap
+    self.targets = {}
+
+    self._selector = selectors.DefaultSelector()
+    # stop() で select を起こすためのソケット
+    self._wakeup_r, self._wakeup_w = socket.socketpair()
+    self._wakeup_r.setblocking(False)
+    self._selector.register(self._wakeup_r, selectors.EVENT_READ, None)
+    # targets / _removed を保護
+    self._lock = threading.Lock()
+    # 送受信処理 (run_once) と close() を直列化。ソケットの操作はこれを保持したスレッドのみが行う
+    self._run_lock = threading.Lock()
+    self._stop_event = threading.Event()
+    self._thread = None
+    self._results = []
+    # 削除済みで、まだ切断していない対象
+    self._removed = []
+
+  # *** (public) 対象 ***
+
+  def add(self, name:str, ip:str, port:int, devices:list, period:float, callback=None) -> PollTarget:
+    """ポーリング対象を追加
+
+    Args:
+      name(str):      名前
+      ip, port:       接続先
+      devices(list):  デバイス名、もしくは (先頭デバイス, 点数) のリスト
+      period(float):  周期 (秒)
+      callback:       結果コールバック callback(ScanResult)。ScanResult.group に name が入る
+
+    Returns:
+      target(PollTarget): 追加した対象
+    """
+    if period <= 0:
+      raise ValueError("period must be greater than 0")
+    plan = ReadPlan(expand_devices(devices), gap=self.gap)
+    target = PollTarget(name, (ip, port), plan, period, callback)
+    with self._lock:
+      if name in self.targets:
+        raise ValueError(f"Target already exists: {name}")
+      self.targets[name] = target
+    self._wakeup()
+    return target
+
+  def remove(self, name:str):
+    """ポーリング対象を削除
+
+    切断は次の run_once() (ポーリングスレッド)、もしくは close() で行います。
+    """
+    with self._lock:
+      target = self.targets.pop(name)
+      self._removed.append(target)
+    self._wakeup()
+
+  # *** (public) 実行 ***
+
+  def run_once(self, max_wait:float=None):
+    """1回分のイベント処理 (待機 -> 送受信 -> タイマー処理 -> コールバック)
+
+    Args:
+      max_wait(float): 最大待ち時間 (秒)。None の場合は次のタイマーまで待つ
+
+    Returns:
+      results(list[ScanResult]): 完了したポーリング結果 (エラーを含む)
+    """
+    with self._run_lock:
+      self._close_removed()
+      now = time.monotonic()
+      wait = self._next_timer(now) - now
+      if max_wait is not None:
+        wait = min(wait, max_wait)
+
+      for key, events in self._selector.select(max(wait, 0)):
+        target = key.data
+        if target is None:
+          self._drain_wakeup()
+          continue
+        if target.sock is not key.fileobj:
+          continue
+        try:
+          self._handle_event(target, events)
+        except Exception as e:
+          self._fail(target, e)
+
+      # 待機中に削除された対象は再接続・送信しない
+      self._close_removed()
+      self._run_timers(time.monotonic())
+      results, self._results = self._results, []
+
+    # コールバックの例外で接続状態を壊さないよう、送受信処理の後にまとめて通知
+    for target, result in results:
+      if target.callback is not None:
+        try:
+          target.callback(result)
+        except Exception as e:
+          target.callback_errors += 1
+          target.last_callback_error = e
+    return [result for _, result in results]
+
+  def run_forever(self):
+    """stop() が呼ばれるまでポーリングを実行"""
+    while not self._stop_event.is_set():
+      self.run_once()
+
+  def start(self):
+    """別スレッドでポーリングを開始"""
+    if self._thread is not None and self._thread.is_alive():
+      return
+    self._stop_event.clear()
+    self._thread = threading.Thread(target=self.run_forever, name="MultiPoller", daemon=True)
+    self._thread.start()
+
+  def stop(self, timeout:float=None):
+    """ポーリングを停止"""
+    self._stop_event.set()
+    self._wakeup()
+    if self._thread is not None:
+      self._thread.join(timeout)
+      if not self._thread.is_alive():
+        self._thread = None
+
+  def close(self):
+    """ポーリングを停止し、全接続を切断"""
+    self.stop()
+    with self._run_lock:
+      self._close_removed()
+      for target in self._snapshot():
+        self._close(target)
+      self._selector.close()
+    self._wakeup_r.close()
+    self._wakeup_w.close()
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    self.close()
+
+  def stats(self):
+    """対象ごとの状態
+
+    Returns:
+      (dict): 名前 -> {state, polls, errors, connects, last_error, callback_errors}
+    """
+    return {
+      name: {
+        "state": t.state,
+        "polls": t.polls,
+        "errors": t.errors,
+        "connects": t.connects,
+        "last_error": t.last_error,
+        "callback_errors": t.callback_errors,
+      }
+      for name, t in self.targets.items()
+    }
+
+  # *** (private) タイマー ***
+
+  def _wakeup(self):
+    try:
+      self._wakeup_w.send(b"\x00")
+    except OSError:
+      pass
+
+  def _drain_wakeup(self):
+    try:
+      while self._wakeup_r.recv(4096):
+        pass
+    except OSError:
+      pass
+
+  def _snapshot(self):
+    with self._lock:
+      return list(self.targets.values())
+
+  def _close_removed(self):
+    with self._lock:
+      removed, self._removed = self._removed, []
+    for target in removed:
+      self._close(target)
+
+  def _next_timer(self, now:float):
+    timer = now + 1.0
+    for target in self._snapshot():
+      if target.state == DISCONNECTED:
+        timer = min(timer, target.reconnect_at)
+      elif target.state == IDLE:
+        timer = min(timer, target.next_poll)
+      elif target.deadline is not None:
+        timer = min(timer, target.deadline)
+    return timer
+
+  def _run_timers(self, now:float):
+    for target in self._snapshot():
+      try:
+        if target.state == DISCONNECTED:
+          if now >= target.reconnect_at:
+            self._connect(target, now)
+        elif target.state == IDLE:
+          if now >= target.next_poll:
+            self._start_poll(target, now)
+        elif target.deadline is not None and now >= target.deadline:
+          raise TimeoutError(f"{target.state} timed out ({self.timeout}s)")
+      except Exception as e:
+        self._fail(target, e)
+
+  # *** (private) 状態遷移 ***
+
+  def _connect(self, target:PollTarget, now:float):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setblocking(False)
+    target.sock = sock
+    err = sock.connect_ex(target.address)
+    if err not in (0, errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EAGAIN):
+      raise ConnectionError(f"Connection failed ({target.address[0]}:{target.address[1]}): {errno.errorcode.get(err, err)}")
+    target.state = CONNECTING
+    target.deadline = now + self.timeout
+    self._selector.register(sock, selectors.EVENT_WRITE, target)
+
+  def _handle_event(self, target:PollTarget, events:int):
+    if target.state == CONNECTING:
+      err = target.sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+      if err:
+        raise ConnectionError(f"Connection failed ({target.address[0]}:{target.address[1]}): {errno.errorcode.get(err, err)}")
+      target.state = IDLE
+      target.deadline = None
+      target.connects += 1
+      self._selector.modify(target.sock, selectors.EVENT_READ, target)
+      return
+
+    if events & selectors.EVENT_WRITE and target.state == SENDING:
+      self._send(target)
+    if events & selectors.EVENT_READ:
+      self._receive(target)
+
+  def _start_poll(self, target:PollTarget, now:float):
+    target._scheduled = target.next_poll
+    target._started = now
+    target._procedure = target.plan._proc_read(target.frame)
+    self._send_request(target, next(target._procedure))
+
+  def _send_request(self, target:PollTarget, request):
+    send_data, target._command, target._size = request
+    target._out = memoryview(send_data)
+    target._in = bytearray()
+    target._expected = target.frame._get_answerdata_index()
+    target._header_done = False
+    target.state = SENDING
+    target.deadline = time.monotonic() + self.timeout
+    self._send(target)
+
+  def _send(self, target:PollTarget):
+    try:
+      sent = target.sock.send(target._out)
+    except BlockingIOError:
+      sent = 0
+    target._out = target._out[sent:]
+    if len(target._out):
+      self._selector.modify(target.sock, selectors.EVENT_READ | selectors.EVENT_WRITE, target)
+    else:
+      target.state = RECEIVING
+      self._selector.modify(target.sock, selectors.EVENT_READ, target)
+
+  def _receive(self, target:PollTarget):
+    try:
+      data = target.sock.recv(65536)
+    except BlockingIOError:
+      return
+    if not data:
+      raise ConnectionError("Connection closed by peer")
+    if target.state != RECEIVING:
+      raise ConnectionError(f"Unexpected data in state {target.state}")
+
+    target._in += data
+    frame = target.frame
+    index = frame._get_answerdata_index()
+    if not target._header_done and len(target._in) >= index:
+      target._expected = index + frame._get_remain_size(target._in, target._command, target._size)
+      target._header_done = True
+    if not target._header_done or len(target._in) < target._expected:
+      return
+    if len(target._in) > target._expected:
+      raise ConnectionError("Received more data than expected")
+
+    try:
+      frame._check_cmd_answer(target._in)
+    except mcprotocolerror.MCProtocolError as e:
+      # 異常応答 (接続は継続)
+      self._finish(target, None, e)
+      return
+
+    try:
+      request = target._procedure.send(memoryview(target._in)[index:])
+    except StopIteration as e:
+      self._finish(target, e.value, None)
+      return
+    self._send_request(target, request)
+
+  def _finish(self, target:PollTarget, values, error):
+    now = time.monotonic()
+    target.state = IDLE
+    target.deadline = None
+    target._procedure = None
+    # 周期を超過した場合は遅れた分をスキップ
+    target.next_poll = max(target._scheduled + target.period, now)
+    if error is None:
+      target.polls += 1
+    else:
+      target.errors += 1
+      target.last_error = error
+    self._deliver(target, values, error, now)
+
+  def _deliver(self, target:PollTarget, values, error, now:float):
+    self._results.append((target, ScanResult(target.name, values, time.time(), target._scheduled,
+      max(target._started - target._scheduled, 0.0), now - target._started, error)))
+
+  def _close(self, target:PollTarget):
+    if target.sock is not None:
+      try:
+        self._selector.unregister(target.sock)
+      except (KeyError, ValueError):
+        pass
+      target.sock.close()
+      target.sock = None
+    target.state = DISCONNECTED
+    target.deadline = None
+    target._procedure = None
+
+  def _fail(self, target:PollTarget, error:Exception):
+    """通信エラー: 切断して再接続を予約し、エラーを通知"""
+    now = time.monotonic()
+    if target._procedure is None:
+      # 接続中のエラー
+      target._scheduled = target._started = now
+    self._close(target)
+    target.reconnect_at = now + self.reconnect_interval
+    target.errors += 1
+    target.last_error = error
+    self._deliver(target, None, error, now)
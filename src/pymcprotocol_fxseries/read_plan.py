@@ -0,0 +1,172 @@
+"""読み込みプラン
+
+任意のデバイス名リストを、デバイス種類ごとに連続ブロックへまとめ、
+最小限の一括読み込みで取得するためのプランを作成します。
+プランは一度作成すれば、スキャンごとに再利用できます。
+
+Example:
+  plan = ReadPlan(["D12", "D15", "D300", "M8000", "X17"], gap=16)
+  values = plan.read(plc)               # Type1E
+  values = await plan.read(async_plc)   # AsyncType1E
+  # -> {"D12": 0, "D15": 0, "D300": 0, "M8000": 1, "X17": 0}
+"""
+from pymcprotocol_fxseries.utility import format_device, parse_device
+import pymcprotocol_fxseries.type1e_const as const
+
+class ReadBlock:
+  """一括読み込み1回分のブロック
+
+  Attributes:
+    devicetype(str): デバイス種類
+    head(int):       先頭デバイス番号
+    size(int):       点数
+    command(int):    const.Command.WORD_READ もしくは BIT_READ
+  """
+  __slots__ = ("devicetype", "head", "size", "command")
+
+  def __init__(self, devicetype:str, head:int, size:int, command:int):
+    self.devicetype = devicetype
+    self.head = head
+    self.size = size
+    self.command = command
+
+  @property
+  def headdevice(self):
+    """先頭デバイス名 (ex: "D100")"""
+    return format_device(self.devicetype, self.head)
+
+  def __repr__(self):
+    return f"ReadBlock({self.headdevice}, size={self.size})"
+
+class ReadPlan:
+  """読み込みプラン
+
+  Args:
+    devices(list[str]):  デバイス名リスト (ex: ["D12", "D15", "M8000"])
+    gap(int):            ブロックを連結する最大の空き点数。
+                         空きが gap 以下なら、不要な点も含めて1ブロックで読む。
+    wordread_points(int): ワードブロックの点数上限 (デフォルト: const.PointLimit.WORD_READ)
+    bitread_points(int):  ビットブロックの点数上限 (デフォルト: const.PointLimit.BIT_READ)
+    widths(dict):        デバイス名 -> 占有する点数 (32bit整数・実数などの複数ワード。デフォルト: 1)
+                         複数ワードの値はブロックをまたがないように配置する
+
+  Attributes:
+    blocks(list[ReadBlock]): 読み込みブロック
+  """
+
+  def __init__(self
+    , devices: list[str]
+    , gap: int=8
+    , wordread_points: int=None
+    , bitread_points: int=None
+    , widths: dict=None
+  ):
+    if gap < 0:
+      raise ValueError("gap must be 0 or more")
+
+    self.gap = gap
+    self.wordread_points = wordread_points or const.PointLimit.WORD_READ
+    self.bitread_points = bitread_points or const.PointLimit.BIT_READ
+
+    self.blocks = []
+    # デバイス名 -> (ブロック番号, ブロック先頭からのオフセット)
+    self._index = {}
+    self._compile(devices, widths or {})
+
+  def _compile(self, devices, widths):
+    # デバイス種類ごとにデバイス番号をまとめる
+    groups = {}
+    # (デバイス種類, デバイス番号) -> 占有する点数
+    spans = {}
+    for device in devices:
+      devicetype, num = parse_device(device)
+      # 未対応デバイスはここで検出
+      const.DeviceConstants.get_binary_devicecode(devicetype)
+      groups.setdefault(devicetype, {}).setdefault(num, []).append(device)
+      width = widths.get(device, 1)
+      if width > 1:
+        spans[devicetype, num] = max(spans.get((devicetype, num), 1), width)
+
+    for devicetype, numbers in groups.items():
+      if const.DeviceConstants.is_bit_device(devicetype):
+        command, limit = const.Command.BIT_READ, self.bitread_points
+      else:
+        command, limit = const.Command.WORD_READ, self.wordread_points
+
+      block = None
+      last = None
+      for num in sorted(numbers):
+        # このデバイスが占有する最後のデバイス番号
+        tail = num + spans.get((devicetype, num), 1) - 1
+        if tail - num + 1 > limit:
+          raise ValueError(f"{numbers[num][0]} occupies more points than a block ({limit})")
+        if block is None or num - last - 1 > self.gap or tail - block.head + 1 > limit:
+          block = ReadBlock(devicetype, num, tail - num + 1, command)
+          self.blocks.append(block)
+          last = tail
+        else:
+          last = max(last, tail)
+          block.size = last - block.head + 1
+        for device in numbers[num]:
+          self._index[device] = (len(self.blocks) - 1, num - block.head)
+
+  @property
+  def devices(self):
+    """プランに含まれるデバイス名リスト"""
+    return list(self._index)
+
+  def locate(self, device:str):
+    """デバイスの格納位置
+
+    Returns:
+      (block_no, offset): ブロック番号, ブロック先頭からのオフセット(点)
+    """
+    return self._index[device]
+
+  def _proc_read_raw(self, frame):
+    """全ブロックの読み込み手順 (ブロックごとの受信データリストを返す)
+
+    Args:
+      frame(Type1EFrame): 送信データ作成に使用するクライアント
+    """
+    raws = []
+    for block in self.blocks:
+      recv_buf = yield from frame._proc_batchread(block.command, block.headdevice, block.size)
+      raws.append(recv_buf)
+    return raws
+
+  def _proc_read(self, frame):
+    """全ブロックの読み込み手順 (デバイス名 -> 値 の辞書を返す)"""
+    raws = yield from self._proc_read_raw(frame)
+    return self.decode(frame, raws)
+
+  def decode_block(self, frame, block_no:int, raw):
+    """1ブロック分の受信データを値リストに変換"""
+    block = self.blocks[block_no]
+    if block.command == const.Command.WORD_READ:
+      return frame._decode_wordunits(raw, block.size)
+    return frame._decode_bitunits(raw, block.size)
+
+  def decode(self, frame, raws):
+    """ブロックごとの受信データを デバイス名 -> 値 の辞書に変換"""
+    block_values = [self.decode_block(frame, i, raw) for i, raw in enumerate(raws)]
+    return {device: block_values[block_no][offset]
+            for device, (block_no, offset) in self._index.items()}
+
+  def read(self, plc):
+    """プランに従って読み込む
+
+    Args:
+      plc(Type1E | AsyncType1E): 接続済みクライアント
+
+    Returns:
+      values(dict[str, int]): デバイス名 -> 値
+        ※ AsyncType1E の場合は await すること
+    """
+    return plc._run(self._proc_read(plc))
+
+  def __len__(self):
+    return len(self.blocks)
+
+  def __repr__(self):
+    return f"ReadPlan(devices={len(self._index)}, blocks={self.blocks})"
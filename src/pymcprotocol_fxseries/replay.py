@@ -0,0 +1,197 @@
+"""リプレイサーバ
+
+FrameCapture で記録したフレームを、PLC の代わりに応答します。
+記録したトラフィックに対して、PLC なしで負荷試験・プロファイルを行うためのものです。
+
+応答の選び方 (mode):
+  - "request":  受信したリクエストと同じ内容の記録から、記録順に応答 (最後まで使ったら先頭に戻る)。
+                応答時間は記録した応答時間 / speed
+  - "sequence": 受信したリクエストの内容によらず、記録順に応答 (最後まで使ったら先頭に戻る)。
+                最初のリクエストからの経過時間が記録と同じ (/ speed) になるよう応答を遅らせる
+  speed が 0 の場合は待たずに応答します。
+記録にないリクエストには、コマンド誤り (終了コード 0x50) で応答します。
+
+Usage:
+  python -m pymcprotocol_fxseries.replay traffic.fxcap --listen 127.0.0.1:5000 --speed 10
+
+Example:
+  with ReplayServer("traffic.fxcap", speed=0) as server:
+    with Type1E(*server.address) as plc:
+      plc.batchread_wordunits("D0", 10)
+"""
+import argparse
+from collections import deque
+import os
+import socket
+import socketserver
+import threading
+import time
+
+from pymcprotocol_fxseries.capture import read_capture
+from pymcprotocol_fxseries.type1e_frame import (
+  get_request_data_size,
+  parse_request_header
+)
+from pymcprotocol_fxseries.utility import recv_exact
+import pymcprotocol_fxseries.type1e_const as const
+
+class _ReplayHandler(socketserver.BaseRequestHandler):
+  def handle(self):
+    server = self.server.replay
+    server._connections.add(self.request)
+    try:
+      while True:
+        header = recv_exact(self.request, const.REQUEST_HEADER_SIZE)
+        command, *_, size = parse_request_header(header)
+        data = recv_exact(self.request, get_request_data_size(command, size))
+        delay, response = server.handle_request(header + data)
+        if delay > 0:
+          time.sleep(delay)
+        self.request.sendall(response)
+    except (EOFError, OSError):
+      pass
+    finally:
+      server._connections.discard(self.request)
+
+class _ThreadingServer(socketserver.ThreadingTCPServer):
+  daemon_threads = True
+  allow_reuse_address = True
+
+class ReplayServer:
+  """リプレイサーバ
+
+  Args:
+    source(str | list[CaptureRecord]): キャプチャファイルのパス、もしくはレコード
+    host(str):    待ち受けアドレス
+    port(int):    待ち受けポート (0 の場合は空きポートを自動で割り当て)
+    speed(float): 再生速度 (1.0: 記録と同じ, 10.0: 10倍速, 0: 待たない)
+    mode(str):    "request" もしくは "sequence"
+
+  Attributes:
+    requests(int):   受け付けたリクエスト数
+    misses(int):     記録になかったリクエスト数 ("sequence" の場合は記録と内容が異なったリクエスト数)
+  """
+
+  def __init__(self, source, host:str="127.0.0.1", port:int=0, speed:float=1.0, mode:str="request"):
+    if speed < 0:
+      raise ValueError("speed must be 0 or more")
+    if mode not in ("request", "sequence"):
+      raise ValueError(f"mode must be 'request' or 'sequence': {mode!r}")
+    self.records = list(read_capture(source) if isinstance(source, (str, os.PathLike)) else source)
+    if not self.records:
+      raise ValueError("No records to replay")
+    self.host = host
+    self.port = port
+    self.speed = speed
+    self.mode = mode
+
+    self.requests = 0
+    self.misses = 0
+
+    self._lock = threading.Lock()
+    # リクエスト -> 応答するレコード (記録順)
+    self._responses = {}
+    for record in self.records:
+      self._responses.setdefault(bytes(record.request), deque()).append(record)
+    self._position = 0
+    self._started = None
+    self._server = None
+    self._thread = None
+    self._connections = set()
+
+  def handle_request(self, frame:bytes):
+    """リクエストに対する応答
+
+    Returns:
+      (delay, response): 応答までの待ち時間 (秒), 応答フレーム
+    """
+    with self._lock:
+      self.requests += 1
+      if self.mode == "sequence":
+        return self._next_in_sequence(frame)
+
+      records = self._responses.get(bytes(frame))
+      if records is None:
+        self.misses += 1
+        return 0.0, bytes(((frame[0] | 0x80) & 0xFF, const.EndCode.COMMAND_ERROR))
+      record = records[0]
+      records.rotate(-1)
+    return (record.rtt / self.speed if self.speed else 0.0), record.response
+
+  def _next_in_sequence(self, frame):
+    now = time.monotonic()
+    if self._position == 0:
+      self._started = now
+    record = self.records[self._position]
+    self._position = (self._position + 1) % len(self.records)
+    if bytes(frame) != record.request:
+      self.misses += 1
+    if not self.speed:
+      return 0.0, record.response
+    due = self._started + (record.timestamp - self.records[0].timestamp + record.rtt) / self.speed
+    return max(0.0, due - now), record.response
+
+  # *** (public) サーバ ***
+
+  @property
+  def address(self):
+    """待ち受けアドレス (host, port)"""
+    if self._server is not None:
+      return self._server.server_address[:2]
+    return (self.host, self.port)
+
+  def start(self):
+    """別スレッドで待ち受けを開始"""
+    if self._server is not None:
+      return self
+    self._server = _ThreadingServer((self.host, self.port), _ReplayHandler)
+    self._server.replay = self
+    self._thread = threading.Thread(target=self._server.serve_forever,
+      kwargs={"poll_interval": 0.05}, name="ReplayServer", daemon=True)
+    self._thread.start()
+    return self
+
+  def stop(self):
+    """待ち受けを停止し、クライアントを切断"""
+    if self._server is None:
+      return
+    self._server.shutdown()
+    self._server.server_close()
+    for conn in list(self._connections):
+      try:
+        conn.shutdown(socket.SHUT_RDWR)
+        conn.close()
+      except OSError:
+        pass
+    self._thread.join()
+    self._server = None
+    self._thread = None
+
+  def __enter__(self):
+    return self.start()
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    self.stop()
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(description="キャプチャしたフレームを PLC の代わりに応答するリプレイサーバ")
+  parser.add_argument("capture", help="キャプチャファイル")
+  parser.add_argument("--listen", default="127.0.0.1:5000", help="待ち受けアドレス (host:port, デフォルト: 127.0.0.1:5000)")
+  parser.add_argument("--speed", type=float, default=1.0, help="再生速度 (1: 記録と同じ, 0: 待たない)")
+  parser.add_argument("--mode", choices=("request", "sequence"), default="request", help="応答の選び方")
+  args = parser.parse_args(argv)
+
+  host, _, port = args.listen.rpartition(":")
+  server = ReplayServer(args.capture, host or "127.0.0.1", int(port), args.speed, args.mode)
+  with server:
+    print(f"Replaying {len(server.records)} records on {server.address}")
+    try:
+      while True:
+        time.sleep(1)
+    except KeyboardInterrupt:
+      pass
+  print(f"requests: {server.requests}, misses: {server.misses}")
+  return 0
+
+if __name__ == "__main__":
+  raise SystemExit(main())
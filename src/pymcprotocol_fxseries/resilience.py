@@ -0,0 +1,113 @@
+"""自動再接続と応答時間の推定
+
+  - ReconnectPolicy: 再接続の回数・間隔 (指数バックオフ + ジッター) と読み込みの再送回数
+  - RttEstimator:    平滑化した往復時間 (SRTT) とそのばらつきから、適応的な受信タイムアウトを求める
+                     (RFC 6298 の再送タイムアウト計算と同じ方法)
+
+Example:
+  plc.set_reconnect(ReconnectPolicy(retries=2, base_delay=0.1, max_delay=5.0))
+"""
+import random
+
+def backoff_delay(attempt:int, base_delay:float, max_delay:float, jitter:float, rng=random) -> float:
+  """指数バックオフの待ち時間
+
+  Args:
+    attempt(int):      再試行回数 (0 始まり)
+    base_delay(float): 初回の待ち時間 (秒)
+    max_delay(float):  待ち時間の上限 (秒)
+    jitter(float):     ランダムに減らす割合 (0 ~ 1)。複数クライアントの再接続が重ならないようにする
+
+  Returns:
+    delay(float): 待ち時間 (秒)
+  """
+  delay = min(max_delay, base_delay * (2 ** attempt))
+  return delay * (1 - jitter * rng.random())
+
+class ReconnectPolicy:
+  """自動再接続の設定
+
+  Args:
+    retries(int):          読み込みの再送回数 (書き込みは再送しない)
+    connect_retries(int):  1回の再接続で試みる接続回数
+    base_delay(float):     接続再試行の初回待ち時間 (秒)
+    max_delay(float):      接続再試行の待ち時間の上限 (秒)
+    jitter(float):         待ち時間をランダムに減らす割合 (0 ~ 1)
+    adaptive_timeout(bool): 往復時間から読み込みの受信タイムアウトを求める (書き込みは接続時のタイムアウト)
+    min_timeout(float):    適応タイムアウトの下限 (秒, RFC 6298 の下限 1秒)
+    max_timeout(float):    適応タイムアウトの上限 (秒, None の場合は接続時のタイムアウト)
+  """
+
+  def __init__(self
+    , retries: int=2
+    , connect_retries: int=3
+    , base_delay: float=0.1
+    , max_delay: float=5.0
+    , jitter: float=0.5
+    , adaptive_timeout: bool=False
+    , min_timeout: float=1.0
+    , max_timeout: float=None
+  ):
+    if retries < 0:
+      raise ValueError("retries must be 0 or more")
+    if connect_retries < 1:
+      raise ValueError("connect_retries must be 1 or more")
+    if not 0 <= jitter <= 1:
+      raise ValueError("jitter must be 0 <= jitter <= 1")
+
+    self.retries = retries
+    self.connect_retries = connect_retries
+    self.base_delay = base_delay
+    self.max_delay = max_delay
+    self.jitter = jitter
+    self.adaptive_timeout = adaptive_timeout
+    self.min_timeout = min_timeout
+    self.max_timeout = max_timeout
+
+  def backoff(self, attempt:int) -> float:
+    """attempt 回目 (0 始まり) の接続再試行までの待ち時間"""
+    return backoff_delay(attempt, self.base_delay, self.max_delay, self.jitter)
+
+class RttEstimator:
+  """往復時間の推定と適応タイムアウト
+
+  timeout = SRTT + 4 * RTTVAR (min_timeout ~ max_timeout に制限)
+  タイムアウト発生時は timeout を2倍にする (上限まで)。
+
+  Args:
+    initial(float):     最初の計測までのタイムアウト (秒)
+    min_timeout(float): 下限 (秒)
+    max_timeout(float): 上限 (秒)
+
+  Attributes:
+    srtt(float):    平滑化した往復時間 (秒, 未計測の場合は None)
+    rttvar(float):  往復時間のばらつき (秒)
+    timeout(float): 受信タイムアウト (秒)
+  """
+  ALPHA = 1 / 8
+  BETA = 1 / 4
+  K = 4
+
+  def __init__(self, initial:float, min_timeout:float=1.0, max_timeout:float=2.0):
+    self.min_timeout = min_timeout
+    self.max_timeout = max_timeout
+    self.srtt = None
+    self.rttvar = None
+    self.timeout = self._clamp(initial)
+
+  def _clamp(self, value:float) -> float:
+    return min(self.max_timeout, max(self.min_timeout, value))
+
+  def update(self, rtt:float):
+    """往復時間の計測値を反映"""
+    if self.srtt is None:
+      self.srtt = rtt
+      self.rttvar = rtt / 2
+    else:
+      self.rttvar = (1 - self.BETA) * self.rttvar + self.BETA * abs(self.srtt - rtt)
+      self.srtt = (1 - self.ALPHA) * self.srtt + self.ALPHA * rtt
+    self.timeout = self._clamp(self.srtt + self.K * self.rttvar)
+
+  def on_timeout(self):
+    """タイムアウト発生 (次回のタイムアウトを延ばす)"""
+    self.timeout = self._clamp(self.timeout * 2)
@@ -0,0 +1,289 @@
+"""マルチレート周期読み込みスケジューラ
+
+周期の異なるスキャングループ (デバイス + 周期) を1つの接続で実行します。
+
+  - 期限 (deadline) の早い順に実行
+  - 同時期に期限を迎えたグループは1つの読み込みプランにまとめて実行
+  - 周期超過 (overrun) と開始遅れ (jitter) を集計
+  - 結果はコールバック、もしくはキューで受け取る
+
+Example:
+  sched = ScanScheduler(plc, result_queue=queue.Queue())
+  sched.add_group("fast", ["M0", "M1", ("X0", 16)], period=0.05)
+  sched.add_group("process", [("D100", 50)], period=0.5, callback=on_values)
+  sched.start()
+  ...
+  sched.stop()
+"""
+import heapq
+import itertools
+import threading
+import time
+
+from pymcprotocol_fxseries.read_plan import ReadPlan
+from pymcprotocol_fxseries.utility import expand_devices
+
+class ScanResult:
+  """スキャン結果
+
+  Attributes:
+    group(str):       スキャングループ名
+    values(dict):     デバイス名 -> 値 (エラー時は None)
+    timestamp(float): 読み込み完了時刻 (time.time())
+    scheduled(float): 予定時刻 (time.monotonic())
+    jitter(float):    予定時刻からの開始遅れ (秒)
+    duration(float):  読み込み所要時間 (秒)
+    error(Exception): 読み込みエラー (正常時は None)
+  """
+  __slots__ = ("group", "values", "timestamp", "scheduled", "jitter", "duration", "error")
+
+  def __init__(self, group, values, timestamp, scheduled, jitter, duration, error=None):
+    self.group = group
+    self.values = values
+    self.timestamp = timestamp
+    self.scheduled = scheduled
+    self.jitter = jitter
+    self.duration = duration
+    self.error = error
+
+  def __repr__(self):
+    return (f"ScanResult({self.group!r}, points={len(self.values or ())}, "
+            f"jitter={self.jitter * 1000:.1f}ms, error={self.error!r})")
+
+class ScanGroup:
+  """スキャングループ
+
+  Attributes:
+    name(str):        グループ名
+    devices(list):    デバイス名リスト
+    period(float):    周期 (秒)
+    callback:         結果コールバック callback(ScanResult)
+    next_due(float):  次回予定時刻 (time.monotonic())
+    scans(int):       実行回数
+    overruns(int):    周期超過で飛ばした回数
+    errors(int):      読み込みエラー回数
+    callback_errors(int): コールバックの例外回数
+    last_callback_error(Exception): 最後のコールバックの例外
+    max_jitter(float): 最大開始遅れ (秒)
+  """
+
+  def __init__(self, name:str, devices:list[str], period:float, callback=None):
+    self.name = name
+    self.devices = devices
+    self.period = period
+    self.callback = callback
+    self.next_due = 0.0
+
+    self.scans = 0
+    self.overruns = 0
+    self.errors = 0
+    self.callback_errors = 0
+    self.last_callback_error = None
+    self.max_jitter = 0.0
+    self._total_jitter = 0.0
+
+  @property
+  def mean_jitter(self):
+    """平均開始遅れ (秒)"""
+    return self._total_jitter / self.scans if self.scans else 0.0
+
+  def _account(self, due:float, started:float):
+    """実行結果を集計し、次回予定時刻を求める"""
+    jitter = started - due
+    self.scans += 1
+    self._total_jitter += jitter
+    self.max_jitter = max(self.max_jitter, jitter)
+
+    # 周期を超過した場合は、過ぎた回を飛ばして次の周期に合わせる
+    next_due = due + self.period
+    if next_due <= started:
+      missed = int((started - due) // self.period)
+      self.overruns += missed
+      next_due = due + (missed + 1) * self.period
+    self.next_due = next_due
+    return jitter
+
+  def stats(self):
+    """集計値
+
+    Returns:
+      (dict): scans, overruns, errors, callback_errors, mean_jitter, max_jitter
+    """
+    return {
+      "scans": self.scans,
+      "overruns": self.overruns,
+      "errors": self.errors,
+      "callback_errors": self.callback_errors,
+      "mean_jitter": self.mean_jitter,
+      "max_jitter": self.max_jitter,
+    }
+
+class ScanScheduler:
+  """マルチレート周期読み込みスケジューラ
+
+  Args:
+    plc(Type1E):          接続済みクライアント (このスケジューラのみが使用すること)
+    gap(int):             読み込みプランのブロック連結閾値 (ReadPlan 参照)
+    merge_window(float):  この時間 (秒) 以内に期限を迎えるグループはまとめて実行する
+    result_queue(queue.Queue): 結果の出力先 (コールバック未指定のグループの結果)
+  """
+
+  def __init__(self, plc, gap:int=8, merge_window:float=0.005, result_queue=None):
+    self.plc = plc
+    self.gap = gap
+    self.merge_window = merge_window
+    self.result_queue = result_queue
+
+    self.groups = {}
+    self._heap = []
+    self._seq = itertools.count()
+    # グループ名の組み合わせ -> ReadPlan (作成は初回のみ)
+    self._plans = {}
+    # groups, _heap, _plans を保護 (読み込み中は保持しない)
+    self._lock = threading.Lock()
+
+    self._stop_event = threading.Event()
+    self._thread = None
+
+  def add_group(self, name:str, devices:list, period:float, callback=None):
+    """スキャングループ追加
+
+    Args:
+      name(str):      グループ名
+      devices(list):  デバイス名 もしくは (先頭デバイス, 点数) のリスト
+      period(float):  周期 (秒)
+      callback:       結果コールバック callback(ScanResult)。
+                      未指定の場合は result_queue に出力する。
+    """
+    if name in self.groups:
+      raise ValueError(f"scan group {name!r} already exists")
+    if period <= 0:
+      raise ValueError("period must be greater than 0")
+
+    group = ScanGroup(name, expand_devices(devices), period, callback)
+    with self._lock:
+      if name in self.groups:
+        raise ValueError(f"scan group {name!r} already exists")
+      group.next_due = time.monotonic()
+      self.groups[name] = group
+      heapq.heappush(self._heap, (group.next_due, next(self._seq), group))
+      self._plans.clear()
+    return group
+
+  def remove_group(self, name:str):
+    """スキャングループ削除"""
+    with self._lock:
+      group = self.groups.pop(name)
+      self._heap = [entry for entry in self._heap if entry[2] is not group]
+      heapq.heapify(self._heap)
+      self._plans.clear()
+
+  def _get_plan(self, groups):
+    """グループの組み合わせの読み込みプラン (_lock を保持して呼ぶこと)"""
+    key = tuple(sorted(group.name for group in groups))
+    plan = self._plans.get(key)
+    if plan is None:
+      devices = dict.fromkeys(d for group in groups for d in group.devices)
+      plan = ReadPlan(list(devices), gap=self.gap,
+        wordread_points=self.plc.wordread_points, bitread_points=self.plc.bitread_points)
+      self._plans[key] = plan
+    return plan
+
+  def _deliver(self, group, result):
+    """結果を出力 (コールバックの例外は集計して継続)"""
+    try:
+      if group.callback is not None:
+        group.callback(result)
+      elif self.result_queue is not None:
+        self.result_queue.put(result)
+    except Exception as e:
+      group.callback_errors += 1
+      group.last_callback_error = e
+
+  def next_due(self):
+    """次回の予定時刻 (time.monotonic())。グループがなければ None"""
+    with self._lock:
+      return self._heap[0][0] if self._heap else None
+
+  def run_pending(self):
+    """期限を迎えたグループを実行
+
+    Returns:
+      results(list[ScanResult]): 実行結果
+    """
+    with self._lock:
+      if not self._heap:
+        return []
+
+      now = time.monotonic()
+      if self._heap[0][0] > now + self.merge_window:
+        return []
+
+      # 同時期に期限を迎えたグループをまとめる
+      due_entries = []
+      limit = max(now, self._heap[0][0]) + self.merge_window
+      while self._heap and self._heap[0][0] <= limit:
+        due_entries.append(heapq.heappop(self._heap))
+      plan = self._get_plan([entry[2] for entry in due_entries])
+
+    started = time.monotonic()
+    values, error = None, None
+    try:
+      values = plan.read(self.plc)
+    except Exception as e:
+      error = e
+    finished = time.monotonic()
+    timestamp = time.time()
+
+    results = []
+    for due, _, group in due_entries:
+      jitter = group._account(due, started)
+      if error is not None:
+        group.errors += 1
+        group_values = None
+      else:
+        group_values = {device: values[device] for device in group.devices}
+      result = ScanResult(group.name, group_values, timestamp, due, jitter,
+        finished - started, error)
+      # コールバックより先にスケジュールへ戻す (読み込み中に削除されたグループは戻さない)
+      with self._lock:
+        if self.groups.get(group.name) is group:
+          heapq.heappush(self._heap, (group.next_due, next(self._seq), group))
+      results.append(result)
+    for result, (_, _, group) in zip(results, due_entries):
+      self._deliver(group, result)
+    return results
+
+  def run_forever(self):
+    """stop() が呼ばれるまでスケジュールを実行"""
+    while not self._stop_event.is_set():
+      due = self.next_due()
+      wait = 0.1 if due is None else due - time.monotonic()
+      if wait > 0 and self._stop_event.wait(wait):
+        break
+      self.run_pending()
+
+  def start(self):
+    """別スレッドでスケジュール実行を開始"""
+    if self._thread and self._thread.is_alive():
+      return
+    self._stop_event.clear()
+    self._thread = threading.Thread(target=self.run_forever, name="ScanScheduler", daemon=True)
+    self._thread.start()
+
+  def stop(self, timeout:float=None):
+    """スケジュール実行を停止"""
+    self._stop_event.set()
+    if self._thread:
+      self._thread.join(timeout)
+      self._thread = None
+
+  def stats(self):
+    """グループごとの集計値
+
+    Returns:
+      (dict[str, dict]): グループ名 -> ScanGroup.stats()
+    """
+    with self._lock:
+      groups = list(self.groups.items())
+    return {name: group.stats() for name, group in groups}
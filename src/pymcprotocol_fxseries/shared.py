@@ -0,0 +1,309 @@
+"""スレッド間で共有する PLC 接続
+
+1本の I/O スレッドがソケットを専有し、各スレッドからの要求をキューで受け付けます。
+要求は concurrent.futures.Future で結果を返します。
+キューに同時に溜まった読み込み要求のうち、同じデバイス種類で隣接・重複するものは
+1フレームにまとめて読み込みます (書き込みをまたいだ並べ替えは行いません)。
+通信エラー (切断・タイムアウト) の後は接続を閉じ、次の要求の前に再接続します。
+
+Example:
+  with SharedType1E("192.168.0.10", 5000) as plc:
+    # どのスレッドからでも呼び出せる
+    values = plc.batchread_wordunits("D100", 10)
+    future = plc.submit_batchread_wordunits("D110", 10)
+    values = future.result()
+"""
+from concurrent.futures import Future
+import queue
+import threading
+
+from pymcprotocol_fxseries.type1e import Type1E
+from pymcprotocol_fxseries.type1e_frame import pack_nibbles, unpack_nibbles
+from pymcprotocol_fxseries.utility import format_device, parse_device
+import pymcprotocol_fxseries.type1e_const as const
+
+_STOP = object()
+
+class _ReadRequest:
+  """読み込み要求 (結合対象)"""
+  __slots__ = ("command", "devicetype", "num", "size", "step", "output", "signed", "future")
+
+  def __init__(self, command, devicetype, num, size, output, signed, future):
+    self.command = command
+    self.devicetype = devicetype
+    self.num = num
+    self.size = size
+    # 1点あたりのデバイス番号の増分 (ビットデバイスのワード単位アクセスは16)
+    self.step = 16 if command == const.Command.WORD_READ \
+      and const.DeviceConstants.is_bit_device(self.devicetype) else 1
+    self.output = output
+    self.signed = signed
+    self.future = future
+
+  @property
+  def end(self):
+    """最終デバイス番号 + 1"""
+    return self.num + self.size * self.step
+
+class _CallRequest:
+  """任意処理の要求 (書き込みなど。結合しない)"""
+  __slots__ = ("func", "future")
+
+  def __init__(self, func, future):
+    self.func = func
+    self.future = future
+
+class SharedType1E:
+  """スレッド間で共有する PLC 接続
+
+  Args:
+    ip, port, timeout, commtype: Type1E と同様
+    merge(bool):  同時に溜まった読み込み要求を結合する (デフォルト: True)
+    plc(Type1E):  使用するクライアント (指定時は ip などは無視)
+
+  Attributes:
+    requests(int): 受け付けた要求数
+    frames_saved(int): 結合により削減した読み込み回数
+  """
+
+  def __init__(self
+    , ip: str=None
+    , port: int=None
+    , timeout: float=2
+    , commtype: str=None
+    , merge: bool=True
+    , plc: Type1E=None
+  ):
+    self.plc = plc or Type1E(ip, port, timeout, commtype)
+    self.merge = merge
+
+    self.requests = 0
+    self.frames_saved = 0
+
+    self._queue = queue.Queue()
+    self._thread = None
+    # _thread の開始・停止と要求の追加を直列化 (_STOP より後に要求を積まないようにする)
+    self._lock = threading.Lock()
+
+  # *** (public) 接続 ***
+
+  def connect(self, ip: str=None, port: int=None, timeout: float=None):
+    """PLCに接続し、I/O スレッドを開始"""
+    self.plc.connect(ip, port, timeout)
+    self._start()
+
+  def close(self):
+    """I/O スレッドを停止し、PLCとの通信切断
+    未処理の要求は ConnectionError で終了します。
+    """
+    with self._lock:
+      thread, self._thread = self._thread, None
+      if thread is not None:
+        self._queue.put(_STOP)
+    if thread is not None:
+      thread.join()
+    self.plc.close()
+
+  def __enter__(self):
+    self.connect()
+    return self
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    self.close()
+
+  def _start(self):
+    with self._lock:
+      if self._thread is None:
+        self._thread = threading.Thread(target=self._io_loop, name="SharedType1E", daemon=True)
+        self._thread.start()
+
+  # *** (public) 要求 ***
+
+  def _put(self, request):
+    with self._lock:
+      if self._thread is None:
+        raise ConnectionError("Socket is not connected. Please use connect method")
+      self.requests += 1
+      self._queue.put(request)
+    return request.future
+
+  def submit(self, func) -> Future:
+    """任意の処理を I/O スレッドで実行
+
+    Args:
+      func: func(plc: Type1E) -> 戻り値
+
+    Returns:
+      future(Future): 処理の戻り値
+    """
+    return self._put(_CallRequest(func, Future()))
+
+  def submit_read(self, command:int, devicetype:str, num:int, size:int
+    , output:str="raw", signed:bool=True
+  ) -> Future:
+    """読み込みを要求 (結合対象)
+
+    Args:
+      command(int):     const.Command.WORD_READ もしくは BIT_READ
+      devicetype(str):  デバイス種類
+      num(int):         先頭デバイス番号
+      size(int):        点数
+      output(str):      出力形式 (batchread_wordunits / batchread_bitunits 参照)
+                        "raw" の場合は応答データ部 (bytes, 1E フレームの形式) を返す
+      signed(bool):     符号付き16bitとして扱う (ワード単位のみ)
+
+    Returns:
+      future(Future): 読み込み結果
+    """
+    return self._put(_ReadRequest(command, devicetype, num, size, output, signed, Future()))
+
+  def submit_batchread_wordunits(self, headdevice:str, readsize:int
+    , output:str="list", signed:bool=True
+  ) -> Future:
+    """ワード単位読み込み (Type1E.batchread_wordunits 参照) を要求"""
+    return self.submit_read(const.Command.WORD_READ, *parse_device(headdevice), readsize, output, signed)
+
+  def submit_batchread_bitunits(self, headdevice:str, readsize:int, output:str="list") -> Future:
+    """ビット単位読み込み (Type1E.batchread_bitunits 参照) を要求"""
+    return self.submit_read(const.Command.BIT_READ, *parse_device(headdevice), readsize, output)
+
+  def submit_batchwrite_wordunits(self, headdevice:str, values) -> Future:
+    """ワード単位書き込み (Type1E.batchwrite_wordunits 参照) を要求"""
+    return self.submit(lambda plc: plc.batchwrite_wordunits(headdevice, values))
+
+  def submit_batchwrite_bitunits(self, headdevice:str, values) -> Future:
+    """ビット単位書き込み (Type1E.batchwrite_bitunits 参照) を要求"""
+    return self.submit(lambda plc: plc.batchwrite_bitunits(headdevice, values))
+
+  def batchread_wordunits(self, headdevice:str, readsize:int, output:str="list", signed:bool=True):
+    """ワード単位読み込み (完了まで待機)"""
+    return self.submit_batchread_wordunits(headdevice, readsize, output, signed).result()
+
+  def batchread_bitunits(self, headdevice:str, readsize:int, output:str="list"):
+    """ビット単位読み込み (完了まで待機)"""
+    return self.submit_batchread_bitunits(headdevice, readsize, output).result()
+
+  def batchwrite_wordunits(self, headdevice:str, values):
+    """ワード単位書き込み (完了まで待機)"""
+    return self.submit_batchwrite_wordunits(headdevice, values).result()
+
+  def batchwrite_bitunits(self, headdevice:str, values):
+    """ビット単位書き込み (完了まで待機)"""
+    return self.submit_batchwrite_bitunits(headdevice, values).result()
+
+  # *** (private) I/O スレッド ***
+
+  def _io_loop(self):
+    stopping = False
+    while not stopping:
+      batch = [self._queue.get()]
+      # 同時に溜まっている要求をまとめて取り出す
+      while True:
+        try:
+          batch.append(self._queue.get_nowait())
+        except queue.Empty:
+          break
+      if _STOP in batch:
+        stopping = True
+        stop_at = batch.index(_STOP)
+        rest, batch = batch[stop_at + 1:], batch[:stop_at]
+        for request in rest:
+          if request is not _STOP:
+            request.future.set_exception(ConnectionError("Connection closed"))
+
+      # 書き込みなどをまたがない範囲の読み込み要求ごとに処理
+      reads = []
+      for request in batch:
+        if isinstance(request, _ReadRequest):
+          reads.append(request)
+          continue
+        self._execute_reads(reads)
+        reads = []
+        self._execute_call(request)
+      self._execute_reads(reads)
+
+  def _ensure_connected(self):
+    """送受信エラーで切断した場合は、次の要求の前に再接続"""
+    if self.plc.sock is None:
+      self.plc.connect()
+
+  def _on_error(self, e):
+    # 通信エラー後は遅れて届く応答を次の要求で受信しないよう切断する
+    if isinstance(e, OSError):
+      self.plc.close()
+
+  def _execute_call(self, request):
+    if not request.future.set_running_or_notify_cancel():
+      return
+    try:
+      self._ensure_connected()
+      request.future.set_result(request.func(self.plc))
+    except BaseException as e:
+      self._on_error(e)
+      request.future.set_exception(e)
+
+  def _merge(self, reads):
+    """読み込み要求を結合 -> [{command, devicetype, step, num, end, requests}]"""
+    groups = {}
+    for request in reads:
+      groups.setdefault((request.command, request.devicetype, request.step), []).append(request)
+
+    blocks = []
+    for (command, devicetype, step), requests in groups.items():
+      limit = self.plc.wordread_points if command == const.Command.WORD_READ else self.plc.bitread_points
+      requests.sort(key=lambda r: r.num)
+      block = None
+      for request in requests:
+        if block is not None and self.merge \
+            and (request.num - block["num"]) % step == 0 \
+            and request.num <= block["end"] \
+            and max(block["end"], request.end) - block["num"] <= limit * step:
+          block["end"] = max(block["end"], request.end)
+          block["requests"].append(request)
+        else:
+          block = {"command": command, "devicetype": devicetype, "step": step,
+                   "num": request.num, "end": request.end, "requests": [request]}
+          blocks.append(block)
+    return blocks
+
+  def _execute_reads(self, reads):
+    reads = [r for r in reads if r.future.set_running_or_notify_cancel()]
+    if not reads:
+      return
+
+    for block in self._merge(reads):
+      requests = block["requests"]
+      step = block["step"]
+      size = (block["end"] - block["num"]) // step
+      headdevice = format_device(block["devicetype"], block["num"])
+      self.frames_saved += len(requests) - 1
+      try:
+        self._ensure_connected()
+        raw = self.plc._run(self.plc._proc_batchread(block["command"], headdevice, size))
+        if block["command"] == const.Command.BIT_READ and len(requests) > 1:
+          bits = unpack_nibbles(raw, size)
+      except BaseException as e:
+        self._on_error(e)
+        for request in requests:
+          request.future.set_exception(e)
+        continue
+
+      for request in requests:
+        offset = (request.num - block["num"]) // step
+        try:
+          if block["command"] == const.Command.WORD_READ:
+            data = bytes(raw[offset * 2:(offset + request.size) * 2])
+          elif len(requests) > 1:
+            data = pack_nibbles(bits[offset:offset + request.size])
+          else:
+            data = bytes(raw)
+
+          if request.output == "raw":
+            result = data
+          elif block["command"] == const.Command.WORD_READ:
+            result = self.plc._decode_wordunits(data, request.size, request.output, request.signed)
+          else:
+            result = self.plc._decode_bitunits(data, request.size, request.output)
+          request.future.set_result(result)
+        except BaseException as e:
+          request.future.set_exception(e)
@@ -0,0 +1,313 @@
+"""FXシリーズ PLC シミュレータ (1Eフレーム, バイナリ)
+
+DeviceConstants の全デバイスについてメモリイメージを持ち、
+ワード/ビット単位の一括読み書きに応答します。
+テストや負荷計測をPLCなしで実行するためのものです。
+
+  - 存在しないデバイス・範囲外・点数誤りには 1E の終了コードで応答
+  - 応答遅延 (latency) を設定可能
+  - スレッド (start/stop) もしくは asyncio (start_async) で同一プロセス内で動作
+
+Example:
+  with PLCSimulator() as sim:
+    sim.set_words("D100", [1, 2, 3])
+    with Type1E(*sim.address) as plc:
+      plc.batchread_wordunits("D100", 3)   # -> [1, 2, 3]
+"""
+from array import array
+import asyncio
+import socket
+import socketserver
+import sys
+import threading
+import time
+
+from pymcprotocol_fxseries.type1e_frame import (
+  get_request_data_size,
+  pack_nibbles,
+  parse_request_header,
+  unpack_nibbles
+)
+from pymcprotocol_fxseries.utility import parse_device, recv_exact
+import pymcprotocol_fxseries.type1e_const as const
+
+class _ThreadingServer(socketserver.ThreadingTCPServer):
+  daemon_threads = True
+  allow_reuse_address = True
+
+class _RequestHandler(socketserver.BaseRequestHandler):
+  def handle(self):
+    simulator = self.server.simulator
+    with simulator._lock:
+      simulator._connections.add(self.request)
+    try:
+      while True:
+        header = recv_exact(self.request, const.REQUEST_HEADER_SIZE)
+        command, *_, size = parse_request_header(header)
+        data = recv_exact(self.request, get_request_data_size(command, size))
+        if simulator.latency:
+          time.sleep(simulator.latency)
+        self.request.sendall(simulator.handle_request(header + data))
+    except (EOFError, OSError):
+      pass
+    finally:
+      with simulator._lock:
+        simulator._connections.discard(self.request)
+
+class PLCSimulator:
+  """FXシリーズ PLC シミュレータ
+
+  Args:
+    host(str):            待ち受けアドレス
+    port(int):            待ち受けポート (0 の場合は空きポートを自動で割り当て)
+    latency(float):       応答遅延 (秒)
+    device_points(dict):  デバイス点数の上書き (ex: {"D": 1000})
+
+  Attributes:
+    memory(dict):         デバイス種類 -> メモリイメージ
+                          (ワードデバイス: array('H'), ビットデバイス: bytearray 1点1バイト)
+    request_count(int):   処理したリクエスト数
+  """
+
+  def __init__(self
+    , host: str="127.0.0.1"
+    , port: int=0
+    , latency: float=0.0
+    , device_points: dict=None
+  ):
+    self.host = host
+    self.port = port
+    self.latency = latency
+
+    points = dict(const.DeviceConstants.DEVICE_POINTS)
+    points.update(device_points or {})
+    self.memory = {}
+    for devicetype, size in points.items():
+      if const.DeviceConstants.is_bit_device(devicetype):
+        self.memory[devicetype] = bytearray(size)
+      else:
+        self.memory[devicetype] = array("H", bytes(size * 2))
+
+    self.request_count = 0
+    self._lock = threading.Lock()
+    self._server = None
+    self._thread = None
+    self._async_server = None
+    self._connections = set()
+
+  # *** (public) メモリ操作 ***
+
+  def _locate(self, device:str, size:int):
+    devicetype, num = parse_device(device)
+    memory = self.memory.get(devicetype)
+    if memory is None:
+      raise const.DeviceCodeError(devicetype)
+    if num + size > len(memory):
+      raise ValueError(f"{device} + {size} points exceeds device range ({len(memory)})")
+    return memory, num
+
+  def get_words(self, headdevice:str, size:int) -> list[int]:
+    """ワードデバイスの値を取得 (符号なし)"""
+    memory, num = self._locate(headdevice, size)
+    with self._lock:
+      return list(memory[num:num + size])
+
+  def set_words(self, headdevice:str, values:list[int]):
+    """ワードデバイスの値を設定"""
+    memory, num = self._locate(headdevice, len(values))
+    with self._lock:
+      memory[num:num + len(values)] = array("H", (v & 0xFFFF for v in values))
+
+  def get_bits(self, headdevice:str, size:int) -> list[int]:
+    """ビットデバイスの値を取得"""
+    memory, num = self._locate(headdevice, size)
+    with self._lock:
+      return list(memory[num:num + size])
+
+  def set_bits(self, headdevice:str, values:list[int]):
+    """ビットデバイスの値を設定"""
+    memory, num = self._locate(headdevice, len(values))
+    with self._lock:
+      memory[num:num + len(values)] = bytes(1 if v else 0 for v in values)
+
+  # *** (public) フレーム処理 ***
+
+  def handle_request(self, frame:bytes) -> bytes:
+    """リクエストフレームを処理し、応答フレームを返す
+
+    Args:
+      frame(bytes): リクエストフレーム (ヘッダ + 書き込みデータ)
+
+    Returns:
+      response(bytes): 応答フレーム [サブヘッダ] [終了コード] [応答データ]
+    """
+    command, _, _, num, devicecode, size = parse_request_header(frame)
+    sub_header = (command | 0x80) & 0xFF
+    with self._lock:
+      self.request_count += 1
+      end_code, answer = self._process(command, num, devicecode, size,
+        frame[const.REQUEST_HEADER_SIZE:])
+    return bytes([sub_header, end_code]) + answer
+
+  def _process(self, command:int, num:int, devicecode:int, size:int, data:bytes):
+    if command not in (const.Command.BIT_READ, const.Command.WORD_READ,
+                       const.Command.BIT_WRITE, const.Command.WORD_WRITE):
+      return const.EndCode.COMMAND_ERROR, b""
+
+    try:
+      devicetype = const.DeviceConstants.get_devicename(devicecode)
+    except const.DeviceCodeError:
+      return const.EndCode.DEVICE_ERROR, b""
+    memory = self.memory.get(devicetype)
+    if memory is None:
+      return const.EndCode.DEVICE_ERROR, b""
+
+    is_bit_device = const.DeviceConstants.is_bit_device(devicetype)
+    is_word_access = command in (const.Command.WORD_READ, const.Command.WORD_WRITE)
+    if not is_word_access and not is_bit_device:
+      # ワードデバイスはビット単位でアクセスできない
+      return const.EndCode.DEVICE_ERROR, b""
+
+    span = size * 16 if is_word_access and is_bit_device else size
+    if num + span > len(memory):
+      return const.EndCode.RANGE_ERROR, b""
+    if len(data) < get_request_data_size(command, size):
+      return const.EndCode.SIZE_ERROR, b""
+
+    if command == const.Command.WORD_READ:
+      if is_bit_device:
+        words = array("H", (_bits_to_word(memory, num + i * 16) for i in range(size)))
+      else:
+        words = memory[num:num + size]
+      return const.EndCode.NORMAL, _words_to_bytes(words)
+
+    elif command == const.Command.BIT_READ:
+      return const.EndCode.NORMAL, pack_nibbles(memory[num:num + size])
+
+    elif command == const.Command.WORD_WRITE:
+      words = _bytes_to_words(data[:size * 2])
+      if is_bit_device:
+        for i, word in enumerate(words):
+          _word_to_bits(memory, num + i * 16, word)
+      else:
+        memory[num:num + size] = words
+      return const.EndCode.NORMAL, b""
+
+    bits = unpack_nibbles(data, size)
+    memory[num:num + size] = bits.translate(_BIT_MASK)
+    return const.EndCode.NORMAL, b""
+
+  # *** (public) サーバ ***
+
+  @property
+  def address(self):
+    """待ち受けアドレス (host, port)"""
+    if self._server is not None:
+      return self._server.server_address[:2]
+    if self._async_server is not None:
+      return self._async_server.sockets[0].getsockname()[:2]
+    return self.host, self.port
+
+  def start(self):
+    """別スレッドで待ち受けを開始"""
+    if self._server is not None:
+      return self
+    self._server = _ThreadingServer((self.host, self.port), _RequestHandler)
+    self._server.simulator = self
+    self._thread = threading.Thread(target=self._server.serve_forever,
+      kwargs={"poll_interval": 0.05}, name="PLCSimulator", daemon=True)
+    self._thread.start()
+    return self
+
+  @property
+  def connection_count(self) -> int:
+    """接続中のクライアント数"""
+    with self._lock:
+      return len(self._connections)
+
+  def disconnect_clients(self, count:int=None) -> int:
+    """接続中のクライアントを切断 (PLC 側からの切断の再現用)
+
+    Args:
+      count(int): 切断する接続数 (None の場合は全て)
+
+    Returns:
+      (int): 切断した接続数
+    """
+    with self._lock:
+      connections = list(self._connections)
+    if count is not None:
+      connections = connections[:count]
+    for conn in connections:
+      try:
+        conn.shutdown(socket.SHUT_RDWR)
+      except OSError:
+        # 切断処理中の接続
+        pass
+    return len(connections)
+
+  def stop(self):
+    """待ち受けを停止し、接続中のクライアントを切断"""
+    if self._server is None:
+      return
+    self._server.shutdown()
+    self._server.server_close()
+    self.disconnect_clients()
+    self._thread.join()
+    self._server = None
+    self._thread = None
+
+  def __enter__(self):
+    return self.start()
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    self.stop()
+
+  async def start_async(self):
+    """asyncio で待ち受けを開始
+
+    Returns:
+      server(asyncio.Server): 停止時は server.close() / await server.wait_closed()
+    """
+    self._async_server = await asyncio.start_server(self._handle_stream, self.host, self.port)
+    return self._async_server
+
+  async def _handle_stream(self, reader, writer):
+    try:
+      while True:
+        header = await reader.readexactly(const.REQUEST_HEADER_SIZE)
+        command, *_, size = parse_request_header(header)
+        data = await reader.readexactly(get_request_data_size(command, size))
+        if self.latency:
+          await asyncio.sleep(self.latency)
+        writer.write(self.handle_request(header + data))
+        await writer.drain()
+    except (asyncio.IncompleteReadError, OSError):
+      pass
+    finally:
+      writer.close()
+
+# 1点1バイト -> 0 or 1
+_BIT_MASK = bytes(b & 0x01 for b in range(256))
+
+def _words_to_bytes(words:array) -> bytes:
+  if sys.byteorder != "little":
+    words = array("H", words)
+    words.byteswap()
+  return words.tobytes()
+
+def _bytes_to_words(data:bytes) -> array:
+  words = array("H")
+  words.frombytes(data)
+  if sys.byteorder != "little":
+    words.byteswap()
+  return words
+
+def _bits_to_word(memory:bytearray, num:int) -> int:
+  word = 0
+  for i, bit in enumerate(memory[num:num + 16]):
+    word |= (bit & 0x01) << i
+  return word
+
+def _word_to_bits(memory:bytearray, num:int, word:int):
+  memory[num:num + 16] = bytes((word >> i) & 0x01 for i in range(16))
@@ -2,7 +2,11 @@
 import socket
 import time
 
+from pymcprotocol_fxseries.resilience import backoff_delay
+
 class SockBase:
+  SOCKBUFSIZE = 4096
+
   def __init__(self
     , ip: str=None
     , port: int=None
@@ -14,6 +18,8 @@ class SockBase:
     self.soc_timeout = timeout
 
     self.sock = None
+    # 受信バッファ (接続ごとに確保し、受信のたびに再利用する)
+    self._recv_buf = bytearray(self.SOCKBUFSIZE)
 
   def _do_connect(self, ip: str, port: int, timeout: int):
     """実際のTCP接続処理（内部専用）"""
@@ -54,15 +60,19 @@ class SockBase:
     self._do_connect(ip, port, timeout)
 
   def force_connect(self, ip: str = None, port: int = None, timeout: int = None
-    , retries: int = 3, delay: float = 1.0
+    , retries: int = 3, delay: float = 1.0, max_delay: float = 30.0, jitter: float = 0.5
   ):
     """
     強制接続。接続失敗時にリトライします。
+    リトライ間隔は指数バックオフ (delay, delay*2, delay*4, ... 最大 max_delay) で、
+    複数クライアントの再接続が重ならないよう jitter の割合だけランダムに短くします。
 
     Args:
       ip, port, timeout: connect() と同様
       retries(int): リトライ回数
-      delay(float): リトライ間隔 (秒)
+      delay(float): 初回のリトライ間隔 (秒)
+      max_delay(float): リトライ間隔の上限 (秒)
+      jitter(float): リトライ間隔をランダムに減らす割合 (0 ~ 1)
     """
     ip = ip or self.soc_ip
     port = port or self.soc_port
@@ -76,10 +86,46 @@ class SockBase:
       except ConnectionError as e:
         last_exc = e
         self.close()
-        time.sleep(delay)
+        if attempt < retries:
+          time.sleep(backoff_delay(attempt - 1, delay, max_delay, jitter))
     
     raise ConnectionError(f"force_connect failed after {retries} attempts: {last_exc}")
 
+  def _recv_exact(self, size: int, start: int=0) -> memoryview:
+    """受信バッファの start 位置から size バイトちょうど受信します。
+
+    TCPで応答が分割されて届いても、指定サイズがそろうまで recv_into で受信を続けます。
+    返り値は受信バッファのビューであり、次の受信で上書きされます。
+
+    Args:
+      size (int): 受信するバイト数
+      start (int, optional): 受信バッファ上の格納開始位置
+
+    Returns:
+      memoryview: 受信バッファ [0:start+size] のビュー
+
+    Raises:
+      ConnectionError: 未接続、または受信途中で接続が切断された場合。
+    """
+    if not self.sock:
+      raise ConnectionError("Socket is not connected. Please use connect method")
+
+    end = start + size
+    if end > len(self._recv_buf):
+      # 既存のビューを壊さないよう、拡張時は新しいバッファを確保する
+      new_buf = bytearray(max(end, len(self._recv_buf) * 2))
+      new_buf[:start] = self._recv_buf[:start]
+      self._recv_buf = new_buf
+
+    view = memoryview(self._recv_buf)
+    pos = start
+    while pos < end:
+      nbytes = self.sock.recv_into(view[pos:end], end - pos)
+      if nbytes == 0:
+        raise ConnectionError("Connection closed by peer")
+      pos += nbytes
+    return view[:end]
+
   def close(self):
     """PLCとの通信切断
     """
@@ -0,0 +1,151 @@
+"""変化検出サブスクリプション
+
+登録したデバイスを読み込みプランで読み込み、前回から変化した点のみを返します。
+
+  - ブロック単位で受信データ (bytes) を前回と比較し、変化のないブロックはデコードしない
+  - ワードブロックは点ごとの受信データを比較し、変化した点のみデコードする
+  - デバイスごとに不感帯 (絶対値 / 前回通知値に対する%) を設定できる
+
+Example:
+  sub = Subscription(plc, callback=publish)
+  sub.add("D100", deadband=5)
+  sub.add_range("D200", 50, deadband_pct=1.0)
+  sub.add("M0")
+  while True:
+    changes = sub.poll()  # {"D100": 123, ...} 変化した点のみ
+"""
+from pymcprotocol_fxseries.read_plan import ReadPlan
+from pymcprotocol_fxseries.utility import expand_devices
+import pymcprotocol_fxseries.type1e_const as const
+
+class _Tag:
+  __slots__ = ("device", "offset", "deadband", "deadband_pct", "value")
+
+  def __init__(self, device, deadband, deadband_pct):
+    self.device = device
+    self.offset = 0
+    self.deadband = deadband
+    self.deadband_pct = deadband_pct
+    self.value = None   # 最後に通知した値
+
+  def exceeds(self, value):
+    """前回通知値から不感帯を超えて変化したか"""
+    last = self.value
+    if last is None:
+      return True
+    diff = abs(value - last)
+    if diff == 0:
+      return False
+    if self.deadband_pct is not None:
+      return diff > abs(last) * self.deadband_pct / 100
+    return diff > self.deadband
+
+class Subscription:
+  """変化検出サブスクリプション
+
+  Args:
+    plc(Type1E | AsyncType1E): 接続済みクライアント
+    gap(int):                  読み込みプランのブロック連結閾値 (ReadPlan 参照)
+    callback:                  変化通知コールバック callback(changes: dict[str, int])
+                               (変化がない場合は呼ばれない)
+  """
+
+  def __init__(self, plc, gap:int=8, callback=None):
+    self.plc = plc
+    self.gap = gap
+    self.callback = callback
+
+    self._tags = {}
+    self._plan = None
+    self._block_tags = []
+    self._prev_raws = []
+
+  def add(self, device:str, deadband:int=0, deadband_pct:float=None):
+    """デバイス登録
+
+    Args:
+      device(str):         デバイス名 (ex: "D100")
+      deadband(int):       不感帯 (絶対値)。前回通知値との差がこれを超えたら通知
+      deadband_pct(float): 不感帯 (前回通知値に対する%)。指定時は deadband より優先
+    """
+    self._tags[device] = _Tag(device, deadband, deadband_pct)
+    self._plan = None
+
+  def add_range(self, headdevice:str, size:int, deadband:int=0, deadband_pct:float=None):
+    """連続デバイス登録 (add 参照)"""
+    for device in expand_devices([(headdevice, size)]):
+      self.add(device, deadband, deadband_pct)
+
+  def remove(self, device:str):
+    """デバイス登録解除"""
+    del self._tags[device]
+    self._plan = None
+
+  def _compile(self):
+    plan = ReadPlan(list(self._tags), gap=self.gap,
+      wordread_points=self.plc.wordread_points, bitread_points=self.plc.bitread_points)
+    block_tags = [[] for _ in plan.blocks]
+    for tag in self._tags.values():
+      block_no, tag.offset = plan.locate(tag.device)
+      block_tags[block_no].append(tag)
+
+    self._plan = plan
+    self._block_tags = block_tags
+    self._prev_raws = [None] * len(plan.blocks)
+
+  def _detect(self, raws):
+    """受信データから変化した点を検出"""
+    changes = {}
+    wordsize = self.plc.wordsize
+    for block_no, raw in enumerate(raws):
+      prev = self._prev_raws[block_no]
+      if prev == raw:
+        continue
+      self._prev_raws[block_no] = raw
+
+      block = self._plan.blocks[block_no]
+      if block.command == const.Command.WORD_READ:
+        for tag in self._block_tags[block_no]:
+          pos = tag.offset * wordsize
+          point_raw = raw[pos:pos + wordsize]
+          if prev is not None and prev[pos:pos + wordsize] == point_raw:
+            continue
+          value = self.plc._decode_value(point_raw, 2, isSigned=True)
+          if tag.exceeds(value):
+            tag.value = value
+            changes[tag.device] = value
+      else:
+        values = self.plc._decode_bitunits(raw, block.size)
+        for tag in self._block_tags[block_no]:
+          value = values[tag.offset]
+          if tag.value != value:
+            tag.value = value
+            changes[tag.device] = value
+
+    if changes and self.callback is not None:
+      self.callback(changes)
+    return changes
+
+  def _proc_poll(self):
+    if self._plan is None:
+      self._compile()
+    raws = yield from self._plan._proc_read_raw(self.plc)
+    return self._detect(raws)
+
+  def poll(self):
+    """読み込み、前回通知から変化した点を返す
+    初回は全点を返します。
+
+    Returns:
+      changes(dict[str, int]): デバイス名 -> 値 (変化した点のみ)
+        ※ AsyncType1E の場合は await すること
+    """
+    return self.plc._run(self._proc_poll())
+
+  def values(self):
+    """最後に通知した値
+
+    Returns:
+      (dict[str, int]): デバイス名 -> 値
+    """
+    return {device: tag.value for device, tag in self._tags.items()}
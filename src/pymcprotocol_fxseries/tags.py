@@ -0,0 +1,313 @@
+"""タグデータベース
+
+タグ (名前・デバイス・データ型・スケーリング) を CSV から読み込み、
+DeviceConstants のデバイス範囲で検証したうえで、最小限のブロック読み込みにまとめます。
+読み込み結果は、事前に計算したオフセットを使って1回のループで タグ名 -> 値 に変換します。
+
+CSV (GX Works からのエクスポートを想定):
+  ヘッダ行の列名で列を判定します (ヘッダ行より前の行は無視)。
+    名前:       "name", "label", "label name", "tag", "ラベル名", "タグ名"
+    デバイス:   "device", "device name", "address", "デバイス", "デバイス名"
+    データ型:   "data type", "datatype", "type", "dtype", "データ型"   (省略時: ワードデバイスは int16, ビットデバイスは bool)
+    倍率:       "scale", "scaling", "倍率"
+    オフセット: "offset", "オフセット"
+    コメント:   "comment", "コメント"
+  データ型は DATATYPES の型名のほか、GX Works / IEC の型名 (INT, DINT, REAL, "Word[Signed]" など) を使用できます。
+  GX Works2 のエクスポートは Shift-JIS のため、encoding="cp932" を指定してください。
+
+Example:
+  tags = TagDatabase.from_csv("tags.csv", encoding="cp932")
+  values = tags.read(plc)               # Type1E
+  values = await tags.read(async_plc)   # AsyncType1E
+  # -> {"Tank1.Level": 12.5, "Pump1.Run": True, ...}
+"""
+import csv
+import io
+import os
+import struct
+
+from pymcprotocol_fxseries import datatype
+from pymcprotocol_fxseries.read_plan import ReadPlan
+from pymcprotocol_fxseries.utility import format_device, parse_device
+import pymcprotocol_fxseries.type1e_const as const
+
+BOOL = "bool"
+
+# GX Works / IEC の型名 (小文字) -> 型名
+DATATYPE_ALIASES = {
+  "bit": BOOL,
+  "bool": BOOL,
+  "int": "int16",
+  "word[signed]": "int16",
+  "uint": "uint16",
+  "word": "uint16",
+  "word[unsigned]/bit string[16-bit]": "uint16",
+  "dint": "int32",
+  "double word[signed]": "int32",
+  "udint": "uint32",
+  "dword": "uint32",
+  "double word[unsigned]/bit string[32-bit]": "uint32",
+  "real": "float32",
+  "float (single precision)": "float32",
+  "lreal": "float64",
+  "float (double precision)": "float64",
+}
+
+_COLUMNS = {
+  "name": ("name", "label", "label name", "tag", "tag name", "ラベル名", "タグ名"),
+  "device": ("device", "device name", "address", "デバイス", "デバイス名"),
+  "dtype": ("data type", "datatype", "type", "dtype", "データ型"),
+  "scale": ("scale", "scaling", "倍率"),
+  "offset": ("offset", "オフセット"),
+  "comment": ("comment", "コメント"),
+}
+
+def normalize_dtype(dtype:str) -> str:
+  """データ型名を DATATYPES の型名 (もしくは "bool") に変換
+
+  Raises:
+    ValueError: 未対応の型の場合。
+  """
+  name = dtype.strip()
+  name = DATATYPE_ALIASES.get(name.lower(), name.lower())
+  if name != BOOL:
+    datatype.get_wordcount(name)
+  return name
+
+class Tag:
+  """タグ
+
+  Attributes:
+    name(str):     タグ名
+    device(str):   デバイス名 (ex: "D100")
+    dtype(str):    データ型 (DATATYPES の型名、もしくは "bool")
+    scale(float):  倍率 (None の場合はスケーリングしない)
+    offset(float): オフセット (値 = 生値 * scale + offset)
+    comment(str):  コメント
+  """
+  __slots__ = ("name", "device", "dtype", "scale", "offset", "comment")
+
+  def __init__(self, name:str, device:str, dtype:str, scale:float=None, offset:float=None, comment:str=""):
+    self.name = name
+    self.device = device
+    self.dtype = dtype
+    self.scale = scale
+    self.offset = offset
+    self.comment = comment
+
+  @property
+  def width(self) -> int:
+    """占有する点数 (ワード数)"""
+    return 1 if self.dtype == BOOL else datatype.get_wordcount(self.dtype)
+
+  def __repr__(self):
+    return f"Tag({self.name!r}, {self.device}, {self.dtype})"
+
+class TagDatabase:
+  """タグデータベース
+
+  Args:
+    tags(list[Tag]):  タグ
+    gap(int):         ブロックを連結する最大の空き点数 (ReadPlan 参照)
+    wordorder(str):   複数ワードの型のワード順 ("little" もしくは "big")
+    wordread_points(int), bitread_points(int): ブロックの点数上限 (ReadPlan 参照)
+  """
+
+  def __init__(self
+    , tags: list=None
+    , gap: int=8
+    , wordorder: datatype.WordOrder="little"
+    , wordread_points: int=None
+    , bitread_points: int=None
+  ):
+    datatype._check_wordorder(wordorder)
+    self.gap = gap
+    self.wordorder = wordorder
+    self.wordread_points = wordread_points
+    self.bitread_points = bitread_points
+
+    self.tags = {}
+    self._plan = None
+    self._decoders = None
+    for tag in tags or ():
+      self.add(tag.name, tag.device, tag.dtype, tag.scale, tag.offset, tag.comment)
+
+  # *** (public) タグ登録 ***
+
+  def add(self, name:str, device:str, dtype:str=None, scale:float=None, offset:float=None, comment:str="") -> Tag:
+    """タグを追加 (デバイス種類・範囲・データ型を検証)
+
+    Args:
+      dtype(str): データ型 (省略時: ワードデバイスは int16, ビットデバイスは bool)
+
+    Raises:
+      ValueError: タグ名の重複、不正なデバイス・範囲・データ型の場合。
+    """
+    if not name:
+      raise ValueError("Tag name is empty")
+    if name in self.tags:
+      raise ValueError(f"Duplicate tag name: {name}")
+
+    devicetype, num = parse_device(device)
+    try:
+      const.DeviceConstants.get_binary_devicecode(devicetype)
+    except const.DeviceCodeError:
+      raise ValueError(f"{name}: unsupported device {device!r}")
+    is_bit_device = const.DeviceConstants.is_bit_device(devicetype)
+
+    dtype = normalize_dtype(dtype) if dtype else (BOOL if is_bit_device else "int16")
+    if is_bit_device != (dtype == BOOL):
+      raise ValueError(f"{name}: {dtype} is not supported for device {device}")
+
+    tag = Tag(name, device, dtype, scale, offset, comment)
+    points = const.DeviceConstants.DEVICE_POINTS.get(devicetype)
+    if points is not None and num + tag.width > points:
+      raise ValueError(f"{name}: {device} ({dtype}) exceeds device range ({devicetype}0 ~ {format_device(devicetype, points - 1)})")
+
+    self.tags[name] = tag
+    self._plan = None
+    return tag
+
+  @classmethod
+  def from_csv(cls, source, encoding:str="utf-8-sig", **kwargs) -> "TagDatabase":
+    """CSV からタグデータベースを作成
+
+    Args:
+      source: ファイルパス、もしくはテキストのファイルオブジェクト
+      encoding(str): 文字コード (ファイルパス指定時)
+      **kwargs: TagDatabase の引数
+    """
+    database = cls(**kwargs)
+    database.load_csv(source, encoding)
+    return database
+
+  def load_csv(self, source, encoding:str="utf-8-sig"):
+    """CSV (タブ区切りも可) からタグを追加
+
+    Raises:
+      ValueError: ヘッダ行が見つからない、もしくは不正な行がある場合 (行番号を含む)。
+    """
+    if isinstance(source, (str, os.PathLike)):
+      with open(source, encoding=encoding, newline="") as f:
+        return self.load_csv(f)
+
+    text = source.read()
+    try:
+      dialect = csv.Sniffer().sniff(text[:4096], delimiters=",\t")
+    except csv.Error:
+      dialect = csv.excel
+    columns = None
+    for line_no, row in enumerate(csv.reader(io.StringIO(text), dialect), 1):
+      cells = [cell.strip() for cell in row]
+      if columns is None:
+        columns = _find_columns(cells)
+        continue
+      if not any(cells):
+        continue
+
+      def cell(key):
+        index = columns.get(key)
+        return cells[index] if index is not None and index < len(cells) else ""
+
+      try:
+        scale = float(cell("scale")) if cell("scale") else None
+        offset = float(cell("offset")) if cell("offset") else None
+        self.add(cell("name"), cell("device"), cell("dtype") or None, scale, offset, cell("comment"))
+      except ValueError as e:
+        raise ValueError(f"line {line_no}: {e}")
+
+    if columns is None:
+      raise ValueError("Header row (name, device) not found")
+
+  def __len__(self):
+    return len(self.tags)
+
+  def __iter__(self):
+    return iter(self.tags.values())
+
+  def __getitem__(self, name:str) -> Tag:
+    return self.tags[name]
+
+  # *** (public) 読み込み ***
+
+  @property
+  def plan(self) -> ReadPlan:
+    """全タグの読み込みプラン (タグ追加後の最初の参照時に作成)"""
+    if self._plan is None:
+      self._compile()
+    return self._plan
+
+  def _compile(self):
+    tags = list(self.tags.values())
+    devices = [tag.device for tag in tags]
+    # 同じ先頭デバイスのタグは最も幅の広いものに合わせる
+    widths = {}
+    for tag in tags:
+      if tag.width > widths.get(tag.device, 1):
+        widths[tag.device] = tag.width
+    plan = ReadPlan(devices, self.gap, self.wordread_points, self.bitread_points, widths)
+
+    # タグごとに (タグ名, ブロック番号, バイト位置, 変換方法, 倍率, オフセット) を事前に計算
+    decoders = []
+    for tag in tags:
+      block_no, offset = plan.locate(tag.device)
+      if tag.dtype == BOOL:
+        # 1バイトに2点 (先頭が上位4bit)
+        decoders.append((tag.name, block_no, offset >> 1, 4 if offset % 2 == 0 else 0, tag.scale, tag.offset))
+      elif tag.dtype.startswith("bcd") or (tag.width > 1 and self.wordorder == "big"):
+        decoders.append((tag.name, block_no, offset * 2, (tag.dtype, tag.width * 2), tag.scale, tag.offset))
+      else:
+        decoders.append((tag.name, block_no, offset * 2, datatype.get_struct(tag.dtype, 1), tag.scale, tag.offset))
+    self._plan = plan
+    self._decoders = decoders
+
+  def decode(self, raws) -> dict:
+    """ブロックごとの受信データを タグ名 -> 値 に変換 (1回のループ)"""
+    if self._plan is None:
+      self._compile()
+    values = {}
+    wordorder = self.wordorder
+    for name, block_no, pos, conv, scale, offset in self._decoders:
+      raw = raws[block_no]
+      if conv.__class__ is struct.Struct:
+        value = conv.unpack_from(raw, pos)[0]
+      elif conv.__class__ is int:
+        value = bool((raw[pos] >> conv) & 0x01)
+      else:
+        dtype, nbytes = conv
+        value = datatype.decode_words(raw[pos:pos + nbytes], dtype, 1, wordorder)[0]
+      if scale is not None:
+        value = value * scale
+      if offset is not None:
+        value = value + offset
+      values[name] = value
+    return values
+
+  def _proc_read(self, frame):
+    """全タグの読み込み手順 (タグ名 -> 値 の辞書を返す)"""
+    raws = yield from self.plan._proc_read_raw(frame)
+    return self.decode(raws)
+
+  def read(self, plc) -> dict:
+    """全タグを読み込む
+
+    Args:
+      plc(Type1E | AsyncType1E): 接続済みクライアント
+
+    Returns:
+      values(dict): タグ名 -> 値 (bool / int / float)
+        ※ AsyncType1E の場合は await すること
+    """
+    return plc._run(self._proc_read(plc))
+
+def _find_columns(cells):
+  """ヘッダ行であれば 列名 -> 列番号 を返す (名前・デバイスの列が必須)"""
+  columns = {}
+  for index, cell in enumerate(cells):
+    label = cell.lower()
+    for key, aliases in _COLUMNS.items():
+      if label in aliases and key not in columns:
+        columns[key] = index
+  if "name" in columns and "device" in columns:
+    return columns
+  return None
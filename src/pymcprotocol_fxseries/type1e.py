@@ -1,21 +1,16 @@
-
-import binascii
+import select
+import time
 from typing import Literal
-import logging
 
+from pymcprotocol_fxseries.capture import FrameCapture
+from pymcprotocol_fxseries.datatype import WordOrder
+from pymcprotocol_fxseries.metrics import MetricsHook
+from pymcprotocol_fxseries.resilience import ReconnectPolicy, RttEstimator
 from pymcprotocol_fxseries.sock_base import SockBase
-from pymcprotocol_fxseries.utility import (
-  twos_comp,
-  get_device_number,
-  get_device_type
-)
+from pymcprotocol_fxseries.type1e_frame import Type1EFrame, WordOutput, BitOutput
 import pymcprotocol_fxseries.type1e_const as const
-import pymcprotocol_fxseries.mcprotocol_error as mcprotocolerror
-
-PC_NO_HEX = 0xFF 
-WATCH_TIMER_VAL = 0x000A # 2500ms
 
-class Type1E(SockBase):
+class Type1E(SockBase, Type1EFrame):
   """ PLC FXシリーズ 通信用モジュール
   
   Default:
@@ -26,19 +21,29 @@ class Type1E(SockBase):
   Public:
     - set_commtype          通信方式
     - set_accessopt:        オプション設定
+    - set_chunksize:        1フレームあたりの点数上限設定
+    - set_metrics:          通信メトリクス (フック) 設定
+    - set_reconnect:        自動再接続・読み込み再送・適応タイムアウト設定
+    - set_capture:          送受信フレームの記録設定
     - batchread_wordunits:  ワード読み込み
     - batchread_bitunits:   ビット読み込み
     - batchwrite_wordunits: ワード書き込み
     - batchwrite_bitunits:  ビット書き込み
+    - batchread_typed:      型指定読み込み (32bit整数・実数・BCD)
+    - batchwrite_typed:     型指定書き込み
+    - batchread_string:     文字列読み込み
+    - batchwrite_string:    文字列書き込み
   """
 
   SOCKBUFSIZE = 4096
-  commtype = const.CommType.BINARY
-  pc = PC_NO_HEX
-  watch_timer = WATCH_TIMER_VAL
-  wordsize = 2
-
-  _debug = False
+  # 通信メトリクス (None の場合は計測しない)
+  metrics = None
+  # 自動再接続 (None の場合は再接続しない) / 往復時間の推定
+  reconnect_policy = None
+  rtt = None
+  # フレームキャプチャ (None の場合は記録しない) / 記録待ちの送信 (送信時刻, 計測開始, フレーム)
+  capture = None
+  _capture_sent = None
 
   def __init__(self
     , ip = None
@@ -47,21 +52,59 @@ class Type1E(SockBase):
 
     , commtype: Literal["binary", "ascii"]=None
   ):
-    super().__init__(ip, port, timeout)
-    
-    self.logger = logging.getLogger(__class__.__name__)
-    handler = logging.StreamHandler()
-    formatter = logging.Formatter("[%(levelname)-8s] %(asctime)s %(name)s: %(message)s")
-    handler.setFormatter(formatter)
-    self.logger.addHandler(handler)
-    self.logger.setLevel(logging.DEBUG if self._debug else logging.INFO)
+    SockBase.__init__(self, ip, port, timeout)
+    Type1EFrame.__init__(self, commtype)
+    self._connect_count = 0
+
+  def set_metrics(self, metrics: MetricsHook=None):
+    """通信メトリクス設定
+
+    送受信ごとに、コマンド・点数・送受信バイト数・終了コードと
+    送信データ作成 / 送信 / 応答待ち / 値変換 の各時間をフックへ通知します。
+    None を指定すると計測を停止します (停止中の計測コストはありません)。
+
+    Args:
+      metrics(MetricsHook): 通知先 (ex: pymcprotocol_fxseries.metrics.Metrics())
+    """
+    self.metrics = metrics
+
+  def set_reconnect(self, policy: ReconnectPolicy=None):
+    """自動再接続設定
+
+    送受信前に切断を検出した場合や、送受信中に切断・タイムアウトした場合に、
+    指数バックオフで再接続します。
+      - 読み込みは再接続後に同じフレームを再送 (policy.retries 回まで)
+      - 書き込みは送信後に失敗した場合は再送せず例外とする (次回の送受信前に再接続)
+      - policy.adaptive_timeout が True の場合、往復時間から読み込みの受信タイムアウトを求める
+        (書き込みは再送しないため、接続時のタイムアウトのまま)
+    None を指定すると無効になります。
+
+    Args:
+      policy(ReconnectPolicy): 再接続設定 (ex: pymcprotocol_fxseries.resilience.ReconnectPolicy())
+    """
+    self.reconnect_policy = policy
+    self.rtt = None
+    if policy is not None and policy.adaptive_timeout:
+      max_timeout = policy.max_timeout or self.soc_timeout
+      self.rtt = RttEstimator(max_timeout, policy.min_timeout, max_timeout)
+
+  def set_capture(self, capture: FrameCapture=None):
+    """送受信フレームの記録設定
 
-    if commtype:
-      self.set_commtype(commtype)
+    送信時刻・応答時間とリクエスト・応答フレームの組を記録します。
+    応答を受信できなかったリクエストは記録しません。None を指定すると記録を停止します。
 
-  def _set_debug(self, stat: bool):
-    self._debug = stat
-    self.logger.setLevel(logging.DEBUG if self._debug else logging.INFO)
+    Args:
+      capture(FrameCapture): 記録先 (ex: pymcprotocol_fxseries.capture.FrameCapture("traffic.fxcap"))
+    """
+    self.capture = capture
+    self._capture_sent = None
+
+  def _do_connect(self, ip: str, port: int, timeout: int):
+    SockBase._do_connect(self, ip, port, timeout)
+    if self.metrics is not None and self._connect_count:
+      self.metrics.on_reconnect()
+    self._connect_count += 1
 
   # *** (private) ソケット ***
 
@@ -71,276 +114,298 @@ class Type1E(SockBase):
     if not self.sock:
         raise ConnectionError("Socket is not connected. Please use connect method")
 
-    if self._debug:
-        hex_data = binascii.hexlify(send_data).decode()
-        self.logger.debug(f"send data({self.commtype}): {hex_data}")
-
-        if self.commtype == const.CommType.ASCII:
-            ascii_chars = "".join(chr(b) for b in send_data)
-            self.logger.debug(f"  ASCII: {ascii_chars}")
-
-    self.sock.send(send_data)
+    self._log_send_data(send_data)
+    if self.capture is not None:
+      self._capture_sent = (time.time(), time.perf_counter(), bytes(send_data))
+    self.sock.sendall(send_data)
 
-  def _recv(self):
+  def _recv(self, command:int, size:int):
     """sockのデータ受信
-    """
-    recv_data = self.sock.recv(self.SOCKBUFSIZE)
-    return recv_data
-  
-  # *** (private) コマンド作成 ***
-  
-  def _encode_value(self, value:int, size:int, byteorder="little"):
-    try:
-      if self.commtype == const.CommType.BINARY:
-        value_byte = value.to_bytes(size, byteorder)
-
-      else:
-        mask = (1 << (size * 8)) - 1
-        value = value & mask
-        hex_str = format(value, "0{}X".format(size * 2))
-        value_byte = hex_str.encode()
-    except:
-      raise ValueError("Exceeeded Device value range")
-  
-    return value_byte
-  
-  def _decode_value(self, byte:bytes, size:int, byteorder="little"):
-    try:
-      if self.commtype == const.CommType.BINARY:
-        value = int.from_bytes(byte, byteorder)
-      else:
-        value = int(byte.decode(), 16)
-        if byteorder == "big":
-          value = twos_comp(value, size)
-    except:
-      raise ValueError("Could not decode byte to value")
-    
-    return value
-
-  def _make_device_data(self, device:str):
-    """デバイス名 + 先頭デバイス作成
+    コマンドと点数から応答長を求め、1フレーム分そろうまで受信します。
 
     Args:
-      device(str): デバイス. (ex: "D1000", "Y1")
+      command(int): 送信したサブヘッダ番号
+      size(int):    送信したデバイス点数
 
     Returns:
-      device_data(bytes): デバイスデータ
+      recv_data(memoryview): 応答フレーム (受信バッファのビュー、次の受信で上書き)
     """
-    device_data = bytes()
-
-    # デバイス種類取得
-    device_type = get_device_type(device)
-    # デバイス番号取得
-    device_num = int(get_device_number(device))
-
-    if self.commtype == const.CommType.BINARY:
-      # デバイス番号コード取得
-      device_code = const.DeviceConstants.get_binary_devicecode(device_type)
-      
-      device_data += device_num.to_bytes(4, "little") # 4byte
-      device_data += device_code.to_bytes(2, "little")
-
-    else:
-      # デバイス番号コード取得
-      device_code = const.DeviceConstants.get_ascii_devicecode(device_type)
-      device_num = const.int2hexStr(device_num) # int -> hex -> str -> "0x"を除去
-
-      device_data += device_code.encode()
-      device_data += device_num.rjust(8, "0").upper().encode()
-    
-    return device_data
+    index = self._get_answerdata_index()
+    recv_data = self._recv_exact(index)
+
+    remain_size = self._get_remain_size(recv_data, command, size)
+    if remain_size:
+      recv_data = self._recv_exact(remain_size, index)
+    if self.capture is not None and self._capture_sent is not None:
+      timestamp, started, request = self._capture_sent
+      self._capture_sent = None
+      self.capture.record(timestamp, time.perf_counter() - started, request, recv_data)
+    return recv_data
 
-  def _make_send_data(self, command:int, device:str, size:int):
-    """送信データ作成
-      [サブヘッダ] [PC番号] [監視タイマ] [先頭デバイス] [デバイス点数] [終了コード]
+  def _request(self, send_data:bytes, command:int, size:int):
+    """1フレーム送受信し、応答データ部を返す
 
     Args:
-      command(int):      サブヘッダ番号
-      device(str):       デバイス名 (ex: "D1000")
-      size(int):         データ数
+      send_data(bytes): 送信データ
+      command(int):     サブヘッダ番号
+      size(int):        デバイス点数
 
     Returns:
-      mc_data(bytes): 送信データ
+      answer_data(memoryview): 応答データ (サブヘッダ・終了コードを除く)
+        ※ 受信バッファのビューのため、次の送受信までにコピーすること
     """
-    mc_data = bytes()
-
-    mc_data += self._encode_value(command, 1)           # サブヘッダ
-    mc_data += self._encode_value(self.pc, 1)           # PC番号
-    mc_data += self._encode_value(self.watch_timer, 2)  # 監視タイマ
-    mc_data += self._make_device_data(device)           # 先頭デバイス
-    mc_data += self._encode_value(size, 1)              # デバイス点数
-    mc_data += self._encode_value(const.END_CODE, 1)    # 終了コード
-
-    return mc_data
-
-  def _get_answerdata_index(self):
-    index = 2 if self.commtype == const.CommType.BINARY else 4
-    return index
-
-  def _check_cmd_answer(self, recv_data):
-    index = self._get_answerdata_index()
-
-    #   0x00         0x00      0x00 0x00...
-    # [subheader] [end code] [char response...]
-    status = self._decode_value(recv_data[0:index], 2, "big")
-    # 0x80がレスポンス番号 0x0~がコマンド番号
-    sub_header = status >> 8 & 0xFF
-    end_code =   status & 0xFF
-    # mcprotocolerror.check_mcprotocol_error(status)
-    if end_code != 0x00:
-      raise mcprotocolerror.MCProtocolError(status)
-    return None
+    self._send(send_data)
+    recv_data = self._recv(command, size)
+    self._check_cmd_answer(recv_data)
+    return recv_data[self._get_answerdata_index():]
 
-  # *** (public) PLC通信 ***
+  def _is_broken(self):
+    """送信前の接続確認 (待機中に受信可能 = 切断、もしくは不要な受信データが残っている)"""
+    try:
+      readable, _, _ = select.select([self.sock], [], [], 0)
+    except (OSError, ValueError):
+      return True
+    return bool(readable)
+
+  def _reconnect(self):
+    """指数バックオフで再接続"""
+    policy = self.reconnect_policy
+    last_exc = None
+    for attempt in range(policy.connect_retries):
+      if attempt:
+        time.sleep(policy.backoff(attempt - 1))
+      try:
+        self.connect()
+        return
+      except ConnectionError as e:
+        last_exc = e
+    raise ConnectionError(f"Reconnect failed after {policy.connect_retries} attempts: {last_exc}")
 
-  def set_commtype(self, commtype: str):
-    """通信方式変更
+  def _retry(self, exchange, command:int):
+    """1フレームの送受信 exchange() を自動再接続付きで実行
 
-    Args:
-      commtype(str): "binary" もしくは "ascii"
+    送受信途中のエラーでは応答の残りが届く可能性があるため、必ず切断してから再接続します。
     """
-    if commtype == "binary":
-      self.commtype = const.CommType.BINARY
-      self.wordsize = 2
-    elif commtype == "ascii":
-      raise ValueError("\"ascii\"による通信は、まだ、未搭載です。")
-      
-      self.commtype = const.CommType.ASCII
-      self.wordsize = 4
-    else:
-      raise const.CommTypeError()
-
-  def set_accessopt(self
-    , commtype: str=None
-    , pc :int=None
-    , watch_timer: int=None
-  ):
-    """通信オプション
-    
+    retries = self.reconnect_policy.retries
+    is_read = command in (const.Command.BIT_READ, const.Command.WORD_READ)
+    attempt = 0
+    while True:
+      if self.sock is None or self._is_broken():
+        # 送信前に検出した切断は、書き込みでも再接続して送信してよい
+        self.close()
+        self._reconnect()
+
+      # 適応タイムアウトは再送できる読み込みのみ
+      rtt = self.rtt if is_read else None
+      if self.rtt is not None:
+        self.sock.settimeout(self.soc_timeout if rtt is None else rtt.timeout)
+      started = time.perf_counter()
+      try:
+        result = exchange()
+      except OSError as e:
+        self.close()
+        if rtt is not None and isinstance(e, TimeoutError):
+          rtt.on_timeout()
+        if not is_read or attempt >= retries:
+          raise
+        attempt += 1
+        continue
+      if rtt is not None:
+        rtt.update(time.perf_counter() - started)
+      return result
+
+  def _run(self, procedure):
+    """送受信手順 (Type1EFrame._proc_*) を実行
+
     Args:
-      commtype(str):    "binary"もしくは、"ascii" (デフォルト:"binary")
-      pc(int):          いや、お前なんなん
-      watch_timer(int): PLC通信時のレスポンス待機時間
+      procedure(generator): 送受信手順
 
+    Returns:
+      手順の戻り値
     """
-    if commtype:
-      self.set_commtype(commtype)
+    if self.metrics is not None:
+      return self._run_measured(procedure)
 
-    if pc:
-      try:
-        pc.to_bytes(1, "little")
-        self.pc = pc
-      except:
-        raise ValueError("pc must be 0 <= pc <= 255") 
+    try:
+      request = next(procedure)
+      if self.reconnect_policy is None:
+        while True:
+          request = procedure.send(self._request(*request))
+      while True:
+        request = procedure.send(self._retry(lambda: self._request(*request), request[1]))
+    except StopIteration as e:
+      return e.value
+
+  def _run_measured(self, procedure):
+    """送受信手順を実行 (計測あり)"""
+    metrics = self.metrics
+    clock = time.perf_counter_ns
+    index = self._get_answerdata_index()
 
-    if watch_timer:
-      try:
-        watch_timer.to_bytes(2, "little")
-        self.watch_timer = watch_timer
-      except:
-        raise ValueError("timer_sec must be 0 <= timer_sec <= 16383, / sec") 
+    started = clock()
+    try:
+      request = next(procedure)
+      while True:
+        send_data, command, size = request
+        encoded = clock()
+
+        def exchange():
+          self._send(send_data)
+          sent = clock()
+          return sent, self._recv(command, size)
+
+        try:
+          if self.reconnect_policy is None:
+            sent, recv_data = exchange()
+          else:
+            sent, recv_data = self._retry(exchange, command)
+          received = clock()
+          end_code = self._decode_value(recv_data[index//2:index], 1)
+          metrics.on_request(command, size, len(send_data), len(recv_data), end_code
+            , encoded - started, sent - encoded, received - sent)
+          self._check_cmd_answer(recv_data)
+        except Exception as e:
+          metrics.on_error(command, e)
+          raise
+
+        started = clock()
+        request = procedure.send(recv_data[index:])
+    except StopIteration as e:
+      metrics.on_decode(clock() - started)
+      return e.value
 
-  def batchread_wordunits(self, headdevice:str, readsize: int) -> list[int]:
+  # *** (public) PLC通信 ***
+
+  def batchread_wordunits(self, headdevice:str, readsize: int
+    , output: WordOutput="list", signed: bool=True
+  ) -> list[int]:
     """ワード単位読み込み
+    1フレームの点数上限を超える場合は分割して読み込みます。
 
     Args:
       headdevice(str):             デバイス名 (ex: "D1000", "Y1")
       readsize(int):               読み込み数
+      output(str):                 出力形式
+        - "list":       list[int] (デフォルト)
+        - "array":      array.array ('h' もしくは 'H')
+        - "memoryview": memoryview ('h' もしくは 'H')
+        - "numpy":      numpy.ndarray (int16 もしくは uint16, numpy が必要)
+      signed(bool):                符号付き16bitとして扱う (デフォルト: True)
 
     Returns:
-      wordunits_values(list[int]): ワード単位値リスト
+      wordunits_values(list[int]): ワード単位値リスト (output で指定した形式)
     """
-    send_data = self._make_send_data(const.Command.WORD_READ, headdevice, readsize)
+    return self._run(self._proc_batchread_wordunits(headdevice, readsize, output, signed))
 
-    self._send(send_data)
-    recv_data = self._recv()
-    self._check_cmd_answer(recv_data)
-
-    # 取得データ
-    word_values = []
-    index = self._get_answerdata_index()
-    for _ in range(readsize):
-      value = self._decode_value(recv_data[index:index+self.wordsize], 2, isSigned=True)
-      word_values.append(value)
-      index += self.wordsize
-    
-    return word_values
-
-  def batchread_bitunits(self, headdevice:str, readsize: int):
+  def batchread_bitunits(self, headdevice:str, readsize: int, output: BitOutput="list"):
     """ビット単位読み込み
+    1フレームの点数上限を超える場合は分割して読み込みます。
 
     Args:
       headdevice(str):             デバイス名 (ex: "D1000", "Y1")
       readsize(int):               読み込み数
+      output(str):                 出力形式
+        - "list":  list[int] (デフォルト)
+        - "bytes": bytes (1点1バイト)
+        - "int":   int (ビットマップ。先頭デバイスが bit0)
+        - "array": array.array ('B')
+        - "numpy": numpy.ndarray (bool, numpy が必要)
 
     Returns:
-      bitunits_values(list[int]):  ビット単位値(0 or 1) リスト
+      bitunits_values(list[int]):  ビット単位値(0 or 1) リスト (output で指定した形式)
     """
-    send_data = self._make_send_data(const.Command.BIT_READ, headdevice, readsize)
-
-    self._send(send_data)
-    recv_data = self._recv()
-    self._check_cmd_answer(recv_data)
-
-    # 取得データ
-    word_values = []
-    index = self._get_answerdata_index()
-    
-    for _ in range((readsize + 1) // 2):
-      value = self._decode_value(recv_data[index:index+self.wordsize-1], 1)
-      upper_4bit = value >> 4
-      word_values.append(upper_4bit)
-      lower_4bit = value & 0xF
-      word_values.append(lower_4bit)
-      index += self.wordsize-1
-    
-    if readsize % 2 != 0:
-      del word_values[-1]
-    
-    return word_values
+    return self._run(self._proc_batchread_bitunits(headdevice, readsize, output))
 
   def batchwrite_wordunits(self, headdevice: str, values: list[int]):
     """ワード単位書き込み
+    1フレームの点数上限を超える場合は分割して書き込みます。
 
     Args:
       headdevice(str):   デバイス名 (ex: "D1000", "Y1")
       values(list[int]): 書き込みリスト list[2byte]
+        array.array / memoryview / numpy.ndarray (16bit整数)、
+        bytes (リトルエンディアンのワード列) も指定できます。
     """
-    send_data = self._make_send_data(const.Command.WORD_WRITE, headdevice, len(values))
-    # 書き込みデータ
-    for v in values:
-      send_data += self._encode_value(v, 2)
-
-    self._send(send_data)
-    recv_data = self._recv()
-    self._check_cmd_answer(recv_data)
-    return None
+    return self._run(self._proc_batchwrite_wordunits(headdevice, values))
 
   def batchwrite_bitunits(self, headdevice: str, values: list[int]):
     """ビット単位書き込み
+    1フレームの点数上限を超える場合は分割して書き込みます。
     
     Args:
       headdevice(str):             デバイス名 (ex: "D1000", "Y1")
       values(list[int]):           書き込み1bitリスト
+        bytes / array.array / numpy.ndarray (1点1要素) も指定できます。
     """
-    new_values = []
-    
-    # 4ビットずつまとめて1バイトに
-    for i in range(0, len(values), 2):
-      high_nibble = values[i] & 0x0F
-      try:
-        low_nibble = values[i+1] & 0x0F
-      except:
-        low_nibble = 0x00
-      byte_val = (high_nibble << 4) | low_nibble
-      new_values.append(byte_val)
+    return self._run(self._proc_batchwrite_bitunits(headdevice, values))
 
-    send_data = self._make_send_data(const.Command.BIT_WRITE, headdevice, len(values))
-    # 書き込みデータ
-    for v in new_values:
-      send_data += self._encode_value(v, 1)
+  def batchread_typed(self, headdevice:str, count: int, dtype: str
+    , wordorder: WordOrder="little"
+  ) -> list:
+    """型指定読み込み
+    必要なワード数をまとめて読み込み、1回の struct.unpack で変換します。
 
-    self._send(send_data)
-    recv_data = self._recv()
-    self._check_cmd_answer(recv_data)
-    return None
+    Args:
+      headdevice(str): デバイス名 (ex: "D100")
+      count(int):      読み込む値の数
+      dtype(str):      "int16", "uint16", "int32", "uint32", "float32", "float64",
+                       "bcd16", "bcd32"
+      wordorder(str):  ワード順。"little": 下位ワードが若番 (デフォルト), "big": 上位ワードが若番
+
+    Returns:
+      values(list): 値リスト
+    """
+    return self._run(self._proc_batchread_typed(headdevice, count, dtype, wordorder))
+
+  def batchwrite_typed(self, headdevice:str, values: list, dtype: str
+    , wordorder: WordOrder="little"
+  ):
+    """型指定書き込み
+
+    Args:
+      headdevice(str): デバイス名 (ex: "D100")
+      values(list):    書き込み値リスト
+      dtype(str):      型名 (batchread_typed 参照)
+      wordorder(str):  ワード順 (batchread_typed 参照)
+    """
+    return self._run(self._proc_batchwrite_typed(headdevice, values, dtype, wordorder))
+
+  def batchread_string(self, headdevice:str, length: int, encoding: str="ascii") -> str:
+    """文字列読み込み (1ワードに2文字、下位バイトが先)
+
+    Args:
+      headdevice(str): デバイス名 (ex: "D100")
+      length(int):     読み込むバイト数
+      encoding(str):   文字コード (デフォルト: "ascii")
+
+    Returns:
+      text(str): 文字列 (NUL 以降は切り捨て)
+    """
+    return self._run(self._proc_batchread_string(headdevice, length, encoding))
+
+  def batchwrite_string(self, headdevice:str, text: str, encoding: str="ascii"):
+    """文字列書き込み (1ワードに2文字、下位バイトが先。奇数バイトの場合は NUL で埋める)
+
+    Args:
+      headdevice(str): デバイス名 (ex: "D100")
+      text(str):       書き込む文字列
+      encoding(str):   文字コード (デフォルト: "ascii")
+    """
+    return self._run(self._proc_batchwrite_string(headdevice, text, encoding))
+
+  def download_recipe(self, headdevice:str, values, gap: int=16, verify: bool=False) -> dict:
+    """レシピの差分書き込み
+    現在値を (分割して) 読み込み、変更のあるワードのみ書き込みます。
+    変更のないワードが gap 点以下で、まとめた方がフレーム数が減る場合は1回の書き込みにまとめます。
+
+    Args:
+      headdevice(str): 先頭デバイス (ex: "D1000")
+      values:          書き込み値 (batchwrite_wordunits と同様)
+      gap(int):        まとめて書き込む変更のないワードの最大点数 (デフォルト: 16)
+      verify(bool):    書き込んだ範囲を読み込んで確認する (不一致は VerifyError)
+
+    Returns:
+      (dict): points (全点数), changed (変更のあった点数), blocks (書き込み範囲の数),
+              written (書き込んだ点数)
+    """
+    return self._run(self._proc_download_recipe(headdevice, values, gap, verify))
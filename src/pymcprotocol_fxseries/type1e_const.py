@@ -6,6 +6,30 @@ class Command:
   WORD_WRITE = 0x03  # ワード一括書き込み
 
 END_CODE = 0x00  # リクエストフォーマット 終了位置コード
+ABNORMAL_END_CODE = 0x5B  # 応答 終了コード: 異常コード付きの異常終了
+
+class EndCode:
+  """応答 終了コード"""
+  NORMAL        = 0x00  # 正常終了
+  COMMAND_ERROR = 0x50  # サブヘッダ (コマンド) 指定誤り
+  DEVICE_ERROR  = 0x56  # デバイス指定誤り (存在しないデバイス)
+  SIZE_ERROR    = 0x57  # デバイス点数指定誤り
+  RANGE_ERROR   = 0x58  # 先頭デバイス + 点数がデバイス範囲外
+  ABNORMAL      = ABNORMAL_END_CODE
+
+REQUEST_HEADER_SIZE = 12  # リクエスト [サブヘッダ]~[終了コード] のバイト数 (バイナリ)
+
+class PointLimit:
+  """1フレームあたりのデバイス点数上限
+
+  デバイス点数は1バイトで送信するため、フレーム上の上限は256点 (0x00 = 256点)。
+  各コマンドのデフォルト値は FX3 系 Ethernet ユニットの仕様値。
+  """
+  FRAME_MAX  = 256
+  BIT_READ   = 256  # ビット一括読み出し (点)
+  WORD_READ  = 64   # ワード一括読み出し (ワード)
+  BIT_WRITE  = 160  # ビット一括書き込み (点)
+  WORD_WRITE = 64   # ワード一括書き込み (ワード)
 
 class CommType:
   BINARY = "binary"
@@ -47,20 +71,47 @@ class DeviceConstants:
   M_DEVICE =  [ 0x4D, 0x20 ]  # 補助リレー
   S_DEVICE =  [ 0x53, 0x20 ]  # ステート
 
+  # ビットデバイス (ワード単位アクセス時は 1ワード = 16点)
+  BIT_DEVICE_TYPES = ("TS", "CS", "X", "Y", "M", "S")
+
+  # デバイス点数 (FX3U, 特殊デバイスを含む)
+  DEVICE_POINTS = {
+    "D":  8512,   # D0 ~ D7999, D8000 ~ D8511
+    "R":  32768,  # R0 ~ R32767
+    "TN": 512,    # T0 ~ T511
+    "TS": 512,
+    "CN": 256,    # C0 ~ C255
+    "CS": 256,
+    "X":  256,    # X0 ~ X377 (8進)
+    "Y":  256,    # Y0 ~ Y377 (8進)
+    "M":  8512,   # M0 ~ M7679, M8000 ~ M8511
+    "S":  4096,   # S0 ~ S4095
+  }
+
+  # デバイス番号を8進で表記するデバイス
+  OCTAL_DEVICE_TYPES = ("X", "Y")
+
+  # デバイス種類 -> [コマンド, サブコマンド]
+  _TABLE = {
+    "D":  D_DEVICE,
+    "R":  R_DEVICE,
+    "TN": TN_DEVICE,
+    "TS": TS_DEVICE,
+    "CN": CN_DEVICE,
+    "CS": CS_DEVICE,
+    "X":  X_DEVICE,
+    "Y":  Y_DEVICE,
+    "M":  M_DEVICE,
+    "S":  S_DEVICE,
+  }
+  # デバイス種類 -> バイナリのデバイスコード
+  _BINARY_CODES = {name: (cmd << 8) | sub for name, (cmd, sub) in _TABLE.items()}
+  # バイナリのデバイスコード -> デバイス種類
+  _DEVICE_NAMES = {code: name for name, code in _BINARY_CODES.items()}
+
   @staticmethod
   def _table():
-    return {
-      "D":  DeviceConstants.D_DEVICE,
-      "R":  DeviceConstants.R_DEVICE,
-      "TN": DeviceConstants.TN_DEVICE,
-      "TS": DeviceConstants.TS_DEVICE,
-      "CN": DeviceConstants.CN_DEVICE,
-      "CS": DeviceConstants.CS_DEVICE,
-      "X":  DeviceConstants.X_DEVICE,
-      "Y":  DeviceConstants.Y_DEVICE,
-      "M":  DeviceConstants.M_DEVICE,
-      "S":  DeviceConstants.S_DEVICE,
-    }
+    return DeviceConstants._TABLE
 
   @staticmethod
   def get_binary_devicecode(devicename):
@@ -73,13 +124,10 @@ class DeviceConstants:
       device_code(int): デバイスコード
         ※ 2byte 上位:コマンド 下位:サブコマンド
     """
-    table = DeviceConstants._table()
-
-    if devicename not in table:
+    try:
+      return DeviceConstants._BINARY_CODES[devicename]
+    except (KeyError, TypeError):
       raise DeviceCodeError(devicename)
-    
-    cmd, sub = table[devicename]
-    return (cmd << 8) | sub
 
   @staticmethod
   def get_ascii_devicecode(devicename):
@@ -90,3 +138,33 @@ class DeviceConstants:
 
     cmd, sub = table[devicename]
     return f"{cmd:02X}{sub:02X}"
+
+  @staticmethod
+  def is_bit_device(devicename):
+    """デバイス種類がビットデバイスかどうか
+
+    Args:
+      devicename(str): デバイス種類
+
+    Returns:
+      (bool): ビットデバイスなら True
+    """
+    return devicename in DeviceConstants.BIT_DEVICE_TYPES
+
+  @staticmethod
+  def get_devicename(devicecode):
+    """バイナリのデバイスコードからデバイス種類を返す
+
+    Args:
+      devicecode(int): デバイスコード (2byte 上位:コマンド 下位:サブコマンド)
+
+    Returns:
+      devicename(str): デバイス種類
+
+    Raises:
+      DeviceCodeError: 未対応のデバイスコードの場合。
+    """
+    try:
+      return DeviceConstants._DEVICE_NAMES[devicecode]
+    except KeyError:
+      raise DeviceCodeError(f"0x{devicecode:04X}")
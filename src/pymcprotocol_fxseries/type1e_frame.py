@@ -0,0 +1,708 @@
+from array import array
+import binascii
+from functools import lru_cache
+from typing import Literal
+import logging
+import struct
+import sys
+
+from pymcprotocol_fxseries.device_address import get_address
+from pymcprotocol_fxseries.utility import (
+  twos_comp,
+  import_numpy
+)
+import pymcprotocol_fxseries.datatype as datatype
+import pymcprotocol_fxseries.type1e_const as const
+import pymcprotocol_fxseries.mcprotocol_error as mcprotocolerror
+
+PC_NO_HEX = 0xFF 
+WATCH_TIMER_VAL = 0x000A # 2500ms
+
+# ワード読み込みの出力形式
+WordOutput = Literal["list", "array", "memoryview", "numpy"]
+# ビット読み込みの出力形式
+BitOutput = Literal["list", "bytes", "int", "array", "numpy"]
+
+# ビットデータ変換テーブル (1バイトに2点: 上位4bit, 下位4bit)
+_UPPER_NIBBLE = bytes(b >> 4 for b in range(256))            # 1バイト -> 先の点
+_LOWER_NIBBLE = bytes(b & 0x0F for b in range(256))          # 1バイト -> 後の点
+_TO_UPPER_NIBBLE = bytes((b & 0x0F) << 4 for b in range(256))  # 点 -> 上位4bit
+_TO_BIT_CHAR = bytes(0x30 + (b & 0x01) for b in range(256))    # 点 -> b"0" / b"1"
+
+# [サブヘッダ] [PC番号] [監視タイマ]
+_BINARY_HEADER = struct.Struct("<BBH")
+
+def unpack_nibbles(data, size:int):
+  """ビットデータ (1バイトに2点: 上位4bit, 下位4bit) -> 1点1バイト
+
+  Args:
+    data(bytes): ビットデータ
+    size(int):   点数
+
+  Returns:
+    bit_values(bytearray): 1点1バイトの値
+  """
+  data = bytes(data[:(size + 1) // 2])
+  bit_values = bytearray(len(data) * 2)
+  bit_values[0::2] = data.translate(_UPPER_NIBBLE)
+  bit_values[1::2] = data.translate(_LOWER_NIBBLE)
+  del bit_values[size:]
+  return bit_values
+
+def pack_nibbles(data):
+  """1点1バイト -> ビットデータ (1バイトに2点: 上位4bit, 下位4bit)
+
+  Args:
+    data(bytes): 1点1バイトの値
+
+  Returns:
+    packed(bytes): ビットデータ
+  """
+  data = bytes(data)
+  if len(data) % 2 != 0:
+    data += b"\x00"
+  upper = data[0::2].translate(_TO_UPPER_NIBBLE)
+  lower = data[1::2].translate(_LOWER_NIBBLE)
+  packed = int.from_bytes(upper, "big") | int.from_bytes(lower, "big")
+  return packed.to_bytes(len(upper), "big")
+
+@lru_cache(maxsize=1024)
+def _make_binary_frame(command:int, device, size:int, pc:int, watch_timer:int, offset:int) -> bytes:
+  """送信データ作成 (バイナリ, キャッシュ)"""
+  try:
+    header = _BINARY_HEADER.pack(command, pc, watch_timer)
+  except struct.error:
+    raise ValueError("Exceeeded Device value range")
+  return header + get_address(device).offset(offset).binary + bytes((size & 0xFF, const.END_CODE))
+
+def parse_request_header(header):
+  """リクエストヘッダ (バイナリ, 12バイト) を解析
+
+    [サブヘッダ] [PC番号] [監視タイマ] [先頭デバイス番号(4)] [デバイスコード(2)] [デバイス点数] [終了コード]
+
+  Args:
+    header(bytes): リクエストヘッダ
+
+  Returns:
+    (command, pc, watch_timer, device_num, device_code, size)
+      size は 1 ~ 256 (0x00 = 256点)
+  """
+  if len(header) < const.REQUEST_HEADER_SIZE:
+    raise ValueError("Frame too short")
+
+  command = header[0]
+  pc = header[1]
+  watch_timer = int.from_bytes(header[2:4], "little")
+  device_num = int.from_bytes(header[4:8], "little")
+  device_code = int.from_bytes(header[8:10], "little")
+  size = header[10] or const.PointLimit.FRAME_MAX
+  return command, pc, watch_timer, device_num, device_code, size
+
+def get_request_data_size(command:int, size:int):
+  """リクエストヘッダに続く書き込みデータのバイト数 (バイナリ)"""
+  if command == const.Command.WORD_WRITE:
+    return size * 2
+  elif command == const.Command.BIT_WRITE:
+    return (size + 1) // 2
+  return 0
+
+class Type1EFrame:
+  """ 1Eフレーム 組立/解析
+
+  ソケット処理を持たず、送信データ作成・応答解析・送受信手順のみを扱う。
+  Type1E (同期) と AsyncType1E (asyncio) はこのクラスを共有し、
+  それぞれの送受信処理で手順を実行する。
+
+  送受信手順:
+    _proc_* はジェネレータで、(send_data, command, size) を yield し、
+    応答データ部 (サブヘッダ・終了コードを除く) を受け取る。
+    手順の戻り値が公開メソッドの戻り値となる。
+  """
+
+  commtype = const.CommType.BINARY
+  pc = PC_NO_HEX
+  watch_timer = WATCH_TIMER_VAL
+  wordsize = 2
+
+  # 1フレームあたりの点数上限 (超える場合は自動で分割送信)
+  bitread_points = const.PointLimit.BIT_READ
+  wordread_points = const.PointLimit.WORD_READ
+  bitwrite_points = const.PointLimit.BIT_WRITE
+  wordwrite_points = const.PointLimit.WORD_WRITE
+
+  _debug = False
+
+  def __init__(self, commtype: Literal["binary", "ascii"]=None):
+    self.logger = logging.getLogger(type(self).__name__)
+    handler = logging.StreamHandler()
+    formatter = logging.Formatter("[%(levelname)-8s] %(asctime)s %(name)s: %(message)s")
+    handler.setFormatter(formatter)
+    self.logger.addHandler(handler)
+    self.logger.setLevel(logging.DEBUG if self._debug else logging.INFO)
+
+    if commtype:
+      self.set_commtype(commtype)
+
+  def _set_debug(self, stat: bool):
+    self._debug = stat
+    self.logger.setLevel(logging.DEBUG if self._debug else logging.INFO)
+
+  def _log_send_data(self, send_data):
+    """送信データのデバッグ出力
+    """
+    if self._debug:
+        hex_data = binascii.hexlify(send_data).decode()
+        self.logger.debug(f"send data({self.commtype}): {hex_data}")
+
+        if self.commtype == const.CommType.ASCII:
+            ascii_chars = "".join(chr(b) for b in send_data)
+            self.logger.debug(f"  ASCII: {ascii_chars}")
+
+  # *** (private) コマンド作成 ***
+  
+  def _encode_value(self, value:int, size:int, byteorder="little"):
+    try:
+      if self.commtype == const.CommType.BINARY:
+        value_byte = value.to_bytes(size, byteorder, signed=value < 0)
+
+      else:
+        mask = (1 << (size * 8)) - 1
+        value = value & mask
+        hex_str = format(value, "0{}X".format(size * 2))
+        value_byte = hex_str.encode()
+    except:
+      raise ValueError("Exceeeded Device value range")
+  
+    return value_byte
+  
+  def _decode_value(self, byte:bytes, size:int, byteorder="little", isSigned=False):
+    try:
+      if self.commtype == const.CommType.BINARY:
+        value = int.from_bytes(byte, byteorder, signed=isSigned)
+      else:
+        value = int(bytes(byte).decode(), 16)
+        if byteorder == "big":
+          value = twos_comp(value, size)
+    except:
+      raise ValueError("Could not decode byte to value")
+    
+    return value
+
+  def _make_device_data(self, device, offset:int=0):
+    """デバイス名 + 先頭デバイス作成
+
+    Args:
+      device(str | DeviceAddress): デバイス. (ex: "D1000", "Y1")
+      offset(int): 先頭デバイス番号に加算するオフセット
+
+    Returns:
+      device_data(bytes): デバイスデータ
+    """
+    address = get_address(device).offset(offset)
+
+    if self.commtype == const.CommType.BINARY:
+      return address.binary
+
+    # デバイス番号コード取得
+    device_code = const.DeviceConstants.get_ascii_devicecode(address.devicetype)
+    device_num = const.int2hexStr(address.number) # int -> hex -> str -> "0x"を除去
+    return device_code.encode() + device_num.rjust(8, "0").upper().encode()
+
+  def _make_send_data(self, command:int, device, size:int, offset:int=0):
+    """送信データ作成
+      [サブヘッダ] [PC番号] [監視タイマ] [先頭デバイス] [デバイス点数] [終了コード]
+
+    バイナリ通信時は作成した送信データを (command, device, size, pc, watch_timer, offset) ごとに
+    キャッシュし、同じ要求の繰り返しは辞書の参照のみで返します。
+
+    Args:
+      command(int):      サブヘッダ番号
+      device(str | DeviceAddress): デバイス名 (ex: "D1000")
+      size(int):         データ数 (1 ~ 256)
+      offset(int):       先頭デバイス番号に加算するオフセット
+
+    Returns:
+      mc_data(bytes): 送信データ
+    """
+    if not 1 <= size <= const.PointLimit.FRAME_MAX:
+      raise ValueError(f"size must be 1 <= size <= {const.PointLimit.FRAME_MAX}")
+
+    if self.commtype == const.CommType.BINARY:
+      return _make_binary_frame(command, device, size, self.pc, self.watch_timer, offset)
+
+    return b"".join((
+      self._encode_value(command, 1),           # サブヘッダ
+      self._encode_value(self.pc, 1),           # PC番号
+      self._encode_value(self.watch_timer, 2),  # 監視タイマ
+      self._make_device_data(device, offset),   # 先頭デバイス
+      self._encode_value(size & 0xFF, 1),       # デバイス点数 (256点は0x00)
+      self._encode_value(const.END_CODE, 1),    # 終了コード
+    ))
+
+  def _get_answerdata_index(self):
+    index = 2 if self.commtype == const.CommType.BINARY else 4
+    return index
+
+  def _get_answer_size(self, command:int, size:int):
+    """応答データ部のバイト数 (サブヘッダ・終了コードを除く)
+
+    Args:
+      command(int): サブヘッダ番号
+      size(int):    デバイス点数
+
+    Returns:
+      answer_size(int): 応答データ部のバイト数
+    """
+    if command == const.Command.WORD_READ:
+      return size * self.wordsize
+    elif command == const.Command.BIT_READ:
+      # 1点 = 4bit (ASCII は1点1文字)
+      if self.commtype == const.CommType.BINARY:
+        return (size + 1) // 2
+      return size
+    return 0
+
+  def _get_remain_size(self, recv_header, command:int, size:int):
+    """応答ヘッダ [サブヘッダ][終了コード] 受信後に続くバイト数
+
+    異常終了時は応答データなし (0x5B の場合のみ異常コード + 0x00 が続く)
+
+    Args:
+      recv_header(bytes): 受信済みの応答ヘッダ
+      command(int):       送信したサブヘッダ番号
+      size(int):          送信したデバイス点数
+
+    Returns:
+      remain_size(int): 残りの受信バイト数
+    """
+    index = self._get_answerdata_index()
+    end_code = self._decode_value(recv_header[index//2:index], 1)
+    if end_code != 0x00:
+      if end_code == const.ABNORMAL_END_CODE:
+        return index
+      return 0
+    return self._get_answer_size(command, size)
+
+  def _check_cmd_answer(self, recv_data):
+    index = self._get_answerdata_index()
+
+    #   0x00         0x00      0x00 0x00...
+    # [subheader] [end code] [char response...]
+    status = self._decode_value(recv_data[0:index], 2, "big")
+    # 0x80がレスポンス番号 0x0~がコマンド番号
+    sub_header = status >> 8 & 0xFF
+    end_code =   status & 0xFF
+    # mcprotocolerror.check_mcprotocol_error(status)
+    if end_code != 0x00:
+      raise mcprotocolerror.MCProtocolError(status)
+    return None
+
+  def _split_points(self, total:int, limit:int):
+    """点数をフレーム上限ごとに分割 (最小フレーム数・最大点数)
+
+    Args:
+      total(int): 全体の点数
+      limit(int): 1フレームあたりの点数上限
+
+    Yields:
+      (start, points): 先頭からのオフセット(点), 点数
+    """
+    if total < 1:
+      raise ValueError("size must be 1 or more")
+
+    for start in range(0, total, limit):
+      yield start, min(limit, total - start)
+
+  def _device_step(self, device:str, command:int):
+    """1点あたりのデバイス番号の増分
+    ビットデバイスをワード単位でアクセスする場合は 1ワード = 16点
+    """
+    if command in (const.Command.WORD_READ, const.Command.WORD_WRITE) \
+        and get_address(device).is_bit:
+      return 16
+    return 1
+
+  # *** (public) 通信設定 ***
+
+  def set_commtype(self, commtype: str):
+    """通信方式変更
+
+    Args:
+      commtype(str): "binary" もしくは "ascii"
+    """
+    if commtype == "binary":
+      self.commtype = const.CommType.BINARY
+      self.wordsize = 2
+    elif commtype == "ascii":
+      raise ValueError("\"ascii\"による通信は、まだ、未搭載です。")
+      
+      self.commtype = const.CommType.ASCII
+      self.wordsize = 4
+    else:
+      raise const.CommTypeError()
+
+  def set_accessopt(self
+    , commtype: str=None
+    , pc :int=None
+    , watch_timer: int=None
+  ):
+    """通信オプション
+    
+    Args:
+      commtype(str):    "binary"もしくは、"ascii" (デフォルト:"binary")
+      pc(int):          いや、お前なんなん
+      watch_timer(int): PLC通信時のレスポンス待機時間
+
+    """
+    if commtype:
+      self.set_commtype(commtype)
+
+    if pc:
+      try:
+        pc.to_bytes(1, "little")
+        self.pc = pc
+      except:
+        raise ValueError("pc must be 0 <= pc <= 255") 
+
+    if watch_timer:
+      try:
+        watch_timer.to_bytes(2, "little")
+        self.watch_timer = watch_timer
+      except:
+        raise ValueError("timer_sec must be 0 <= timer_sec <= 16383, / sec") 
+
+  def set_chunksize(self
+    , bitread: int=None
+    , wordread: int=None
+    , bitwrite: int=None
+    , wordwrite: int=None
+  ):
+    """1フレームあたりの点数上限設定
+    一括読み書きの点数が上限を超える場合、上限ごとにフレームを分割して送信します。
+    PLC機種ごとのスループット調整に使用します。
+
+    Args:
+      bitread(int):   ビット一括読み出しの点数上限 (偶数, 2 ~ 256)
+      wordread(int):  ワード一括読み出しの点数上限 (1 ~ 256)
+      bitwrite(int):  ビット一括書き込みの点数上限 (偶数, 2 ~ 256)
+      wordwrite(int): ワード一括書き込みの点数上限 (1 ~ 256)
+    """
+    frame_max = const.PointLimit.FRAME_MAX
+    for name, value, is_bit in (
+        ("bitread", bitread, True), ("wordread", wordread, False),
+        ("bitwrite", bitwrite, True), ("wordwrite", wordwrite, False)):
+      if value is None:
+        continue
+      if not 1 <= value <= frame_max:
+        raise ValueError(f"{name} must be 1 <= {name} <= {frame_max}")
+      # ビットは1バイトに2点格納するため、分割位置を偶数に揃える
+      if is_bit and value % 2 != 0:
+        raise ValueError(f"{name} must be even")
+      setattr(self, f"{name}_points", value)
+
+  # *** (private) 送受信手順 ***
+
+  def _proc_batchread(self, command:int, headdevice:str, readsize:int):
+    """一括読み込み手順 (応答データ部をつなげた受信バッファを返す)
+
+    Args:
+      command(int):     const.Command.WORD_READ もしくは BIT_READ
+      headdevice(str):  デバイス名 (ex: "D1000", "Y1")
+      readsize(int):    読み込み数
+
+    Returns:
+      recv_buf(bytearray): 受信データ (ワード: 2byte/点, ビット: 4bit/点)
+    """
+    if command == const.Command.WORD_READ:
+      limit = self.wordread_points
+      step = self._device_step(headdevice, command)
+    else:
+      limit = self.bitread_points
+      step = 1
+    recv_buf = bytearray(self._get_answer_size(command, readsize))
+
+    for start, points in self._split_points(readsize, limit):
+      send_data = self._make_send_data(command, headdevice, points, start * step)
+      pos = self._get_answer_size(command, start)
+      recv_buf[pos:pos + self._get_answer_size(command, points)] = yield send_data, command, points
+
+    return recv_buf
+
+  def _decode_wordunits(self, recv_buf, readsize:int, output:WordOutput="list", signed:bool=True):
+    """受信データ -> ワード単位値
+
+    バイナリ通信時は受信データ全体を1回で変換します。
+
+    Args:
+      recv_buf(bytearray): 受信データ
+      readsize(int):       点数
+      output(str):         出力形式
+        - "list":       list[int]
+        - "array":      array.array ('h' もしくは 'H')
+        - "memoryview": memoryview ('h' もしくは 'H')
+        - "numpy":      numpy.ndarray (int16 もしくは uint16, numpy が必要)
+      signed(bool):        符号付き16bitとして扱う
+
+    Returns:
+      word_values: ワード単位値
+    """
+    if output not in ("list", "array", "memoryview", "numpy"):
+      raise ValueError(f"output must be 'list', 'array', 'memoryview' or 'numpy': {output!r}")
+
+    if self.commtype != const.CommType.BINARY:
+      word_values = []
+      for index in range(0, readsize * self.wordsize, self.wordsize):
+        value = self._decode_value(recv_buf[index:index+self.wordsize], 2, isSigned=signed)
+        word_values.append(value)
+      return word_values if output == "list" else array("h" if signed else "H", word_values)
+
+    size = readsize * self.wordsize
+    if output == "numpy":
+      numpy = import_numpy()
+      return numpy.frombuffer(recv_buf, dtype="<i2" if signed else "<u2", count=readsize)
+
+    typecode = "h" if signed else "H"
+    # 受信データはリトルエンディアン。同じバイト順のホストではコピーせずにビューを返す
+    if output == "memoryview" and sys.byteorder == "little":
+      return memoryview(recv_buf)[:size].cast(typecode)
+
+    word_values = array(typecode)
+    word_values.frombytes(recv_buf[:size])
+    if sys.byteorder != "little":
+      word_values.byteswap()
+
+    if output == "list":
+      return word_values.tolist()
+    elif output == "memoryview":
+      return memoryview(word_values)
+    return word_values
+
+  def _encode_wordunits(self, values):
+    """ワード単位値 -> 書き込みデータ
+
+    Args:
+      values: 書き込み値
+        - list[int]:                  -32768 ~ 65535
+        - array.array / memoryview:  16bit整数 ('h' もしくは 'H')
+        - numpy.ndarray:             16bit整数
+        - bytes / bytearray:         リトルエンディアンのワード列 (そのまま送信)
+
+    Returns:
+      write_data(bytes): 書き込みデータ
+    """
+    if self.commtype != const.CommType.BINARY:
+      return b"".join(self._encode_value(v, 2) for v in values)
+
+    if isinstance(values, (bytes, bytearray)):
+      write_data = bytes(values)
+    elif hasattr(values, "dtype"):
+      # numpy.ndarray
+      if values.dtype.kind not in "iu" or values.dtype.itemsize != 2:
+        raise ValueError(f"ndarray dtype must be int16 or uint16: {values.dtype}")
+      write_data = values.astype(values.dtype.newbyteorder("<"), copy=False).tobytes()
+    elif isinstance(values, (array, memoryview)):
+      if values.itemsize != 2 or (isinstance(values, memoryview) and values.format not in "hH"):
+        raise ValueError("array/memoryview must hold 16bit integers ('h' or 'H')")
+      if sys.byteorder == "little":
+        write_data = values.tobytes()
+      else:
+        swapped = array(values.typecode if isinstance(values, array) else values.format, values)
+        swapped.byteswap()
+        write_data = swapped.tobytes()
+    else:
+      try:
+        word_values = array("H", values)
+      except OverflowError:
+        try:
+          word_values = array("h", values)
+        except OverflowError:
+          # 負数と32768以上が混在する場合
+          return b"".join(self._encode_value(v, 2) for v in values)
+      if sys.byteorder != "little":
+        word_values.byteswap()
+      write_data = word_values.tobytes()
+
+    if len(write_data) % self.wordsize != 0:
+      raise ValueError("write data length must be a multiple of 2 bytes")
+    return write_data
+
+  def _decode_bitunits(self, recv_buf, readsize:int, output:BitOutput="list"):
+    """受信データ -> ビット単位値 (1バイトに2点: 上位4bit, 下位4bit)
+
+    変換テーブル (bytes.translate) とスライス代入で一括変換します。
+
+    Args:
+      recv_buf(bytearray): 受信データ
+      readsize(int):       点数
+      output(str):         出力形式
+        - "list":  list[int] (0 or 1)
+        - "bytes": bytes (1点1バイト)
+        - "int":   int (ビットマップ。先頭デバイスが bit0)
+        - "array": array.array ('B')
+        - "numpy": numpy.ndarray (bool, numpy が必要)
+
+    Returns:
+      bit_values: ビット単位値
+    """
+    if output not in ("list", "bytes", "int", "array", "numpy"):
+      raise ValueError(f"output must be 'list', 'bytes', 'int', 'array' or 'numpy': {output!r}")
+
+    bit_values = unpack_nibbles(recv_buf, readsize)
+
+    if output == "list":
+      return list(bit_values)
+    elif output == "bytes":
+      return bytes(bit_values)
+    elif output == "int":
+      return int(bytes(bit_values[::-1]).translate(_TO_BIT_CHAR), 2) if readsize else 0
+    elif output == "array":
+      return array("B", bit_values)
+    numpy = import_numpy()
+    return numpy.frombuffer(bit_values, dtype=numpy.uint8).astype(bool)
+
+  def _encode_bitunits(self, values):
+    """ビット単位値 -> 書き込みデータ (1バイトに2点: 上位4bit, 下位4bit)
+
+    Args:
+      values: 書き込み値 (0 or 1)。list / bytes / bytearray / array.array / numpy.ndarray
+
+    Returns:
+      write_data(bytes): 書き込みデータ
+    """
+    if hasattr(values, "dtype"):
+      # numpy.ndarray
+      data = values.astype("u1").tobytes()
+    else:
+      try:
+        data = bytes(values)
+      except (ValueError, TypeError):
+        data = bytes(v & 0x0F for v in values)
+    return pack_nibbles(data)
+
+  def _proc_batchread_wordunits(self, headdevice:str, readsize:int
+    , output:WordOutput="list", signed:bool=True
+  ):
+    """ワード単位読み込み手順"""
+    recv_buf = yield from self._proc_batchread(const.Command.WORD_READ, headdevice, readsize)
+    return self._decode_wordunits(recv_buf, readsize, output, signed)
+
+  def _proc_batchread_bitunits(self, headdevice:str, readsize:int, output:BitOutput="list"):
+    """ビット単位読み込み手順"""
+    recv_buf = yield from self._proc_batchread(const.Command.BIT_READ, headdevice, readsize)
+    return self._decode_bitunits(recv_buf, readsize, output)
+
+  def _proc_batchwrite_wordunits(self, headdevice:str, values):
+    """ワード単位書き込み手順"""
+    step = self._device_step(headdevice, const.Command.WORD_WRITE)
+    # 書き込みデータ
+    write_data = self._encode_wordunits(values)
+
+    for start, points in self._split_points(len(write_data) // self.wordsize, self.wordwrite_points):
+      send_data = self._make_send_data(const.Command.WORD_WRITE, headdevice, points, start * step)
+      pos = start * self.wordsize
+      send_data += write_data[pos:pos + points * self.wordsize]
+      yield send_data, const.Command.WORD_WRITE, points
+    return None
+
+  def _proc_batchwrite_bitunits(self, headdevice:str, values):
+    """ビット単位書き込み手順"""
+    # 書き込みデータ (4ビットずつまとめて1バイトに)
+    write_data = self._encode_bitunits(values)
+
+    for start, points in self._split_points(len(values), self.bitwrite_points):
+      send_data = self._make_send_data(const.Command.BIT_WRITE, headdevice, points, start)
+      pos = start // 2
+      send_data += write_data[pos:pos + (points + 1) // 2]
+      yield send_data, const.Command.BIT_WRITE, points
+    return None
+
+  def _proc_batchread_typed(self, headdevice:str, count:int, dtype:str
+    , wordorder:datatype.WordOrder="little"
+  ):
+    """型指定読み込み手順"""
+    readsize = count * datatype.get_wordcount(dtype)
+    recv_buf = yield from self._proc_batchread(const.Command.WORD_READ, headdevice, readsize)
+    return datatype.decode_words(recv_buf, dtype, count, wordorder)
+
+  def _proc_batchwrite_typed(self, headdevice:str, values:list, dtype:str
+    , wordorder:datatype.WordOrder="little"
+  ):
+    """型指定書き込み手順"""
+    write_data = datatype.encode_words(values, dtype, wordorder)
+    yield from self._proc_batchwrite_wordunits(headdevice, write_data)
+
+  def _proc_batchread_string(self, headdevice:str, length:int, encoding:str="ascii"):
+    """文字列読み込み手順"""
+    recv_buf = yield from self._proc_batchread(const.Command.WORD_READ, headdevice, (length + 1) // 2)
+    return datatype.decode_string(recv_buf[:length], encoding)
+
+  def _proc_batchwrite_string(self, headdevice:str, text:str, encoding:str="ascii"):
+    """文字列書き込み手順"""
+    yield from self._proc_batchwrite_wordunits(headdevice, datatype.encode_string(text, encoding))
+
+  def _diff_runs(self, current, desired, readsize:int, gap:int):
+    """変更のあるワードを書き込み範囲にまとめる
+
+    空きが gap 以下で、まとめた方がフレーム数が少なくなる場合は、変更のないワードも含めて1範囲にする。
+
+    Returns:
+      (runs, changed): [(先頭からのオフセット(点), 点数)], 変更のあったワード数
+    """
+    limit = self.wordwrite_points
+
+    def frames(points):
+      return -(-points // limit)
+
+    current_words = array("H", bytes(current[:readsize * 2]))
+    desired_words = array("H", bytes(desired[:readsize * 2]))
+
+    runs = []
+    changed = 0
+    for i, (old, new) in enumerate(zip(current_words, desired_words)):
+      if old == new:
+        continue
+      changed += 1
+      if runs:
+        start, end = runs[-1]
+        if end == i or (i - end <= gap and frames(i + 1 - start) < frames(end - start) + 1):
+          runs[-1][1] = i + 1
+          continue
+      runs.append([i, i + 1])
+    return [(start, end - start) for start, end in runs], changed
+
+  def _proc_download_recipe(self, headdevice:str, values, gap:int=16, verify:bool=False):
+    """差分書き込み手順 (現在値を読み込み、変更のある範囲のみ書き込む)"""
+    if gap < 0:
+      raise ValueError("gap must be 0 or more")
+    write_data = self._encode_wordunits(values)
+    readsize = len(write_data) // self.wordsize
+    step = self._device_step(headdevice, const.Command.WORD_WRITE)
+    address = get_address(headdevice)
+
+    current = yield from self._proc_batchread(const.Command.WORD_READ, address, readsize)
+    runs, changed = self._diff_runs(current, write_data, readsize, gap)
+
+    for start, points in runs:
+      yield from self._proc_batchwrite_wordunits(address.offset(start * step),
+        write_data[start * 2:(start + points) * 2])
+
+    if verify:
+      mismatches = []
+      for start, points in runs:
+        device = address.offset(start * step)
+        recv_buf = yield from self._proc_batchread(const.Command.WORD_READ, device, points)
+        for i in range(points):
+          pos = (start + i) * 2
+          if recv_buf[i * 2:i * 2 + 2] != write_data[pos:pos + 2]:
+            mismatches.append((device.offset(i * step).name,
+              int.from_bytes(write_data[pos:pos + 2], "little"),
+              int.from_bytes(recv_buf[i * 2:i * 2 + 2], "little")))
+      if mismatches:
+        raise mcprotocolerror.VerifyError(mismatches)
+
+    return {
+      "points": readsize,
+      "changed": changed,
+      "blocks": len(runs),
+      "written": sum(points for _, points in runs),
+    }
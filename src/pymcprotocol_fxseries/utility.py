@@ -1,5 +1,20 @@
+from functools import lru_cache
 import re
 
+import pymcprotocol_fxseries.type1e_const as const
+
+def import_numpy():
+  """numpy をインポート (オプション依存)
+
+  Raises:
+    ImportError: numpy がインストールされていない場合。
+  """
+  try:
+    import numpy
+  except ImportError:
+    raise ImportError("numpy is required for this feature. Please install numpy (pip install numpy)")
+  return numpy
+
 def twos_comp(val, size:int):
   """compute the 2's complement of int value val
   """
@@ -8,6 +23,11 @@ def twos_comp(val, size:int):
     val = val - (1 << bit)        # compute negative value
   return val
 
+# デバイス名 -> (デバイス種類, デバイス番号の文字列)
+_DEVICE_TYPE_PATTERN = re.compile(r"\D+")
+_DEVICE_NUMBER_PATTERN = re.compile(r"\d.*")
+
+@lru_cache(maxsize=4096)
 def get_device_number(device:str) -> str:
   """デバイスからデバイス番号を取得
 
@@ -15,15 +35,14 @@ def get_device_number(device:str) -> str:
     device(str):        デバイス名
   
   Returns:
-    device_num(str) デバイス番号
+    device_num(str) デバイス番号 (X/Y は8進の表記のまま)
   """
-  device_num = re.search(r"\d.*", device)
+  device_num = _DEVICE_NUMBER_PATTERN.search(device)
   if device_num is None:
     raise ValueError("Invalid device number, {}".format(device))
-  else:
-    device_num = device_num.group(0)
-  return device_num
+  return device_num.group(0)
 
+@lru_cache(maxsize=4096)
 def get_device_type(device:str) -> str:
   """デバイスからデバイス種類を取得
 
@@ -33,9 +52,86 @@ def get_device_type(device:str) -> str:
   Returns:
     devicetype(str) デバイス種類
   """
-  devicetype = re.search(r"\D+", device)
+  devicetype = _DEVICE_TYPE_PATTERN.search(device)
   if devicetype is None:
     raise ValueError("Invalid device ")
-  else:
-    devicetype = devicetype.group(0)  
-  return devicetype
+  return devicetype.group(0)
+
+@lru_cache(maxsize=4096)
+def parse_device(device:str) -> tuple:
+  """デバイス名をデバイス種類・デバイス番号に分解
+
+  X/Y のデバイス番号は8進で解釈します (ex: "X17" -> ("X", 15))。
+
+  Args:
+    device(str): デバイス名
+
+  Returns:
+    (devicetype, number): デバイス種類, デバイス番号 (フレームで送信する値)
+
+  Raises:
+    ValueError: デバイス番号が不正な場合。
+  """
+  devicetype = get_device_type(device)
+  device_num = get_device_number(device)
+  base = 8 if devicetype in const.DeviceConstants.OCTAL_DEVICE_TYPES else 10
+  try:
+    return devicetype, int(device_num, base)
+  except ValueError:
+    raise ValueError(f"Invalid device number, {device}") from None
+
+def format_device(devicetype:str, number:int) -> str:
+  """デバイス種類・デバイス番号からデバイス名を作成 (parse_device の逆変換)
+
+  Args:
+    devicetype(str): デバイス種類
+    number(int):     デバイス番号 (X/Y は8進で表記)
+
+  Returns:
+    device(str): デバイス名 (ex: "D100", "X17")
+  """
+  if devicetype in const.DeviceConstants.OCTAL_DEVICE_TYPES:
+    return f"{devicetype}{number:o}"
+  return f"{devicetype}{number}"
+
+def expand_devices(devices):
+  """デバイス指定をデバイス名リストに展開
+
+  Args:
+    devices(list): デバイス名 (ex: "D100") もしくは (先頭デバイス, 点数) のタプル
+
+  Returns:
+    names(list[str]): デバイス名リスト
+  """
+  names = []
+  for device in devices:
+    if isinstance(device, str):
+      names.append(device)
+    else:
+      headdevice, size = device
+      devicetype, head = parse_device(headdevice)
+      names.extend(format_device(devicetype, head + i) for i in range(size))
+  return names
+
+def recv_exact(sock, size:int) -> bytes:
+  """ソケットから size バイトちょうど受信 (サーバ側でリクエストフレームを受信する場合など)
+
+  Raises:
+    EOFError: 受信途中で接続が切断された場合。
+  """
+  data = sock.recv(size)
+  if len(data) == size:
+    return data
+  if not data and size:
+    raise EOFError
+  # 分割して届いた場合は残りをバッファへ直接受信
+  buf = bytearray(size)
+  buf[:len(data)] = data
+  view = memoryview(buf)
+  pos = len(data)
+  while pos < size:
+    nbytes = sock.recv_into(view[pos:], size - pos)
+    if not nbytes:
+      raise EOFError
+    pos += nbytes
+  return bytes(buf)
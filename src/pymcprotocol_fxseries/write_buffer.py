@@ -0,0 +1,219 @@
+"""書き込みバッファ (write-behind)
+
+短い時間内に発行された書き込みを溜め、同じデバイス種類で隣接・重複するアドレスを
+連続ブロックの書き込みにまとめて送信します (重複するアドレスは後の書き込みが優先)。
+単発の設定値・コイル操作が続く場合も、数フレームで書き込めます。
+
+  - window 秒ごと (最初の書き込みからの経過時間) もしくは flush() で送信
+  - 各書き込みは concurrent.futures.Future で完了・エラーを返す
+  - 書き込み同士の順序は、同じアドレスに対しては保たれる
+    (ビット単位とワード単位で同じ範囲に書き込む場合は、先に溜まっている分を送信してから受け付ける)
+  - 送信前の書き込みは読み込みに反映されない (読み込み前に flush() すること)
+
+他のスレッドからも同じ接続を使用する場合は、plc に SharedType1E を指定してください。
+
+Example:
+  with WriteBuffer(plc, window=0.01) as writes:
+    writes.batchwrite_wordunits("D100", [1])
+    writes.batchwrite_wordunits("D101", [2])
+    future = writes.batchwrite_bitunits("M10", [1])
+    future.result()   # D100~D101 は1フレームで書き込まれる
+"""
+from concurrent.futures import Future
+import threading
+import time
+
+from pymcprotocol_fxseries.utility import format_device, parse_device
+import pymcprotocol_fxseries.type1e_const as const
+
+class WriteBuffer:
+  """書き込みバッファ
+
+  Args:
+    plc(Type1E | SharedType1E): 接続済みクライアント
+    window(float): 最初の書き込みから送信までの待ち時間 (秒)。
+                   None の場合は自動で送信しない (flush() を呼ぶこと)
+
+  Attributes:
+    writes(int):  受け付けた書き込み数
+    blocks(int):  送信したブロック数 (点数上限を超えるブロックは Type1E が分割して送信)
+    flushes(int): 送信回数
+  """
+
+  def __init__(self, plc, window:float=0.01):
+    if window is not None and window < 0:
+      raise ValueError("window must be 0 or more")
+    self.plc = plc
+    self.window = window
+
+    self.writes = 0
+    self.blocks = 0
+    self.flushes = 0
+
+    self._lock = threading.Lock()
+    self._cond = threading.Condition(self._lock)
+    # flush() を直列化 (送信中の書き込みより後の書き込みが先に送信されないようにする)
+    self._flush_lock = threading.Lock()
+    # (コマンド, デバイス種類) -> [(先頭番号, 最終番号 + 1, 1点あたりの増分, 値, Future)] (受け付け順)
+    self._pending = {}
+    self._deadline = None
+    self._closed = False
+    self._thread = None
+    if window is not None:
+      self._thread = threading.Thread(target=self._flush_loop, name="WriteBuffer", daemon=True)
+      self._thread.start()
+
+  # *** (public) 書き込み ***
+
+  def batchwrite_wordunits(self, headdevice:str, values) -> Future:
+    """ワード単位書き込みを溜める
+
+    Args:
+      headdevice(str): 先頭デバイス (ex: "D100")
+      values(list[int]): 書き込み値 (-32768 ~ 65535)
+
+    Returns:
+      future(Future): 送信完了 (結果は None)。送信エラーは例外として返す
+    """
+    return self._add(const.Command.WORD_WRITE, headdevice, [int(v) for v in values])
+
+  def batchwrite_bitunits(self, headdevice:str, values) -> Future:
+    """ビット単位書き込みを溜める
+
+    Args:
+      headdevice(str): 先頭デバイス (ex: "M10")
+      values(list[int]): 書き込み値 (0 or 1)
+
+    Returns:
+      future(Future): 送信完了 (結果は None)。送信エラーは例外として返す
+    """
+    return self._add(const.Command.BIT_WRITE, headdevice, [1 if v else 0 for v in values])
+
+  def _add(self, command:int, headdevice:str, values:list):
+    if not values:
+      raise ValueError("values must not be empty")
+    devicetype, num = parse_device(headdevice)
+    const.DeviceConstants.get_binary_devicecode(devicetype)
+    step = 16 if command == const.Command.WORD_WRITE \
+      and const.DeviceConstants.is_bit_device(devicetype) else 1
+    end = num + len(values) * step
+    key = (command, devicetype)
+
+    future = Future()
+    while True:
+      with self._lock:
+        if self._closed:
+          raise ConnectionError("WriteBuffer is closed")
+        if not self._conflicts(key, num, end, step):
+          self._pending.setdefault(key, []).append((num, end, step, values, future))
+          self.writes += 1
+          if self._deadline is None and self.window is not None:
+            self._deadline = time.monotonic() + self.window
+            self._cond.notify()
+          return future
+      # 溜まっている書き込みと順序が入れ替わらないよう、先に送信する
+      self.flush()
+
+  def _conflicts(self, key, num, end, step):
+    """ビット単位とワード単位 (もしくは16点境界のずれたワード単位) で範囲が重なるか"""
+    for other_key, writes in self._pending.items():
+      if other_key[1] != key[1]:
+        continue
+      for head, tail, *_ in writes:
+        if head < end and num < tail and (other_key != key or (num - head) % step != 0):
+          return True
+    return False
+
+  # *** (public) 送信 ***
+
+  def flush(self):
+    """溜まっている書き込みを送信 (完了まで待機)"""
+    with self._flush_lock:
+      with self._lock:
+        pending, self._pending = self._pending, {}
+        self._deadline = None
+      if not pending:
+        return
+      self.flushes += 1
+      for (command, devicetype), writes in pending.items():
+        self._write_group(command, devicetype, writes)
+
+  def _write_group(self, command, devicetype, writes):
+    # 取り消された書き込みは送信しない (以降は取り消せない)
+    writes = [write for write in writes if write[4].set_running_or_notify_cancel()]
+    if not writes:
+      return
+    step = writes[0][2]
+    # 後の書き込みが優先
+    points = {}
+    for num, _, _, values, _ in writes:
+      for i, value in enumerate(values):
+        points[num + i * step] = value
+
+    # 連続するデバイス番号ごとにブロックを作成
+    runs = []
+    for num in sorted(points):
+      if runs and num == runs[-1][1]:
+        runs[-1][1] = num + step
+        runs[-1][2].append(points[num])
+      else:
+        runs.append([num, num + step, [points[num]]])
+
+    errors = []
+    for head, tail, values in runs:
+      headdevice = format_device(devicetype, head)
+      self.blocks += 1
+      try:
+        if command == const.Command.WORD_WRITE:
+          self.plc.batchwrite_wordunits(headdevice, values)
+        else:
+          self.plc.batchwrite_bitunits(headdevice, values)
+      except Exception as e:
+        errors.append((head, tail, e))
+
+    for num, end, _, _, future in writes:
+      error = next((e for head, tail, e in errors if head < end and num < tail), None)
+      if error is None:
+        future.set_result(None)
+      else:
+        future.set_exception(error)
+
+  def _flush_loop(self):
+    while True:
+      with self._cond:
+        while not self._closed and (self._deadline is None or self._deadline > time.monotonic()):
+          self._cond.wait(None if self._deadline is None else self._deadline - time.monotonic())
+        if self._closed:
+          return
+      self.flush()
+
+  def close(self):
+    """自動送信を停止し、溜まっている書き込みを送信"""
+    with self._cond:
+      self._closed = True
+      self._cond.notify()
+    if self._thread is not None:
+      self._thread.join()
+      self._thread = None
+    self.flush()
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    self.close()
+
+  def stats(self):
+    """集計値
+
+    Returns:
+      (dict): writes, blocks, flushes, pending (未送信の書き込み数)
+    """
+    with self._lock:
+      pending = sum(len(writes) for writes in self._pending.values())
+    return {
+      "writes": self.writes,
+      "blocks": self.blocks,
+      "flushes": self.flushes,
+      "pending": pending,
+    }
@@ -0,0 +1,93 @@
+import socket
+import threading
+
+import pytest
+
+from pymcprotocol_fxseries import Type1E
+
+
+class FakePLC:
+  """socketpair 上で 1E フレーム(バイナリ)に応答する簡易PLC
+
+  デバイス種類は区別せず、デバイス番号ごとのワード/ビット値を保持する。
+  """
+  def __init__(self, sock):
+    self.sock = sock
+    self.words = {}
+    self.bits = {}
+    self.frames = []
+    self.split = False      # 応答を1バイトずつ送信する
+    self.abnormal = None    # 異常コード (0x5B 応答)
+    self.thread = threading.Thread(target=self._serve, daemon=True)
+    self.thread.start()
+
+  def _recv_exact(self, size):
+    data = b""
+    while len(data) < size:
+      chunk = self.sock.recv(size - len(data))
+      if not chunk:
+        raise EOFError
+      data += chunk
+    return data
+
+  def _serve(self):
+    try:
+      while True:
+        header = self._recv_exact(12)
+        command = header[0]
+        address = int.from_bytes(header[4:8], "little")
+        size = header[10] or 256
+        self.frames.append((command, address, size))
+
+        if command == 0x00:
+          nibbles = [self.bits.get(address + i, 0) for i in range(size)] + [0]
+          body = bytes((nibbles[i] << 4) | nibbles[i+1] for i in range(0, size, 2))
+        elif command == 0x01:
+          body = b"".join(self.words.get(address + i, 0).to_bytes(2, "little") for i in range(size))
+        elif command == 0x02:
+          data = self._recv_exact((size + 1) // 2)
+          for i in range(size):
+            self.bits[address + i] = (data[i // 2] >> (0 if i % 2 else 4)) & 0x0F
+          body = b""
+        else:
+          data = self._recv_exact(size * 2)
+          for i in range(size):
+            self.words[address + i] = int.from_bytes(data[i*2:i*2+2], "little")
+          body = b""
+        if self.abnormal is not None:
+          resp = bytes([command | 0x80, 0x5B, self.abnormal, 0x00])
+        else:
+          resp = bytes([command | 0x80, 0x00]) + body
+        if self.split:
+          for i in range(len(resp)):
+            self.sock.sendall(resp[i:i+1])
+        else:
+          self.sock.sendall(resp)
+    except (EOFError, OSError):
+      pass
+
+
+@pytest.fixture
+def plc():
+  client_sock, server_sock = socket.socketpair()
+  client = Type1E()
+  client.sock = client_sock
+  client.fake = FakePLC(server_sock)
+  yield client
+  client.close()
+  server_sock.close()
+
+
+@pytest.fixture
+def fake_server():
+  """1接続だけ受け付ける FakePLC サーバ"""
+  server = socket.create_server(("127.0.0.1", 0))
+  fakes = []
+
+  def accept():
+    conn, _ = server.accept()
+    fakes.append(FakePLC(conn))
+
+  threading.Thread(target=accept, daemon=True).start()
+  yield server.getsockname(), fakes
+  server.close()
@@ -0,0 +1,45 @@
+import asyncio
+import socket
+
+import pytest
+
+from pymcprotocol_fxseries import AsyncType1E, MCProtocolError
+
+
+def test_async_roundtrip(fake_server):
+  """asyncio版でも分割送信を含む読み書きができること"""
+  (host, port), fakes = fake_server
+
+  async def main():
+    async with AsyncType1E(host, port) as plc:
+      values = list(range(-50, 250))
+      await plc.batchwrite_wordunits("D0", values)
+      assert await plc.batchread_wordunits("D0", 300) == values
+
+      await plc.batchwrite_bitunits("M0", [1, 0, 1])
+      assert await plc.batchread_bitunits("M0", 3) == [1, 0, 1]
+
+      fakes[0].abnormal = 0x56
+      with pytest.raises(MCProtocolError):
+        await plc.batchread_wordunits("D0", 1)
+
+  asyncio.run(main())
+  assert [f[2] for f in fakes[0].frames[:5]] == [64, 64, 64, 64, 44]
+
+
+def test_async_timeout():
+  """応答がない場合は TimeoutError となり、接続が閉じられること"""
+  server = socket.create_server(("127.0.0.1", 0))
+  host, port = server.getsockname()
+
+  async def main():
+    plc = AsyncType1E(host, port, timeout=0.1)
+    await plc.connect()
+    with pytest.raises(TimeoutError):
+      await plc.batchread_wordunits("D0", 1)
+    assert plc.writer is None
+
+  try:
+    asyncio.run(main())
+  finally:
+    server.close()
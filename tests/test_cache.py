@@ -0,0 +1,46 @@
+import time
+
+from pymcprotocol_fxseries import CachedType1E, PLCSimulator, Type1E
+
+
+def test_subrange_hits_and_invalidation():
+  """部分範囲はキャッシュから返し、書き込みで重なる範囲が無効化されること"""
+  with PLCSimulator() as sim, Type1E(*sim.address) as plc:
+    sim.set_words("D0", list(range(100)))
+    sim.set_bits("M0", [1, 0, 1, 1])
+    cache = CachedType1E(plc, ttl=60)
+
+    assert cache.batchread_wordunits("D0", 100) == list(range(100))
+    count = sim.request_count
+    assert cache.batchread_wordunits("D10", 5) == [10, 11, 12, 13, 14]
+    assert cache.batchread_typed("D2", 1, "int32") == [2 + (3 << 16)]
+    assert cache.batchread_bitunits("M0", 4) == [1, 0, 1, 1]
+    assert cache.batchread_bitunits("M1", 3, output="bytes") == b"\x00\x01\x01"
+    assert sim.request_count == count + 1
+    assert cache.stats()["hits"] == 3
+
+    cache.batchwrite_wordunits("D50", [-1, -2])
+    assert cache.invalidations == 1
+    assert cache.batchread_wordunits("D49", 3) == [49, -1, -2]
+    cache.batchwrite_bitunits("M1", [1])
+    assert cache.batchread_bitunits("M0", 3) == [1, 1, 1]
+    assert cache.stats()["misses"] == 4
+
+
+def test_ttl():
+  """TTL はデバイス種類・範囲ごとに設定でき、期限切れは読み直すこと"""
+  with PLCSimulator() as sim, Type1E(*sim.address) as plc:
+    cache = CachedType1E(plc, ttl=60)
+    cache.set_ttl("R", 0.02)
+    cache.set_ttl(("D100", 10), 0)
+
+    cache.batchread_wordunits("D100", 5)
+    cache.batchread_wordunits("D100", 5)
+    assert cache.misses == 2
+
+    cache.batchread_wordunits("R0", 5)
+    sim.set_words("R0", [9])
+    assert cache.batchread_wordunits("R0", 1) == [0]
+    time.sleep(0.03)
+    assert cache.batchread_wordunits("R0", 1) == [9]
+    assert cache.stats()["hit_ratio"] == 0.2
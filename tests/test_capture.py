@@ -0,0 +1,62 @@
+import time
+
+from pymcprotocol_fxseries import FrameCapture, MCProtocolError, PLCSimulator, Type1E, read_capture
+from pymcprotocol_fxseries.replay import ReplayServer
+import pytest
+
+
+def test_capture(tmp_path):
+  """送受信フレームが時刻付きで記録され、追記・途中切れに耐えること"""
+  path = tmp_path / "traffic.fxcap"
+  with PLCSimulator() as sim, Type1E(*sim.address) as plc:
+    sim.set_words("D0", [1, 2, 3])
+    with FrameCapture(path) as capture:
+      plc.set_capture(capture)
+      before = time.time()
+      plc.batchread_wordunits("D0", 3)
+      plc.batchwrite_bitunits("M0", [1])
+    with FrameCapture(path) as capture:
+      plc.set_capture(capture)
+      plc.batchread_wordunits("D0", 100)   # 2フレーム
+      plc.set_capture(None)
+      plc.batchread_wordunits("D0", 1)
+
+  records = list(read_capture(path))
+  assert len(records) == 4
+  assert records[0].request == plc._make_send_data(0x01, "D0", 3)
+  assert records[0].response == b"\x81\x00\x01\x00\x02\x00\x03\x00"
+  assert records[1].response == b"\x82\x00"
+  assert before <= records[0].timestamp <= records[1].timestamp
+  assert all(r.rtt >= 0 for r in records)
+
+  # 書き込み途中のレコードは無視する
+  with open(path, "ab") as f:
+    f.write(b"\x40\x00\x00\x00\x01")
+  assert len(list(read_capture(path))) == 4
+
+
+def test_replay(tmp_path):
+  """記録した応答を再生し、記録にないリクエストは異常応答となること"""
+  path = tmp_path / "traffic.fxcap"
+  with PLCSimulator() as sim, Type1E(*sim.address) as plc:
+    with FrameCapture(path) as capture:
+      plc.set_capture(capture)
+      for value in (10, 20):
+        sim.set_words("D0", [value])
+        plc.batchread_wordunits("D0", 1)
+
+  with ReplayServer(path, speed=0) as server, Type1E(*server.address) as plc:
+    assert [plc.batchread_wordunits("D0", 1) for _ in range(3)] == [[10], [20], [10]]
+    with pytest.raises(MCProtocolError):
+      plc.batchread_wordunits("D1", 1)
+    assert server.misses == 1
+
+  records = list(read_capture(path))
+  records[1].timestamp = records[0].timestamp + 0.2
+  with ReplayServer(records, speed=2.0, mode="sequence") as server, Type1E(*server.address) as plc:
+    started = time.monotonic()
+    assert plc.batchread_wordunits("D0", 1) == [10]
+    assert plc.batchread_wordunits("D9", 1) == [20]
+    # 2倍速: 0.2秒後の記録は 0.1秒後に応答
+    assert time.monotonic() - started >= 0.09
+    assert server.misses == 1
@@ -0,0 +1,37 @@
+import pytest
+
+from pymcprotocol_fxseries import datatype
+
+
+def test_word_order():
+  """下位ワードが若番 (little) / 上位ワードが若番 (big) で変換できること"""
+  assert datatype.encode_words([0x12345678], "uint32") == bytes.fromhex("78563412")
+  assert datatype.encode_words([0x12345678], "uint32", "big") == bytes.fromhex("34127856")
+  with pytest.raises(ValueError):
+    datatype.encode_words([1e39], "float32")
+  data = datatype.encode_words([1.5, -2.25], "float32", "big")
+  assert datatype.decode_words(data, "float32", 2, "big") == [1.5, -2.25]
+
+
+def test_bcd():
+  """BCD の変換と不正値の検出"""
+  assert datatype.encode_words([1234], "bcd16") == bytes.fromhex("3412")
+  assert datatype.decode_words(bytes.fromhex("78563412"), "bcd32", 1) == [12345678]
+  with pytest.raises(ValueError):
+    datatype.decode_words(bytes.fromhex("0A00"), "bcd16", 1)
+  with pytest.raises(ValueError):
+    datatype.encode_words([10000], "bcd16")
+
+
+def test_typed_roundtrip(plc):
+  """型指定・文字列の読み書きがワード単位アクセスで行われること"""
+  plc.batchwrite_typed("D100", [-100000, 2**31 - 1], "int32")
+  assert plc.batchread_typed("D100", 2, "int32") == [-100000, 2**31 - 1]
+  assert plc.fake.frames[-1][2] == 4
+
+  plc.batchwrite_typed("D200", [3.5], "float64")
+  assert plc.batchread_typed("D200", 1, "float64") == [3.5]
+
+  plc.batchwrite_string("D300", "ABC")
+  assert plc.fake.words[300] == 0x4241
+  assert plc.batchread_string("D300", 4) == "ABC"
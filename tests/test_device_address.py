@@ -0,0 +1,51 @@
+import pytest
+
+from pymcprotocol_fxseries import DeviceAddress, PLCSimulator, ReadPlan, Type1E, get_address
+from pymcprotocol_fxseries.utility import expand_devices, format_device, parse_device
+import pymcprotocol_fxseries.type1e_const as const
+
+
+def test_octal_devices():
+  """X/Y のデバイス番号は8進で解釈・表記されること"""
+  assert parse_device("X17") == ("X", 15)
+  assert parse_device("Y100") == ("Y", 64)
+  assert parse_device("D17") == ("D", 17)
+  assert format_device("X", 15) == "X17"
+  assert format_device("M", 15) == "M15"
+  assert expand_devices([("X6", 4)]) == ["X6", "X7", "X10", "X11"]
+  with pytest.raises(ValueError):
+    parse_device("X8")
+
+
+def test_address_cache():
+  """DeviceAddress はデバイス部をエンコード済みで保持し、キャッシュされること"""
+  address = get_address("X17")
+  assert address is get_address("X17")
+  assert get_address(address) is address
+  assert address.binary == (15).to_bytes(4, "little") + (0x5820).to_bytes(2, "little")
+  assert address.is_bit
+  assert address.offset(1).name == "X20"
+  assert address == DeviceAddress.parse("X17")
+  with pytest.raises(const.DeviceCodeError):
+    get_address("Q0")
+
+  plc = Type1E()
+  frame = plc._make_send_data(const.Command.WORD_READ, "D100", 10)
+  assert frame is plc._make_send_data(const.Command.WORD_READ, "D100", 10)
+  assert frame == bytes([0x01, 0xFF, 0x0A, 0x00, 100, 0, 0, 0, 0x20, 0x44, 10, 0x00])
+  # PC番号・監視タイマもキー
+  plc.set_accessopt(pc=0x01)
+  assert plc._make_send_data(const.Command.WORD_READ, "D100", 10)[1] == 0x01
+
+
+def test_octal_read():
+  """X/Y の読み書き・読み込みプランが8進のデバイス番号で一致すること"""
+  with PLCSimulator() as sim, Type1E(*sim.address) as plc:
+    sim.set_bits("X10", [1])
+    assert sim.memory["X"][8] == 1
+    assert plc.batchread_bitunits("X7", 2) == [0, 1]
+    assert plc.batchread_bitunits(get_address("X10"), 1) == [1]
+
+    plan = ReadPlan(["X7", "X10", "X12"])
+    assert [b.headdevice for b in plan.blocks] == ["X7"]
+    assert plan.read(plc) == {"X7": 0, "X10": 1, "X12": 0}
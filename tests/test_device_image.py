@@ -0,0 +1,59 @@
+import subprocess
+import sys
+import time
+
+import pytest
+
+from pymcprotocol_fxseries import DeviceImagePublisher, DeviceImageReader, PLCSimulator, Type1E
+
+
+@pytest.fixture
+def sim_plc():
+  with PLCSimulator() as sim, Type1E(*sim.address) as client:
+    client.sim = sim
+    yield client
+
+
+def test_publish_and_view(sim_plc):
+  """読み込んだ範囲がコピーなしのビューで参照できること"""
+  sim_plc.sim.set_words("D0", [1, 2, 65535])
+  sim_plc.sim.set_bits("M10", [1, 0, 1])
+  with DeviceImagePublisher(sim_plc, [("D0", 300), ("M0", 64)]) as publisher:
+    publisher.publish_once()
+    with DeviceImageReader(publisher.name) as reader:
+      assert reader.sequence == 2 and reader.timestamp > 0
+      view = reader.view("D1", 2)
+      assert view.format == "H" and view.tolist() == [2, 65535]
+
+      # ビューは共有メモリを直接参照する
+      sim_plc.sim.set_words("D1", [7])
+      seq = reader.begin()
+      publisher.publish_once()
+      assert not reader.validate(seq)
+      assert view.tolist() == [7, 65535]
+      view.release()
+
+      assert reader.read("D2", 1, signed=True).tolist() == [-1]
+      assert reader.read("M10", 3).tolist() == [1, 0, 1]
+      with pytest.raises(KeyError):
+        reader.view("D299", 2)
+
+
+def test_other_process(sim_plc):
+  """別プロセスのリーダーから参照できること"""
+  sim_plc.sim.set_words("R0", [11, 22])
+  with DeviceImagePublisher(sim_plc, [("R0", 2)], period=0.01) as publisher:
+    publisher.start()
+    deadline = time.monotonic() + 2
+    while publisher.updates == 0 and time.monotonic() < deadline:
+      time.sleep(0.01)
+
+    code = (
+      "from pymcprotocol_fxseries import DeviceImageReader\n"
+      f"reader = DeviceImageReader({publisher.name!r})\n"
+      "print(reader.read('R0', 2).tolist())\n"
+      "reader.close()\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, timeout=30)
+    assert result.stdout.strip() == "[11, 22]", result.stderr
+    assert publisher.errors == 0
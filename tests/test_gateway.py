@@ -0,0 +1,137 @@
+import os
+import socket
+import tempfile
+import threading
+
+import pytest
+
+from pymcprotocol_fxseries import MCProtocolError, PLCSimulator, Type1E
+from pymcprotocol_fxseries.gateway import Gateway
+from pymcprotocol_fxseries.type1e_frame import Type1EFrame
+import pymcprotocol_fxseries.type1e_const as const
+
+
+@pytest.fixture
+def sim():
+  with PLCSimulator() as simulator:
+    yield simulator
+
+
+def test_clients_through_gateway(sim):
+  """複数クライアントが Type1E のまま読み書きでき、PLC への接続は1本であること"""
+  sim.set_words("D0", list(range(100)))
+  errors = []
+  with Gateway(Type1E(*sim.address), cache_ttl=0) as gateway:
+    def worker(n):
+      try:
+        with Type1E(*gateway.address) as plc:
+          for _ in range(10):
+            assert plc.batchread_wordunits(f"D{n * 10}", 10) == list(range(n * 10, n * 10 + 10))
+          plc.batchwrite_wordunits(f"R{n}", [n])
+          plc.batchwrite_bitunits(f"M{n}", [1])
+          assert plc.batchread_bitunits(f"M{n}", 1) == [1]
+      except Exception as e:
+        errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(6)]
+    for t in threads:
+      t.start()
+    for t in threads:
+      t.join()
+
+    assert not errors
+    assert sim.connection_count == 1
+    assert sim.get_words("R0", 6) == list(range(6))
+
+    # 異常応答はそのまま返す
+    with Type1E(*gateway.address) as plc:
+      with pytest.raises(MCProtocolError) as e:
+        plc.batchread_wordunits("D8500", 20)
+      assert e.value.errorcode == "0x8158"
+
+
+def test_cache(sim):
+  """同一の読み込みはキャッシュから返し、書き込みでキャッシュが破棄されること"""
+  with Gateway(Type1E(*sim.address), cache_ttl=60) as gateway, Type1E(*gateway.address) as plc:
+    assert plc.batchread_wordunits("D0", 5) == [0] * 5
+    count = sim.request_count
+    plc.set_accessopt(pc=0x01)  # PC番号が違っても同じ読み込みとして扱う
+    assert plc.batchread_wordunits("D0", 5) == [0] * 5
+    assert sim.request_count == count
+    assert gateway.stats()["cache_hits"] == 1
+
+    plc.batchwrite_wordunits("D1", [3])
+    assert plc.batchread_wordunits("D0", 5) == [0, 3, 0, 0, 0]
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="Unix sockets are not supported")
+def test_unix_socket(sim):
+  """Unix ソケットで待ち受けできること"""
+  sim.set_words("D0", [7])
+  path = os.path.join(tempfile.mkdtemp(), "gateway.sock")
+  with Gateway(Type1E(*sim.address), unix_path=path) as gateway:
+    frame = Type1EFrame()
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+      client.connect(gateway.address)
+      client.sendall(frame._make_send_data(const.Command.WORD_READ, "D0", 1))
+      assert client.recv(64) == b"\x81\x00\x07\x00"
+  assert not os.path.exists(path)
+
+
+def test_write_during_read(sim):
+  """書き込み前に送信した読み込みの応答を、書き込み後の読み込みに返さないこと"""
+  with Gateway(Type1E(*sim.address), cache_ttl=60) as gateway:
+    read = gateway._read
+    calls = []
+    received = threading.Event()
+    release = threading.Event()
+
+    def slow_read(*args):
+      result = read(*args)
+      calls.append(result)
+      if len(calls) == 1:
+        # 1回目の読み込みは応答を受信した後で待機させる
+        received.set()
+        release.wait(5)
+      return result
+
+    gateway._read = slow_read
+    results = []
+    with Type1E(*gateway.address) as plc1, Type1E(*gateway.address) as plc2:
+      reader = threading.Thread(target=lambda: results.append(plc1.batchread_wordunits("D0", 2)))
+      reader.start()
+      assert received.wait(5)
+
+      plc2.batchwrite_wordunits("D0", [5, 6])
+      # 送信中の (書き込み前の) 読み込みを共有しない
+      assert plc2.batchread_wordunits("D0", 2) == [5, 6]
+
+      release.set()
+      reader.join()
+      assert results == [[0, 0]]
+      # 書き込み前の応答はキャッシュされない
+      assert plc2.batchread_wordunits("D0", 2) == [5, 6]
+
+
+def test_plc_timeout(sim):
+  """PLC のタイムアウト後に遅れて届いた応答を、次のクライアントに返さないこと"""
+  sim.set_words("D0", [111])
+  sim.set_words("D10", [222])
+  sim.latency = 0.3
+  with Gateway(Type1E(*sim.address, timeout=0.1), cache_ttl=0) as gateway:
+    with Type1E(*gateway.address) as plc:
+      with pytest.raises(ConnectionError):
+        plc.batchread_wordunits("D0", 1)
+    sim.latency = 0
+    with Type1E(*gateway.address) as plc:
+      assert plc.batchread_wordunits("D10", 1) == [222]
+      assert plc.batchread_wordunits("D10", 1) == [222]
+
+    # そのまま転送するフレーム (書き込み) も同様
+    sim.latency = 0.3
+    with Type1E(*gateway.address) as plc:
+      with pytest.raises(ConnectionError):
+        plc.batchwrite_wordunits("D20", [1])
+    sim.latency = 0
+    with Type1E(*gateway.address) as plc:
+      assert plc.batchread_wordunits("D10", 1) == [222]
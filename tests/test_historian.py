@@ -0,0 +1,48 @@
+import pytest
+
+from pymcprotocol_fxseries import Historian, PLCSimulator, Type1E
+
+
+def test_ring_buffer_and_queries():
+  """古いサンプルから上書きされ、期間の取得・間引きができること"""
+  historian = Historian(None, [("D0", 2), "M0"], capacity=5)
+  assert historian.latest() == (None, {})
+  for t in range(8):
+    historian.append({"D0": t, "D1": -t, "M0": t % 2}, timestamp=100.0 + t)
+
+  assert len(historian) == 5 and historian.written == 8
+  # 折り返している期間はコピー
+  times, values = historian.query("D1")
+  assert list(times) == [103.0, 104.0, 105.0, 106.0, 107.0]
+  assert list(values) == [-3, -4, -5, -6, -7]
+  # 折り返していない期間はビュー
+  times, values = historian.query("D0", start=105.0, end=107.0)
+  assert isinstance(values, memoryview) and list(values) == [5, 6]
+  assert historian.latest() == (107.0, {"D0": 7, "D1": -7, "M0": 1})
+
+  buckets = historian.downsample("D0", 2.0, start=102.0)
+  assert [list(a) for a in buckets] == [
+    [102.0, 104.0, 106.0], [3, 4, 6], [3, 5, 7], [3.0, 4.5, 6.5]]
+  assert historian.downsample("D0", 1.0, start=200.0)[0].tolist() == []
+  historian.close()
+
+
+def test_persistence(tmp_path):
+  """ファイルにメモリマップし、再起動後に履歴を引き継ぐこと"""
+  path = str(tmp_path / "trend.fxhs")
+  with PLCSimulator() as sim, Type1E(*sim.address) as plc:
+    sim.set_words("D100", [1, 2, 3])
+    with Historian(plc, [("D100", 3)], capacity=10, path=path) as historian:
+      historian.sample()
+      sim.set_words("D100", [4])
+      historian.sample()
+
+  with Historian(None, ["D100", "D101", "D102"], capacity=10, path=path) as historian:
+    assert len(historian) == 2
+    times, values = historian.query("D100")
+    assert list(values) == [1, 4]
+    assert times[0] <= times[1]
+    del times, values
+
+  with pytest.raises(ValueError):
+    Historian(None, ["D100"], capacity=10, path=path)
@@ -0,0 +1,44 @@
+import pytest
+
+from pymcprotocol_fxseries import MCProtocolError, Metrics, MetricsHook, PLCSimulator, Type1E
+from pymcprotocol_fxseries.metrics import Histogram
+
+
+def test_histogram():
+  """固定バケットへの集計とパーセンタイル推定"""
+  hist = Histogram((10, 100, 1000))
+  for value in (5, 5, 50, 500, 5000):
+    hist.observe(value)
+  assert hist.counts == [2, 1, 1, 1]
+  assert hist.percentile(50) == 100
+  assert hist.percentile(99) == 5000
+  assert hist.snapshot()["buckets"]["+Inf"] == 1
+
+
+def test_metrics_hooks():
+  """コマンド別件数・バイト数・エラー・再接続が集計され、フックへ転送されること"""
+  received = []
+
+  class Hook(MetricsHook):
+    def on_request(self, command, size, *args):
+      received.append((command, size))
+
+  metrics = Metrics()
+  metrics.add_hook(Hook())
+  with PLCSimulator() as sim, Type1E(*sim.address) as plc:
+    plc.set_metrics(metrics)
+    plc.batchread_wordunits("D0", 100)
+    plc.batchwrite_bitunits("M0", [1, 0, 1])
+    with pytest.raises(MCProtocolError):
+      plc.batchread_wordunits("D8511", 2)
+    plc.connect()
+
+  snapshot = metrics.snapshot()
+  assert snapshot["requests"] == {"word_read": 3, "bit_write": 1}
+  assert snapshot["points"] == {"word_read": 102, "bit_write": 3}
+  assert snapshot["bytes_received"] == 2 + 128 + 2 + 72 + 2 + 2
+  assert snapshot["errors"] == {"0x8158": 1}
+  assert snapshot["reconnects"] == 1
+  assert snapshot["latency_us"]["wait"]["count"] == 4
+  assert snapshot["latency_us"]["decode"]["count"] == 2
+  assert received == [(1, 64), (1, 36), (2, 3), (1, 2)]
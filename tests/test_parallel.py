@@ -0,0 +1,63 @@
+import time
+
+import pytest
+
+from pymcprotocol_fxseries import MCProtocolError, ParallelType1E, PLCSimulator, ReadPlan
+
+
+def test_fanout_read():
+  """大きな読み込みが複数接続で並列に送受信され、順序どおりに組み立てられること"""
+  with PLCSimulator(latency=0.02) as sim:
+    sim.set_words("D0", [i * 3 for i in range(2048)])
+    sim.set_bits("M0", [i % 3 == 0 for i in range(2048)])
+
+    with ParallelType1E(*sim.address, connections=4) as plc:
+      assert plc.connected == 4
+      start = time.perf_counter()
+      assert plc.batchread_wordunits("D0", 2048, signed=False) == [i * 3 for i in range(2048)]
+      # 逐次なら 32フレーム x 20ms
+      assert time.perf_counter() - start < 0.5
+      assert plc.batchread_bitunits("M0", 2048) == [int(i % 3 == 0) for i in range(2048)]
+
+      plan = ReadPlan(["D0", "D300", "D600", "M9"], gap=0)
+      assert plc.read_plan(plan) == {"D0": 0, "D300": 900, "D600": 1800, "M9": 1}
+
+      plc.batchwrite_wordunits("R0", [1, 2])
+      assert sim.get_words("R0", 2) == [1, 2]
+
+
+def test_connection_failure():
+  """切断された接続は切り離され、別の接続で読み込みが継続されること"""
+  with PLCSimulator() as sim:
+    sim.set_words("D0", list(range(512)))
+    with ParallelType1E(*sim.address, connections=3, reconnect_interval=60) as plc:
+      plc.batchread_wordunits("D0", 1)
+      assert sim.disconnect_clients(2) == 2
+
+      assert plc.batchread_wordunits("D0", 512) == list(range(512))
+      assert plc.connected == 1
+
+      # 異常応答では接続を切り離さない
+      with pytest.raises(MCProtocolError):
+        plc.batchread_wordunits("D8500", 20)
+      assert plc.connected == 1
+
+      plc.reconnect_interval = 0
+      plc.batchread_wordunits("D0", 1)
+      assert plc.connected == 3
+
+
+def test_all_down():
+  """全接続が失敗した場合は ConnectionError となること"""
+  with PLCSimulator() as sim:
+    address = sim.address
+  plc = ParallelType1E(*address, connections=2)
+  with pytest.raises(ConnectionError):
+    plc.connect()
+
+
+def test_positional_arguments():
+  """Type1E と同じ位置引数 (ip, port, timeout, commtype) を受け付けること"""
+  plc = ParallelType1E("127.0.0.1", 5000, 0.5)
+  assert len(plc.clients) == 4
+  assert all(client.soc_timeout == 0.5 for client in plc.clients)
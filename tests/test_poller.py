@@ -0,0 +1,98 @@
+import socket
+import time
+
+from pymcprotocol_fxseries import MultiPoller, PLCSimulator
+
+
+def _run_until(poller, condition, timeout=3.0):
+  results = []
+  deadline = time.monotonic() + timeout
+  while not condition(results) and time.monotonic() < deadline:
+    results += poller.run_once(max_wait=0.05)
+  return results
+
+
+def test_poll_many():
+  """複数 PLC を1スレッドでポーリングし、応答しない PLC が他を止めないこと"""
+  hung = socket.socket()
+  hung.bind(("127.0.0.1", 0))
+  hung.listen()
+
+  with PLCSimulator() as sim1, PLCSimulator() as sim2, MultiPoller(timeout=0.3, reconnect_interval=0.1) as poller:
+    sim1.set_words("D100", [1, 2, 3])
+    sim2.set_bits("M0", [1, 0, 1])
+    poller.add("a", *sim1.address, [("D100", 3)], period=0.05)
+    poller.add("b", *sim2.address, [("M0", 3), "D0"], period=0.05)
+    poller.add("hung", *hung.getsockname(), ["D0"], period=0.05)
+
+    results = _run_until(poller, lambda rs: sum(r.group == "hung" for r in rs) >= 1
+      and sum(r.group == "a" and r.error is None for r in rs) >= 3)
+
+    values = {r.group: r.values for r in results if r.error is None}
+    assert values["a"] == {"D100": 1, "D101": 2, "D102": 3}
+    assert values["b"] == {"M0": 1, "M1": 0, "M2": 1, "D0": 0}
+    errors = [r.error for r in results if r.group == "hung"]
+    assert isinstance(errors[0], TimeoutError)
+
+    stats = poller.stats()
+    assert stats["a"]["state"] in ("idle", "sending", "receiving")
+    assert stats["a"]["errors"] == 0
+  hung.close()
+
+
+def test_reconnect_and_errors():
+  """異常応答は接続を維持し、切断時は再接続してポーリングを再開すること"""
+  with PLCSimulator() as sim, MultiPoller(timeout=0.5, reconnect_interval=0.05) as poller:
+    received = []
+    poller.add("bad", *sim.address, [("D8500", 20)], period=0.05)
+    poller.add("good", *sim.address, ["D0"], period=0.05, callback=received.append)
+
+    results = _run_until(poller, lambda rs: any(r.group == "bad" for r in rs) and received)
+    bad = [r for r in results if r.group == "bad"][0]
+    assert bad.error.errorcode == "0x8158"
+    assert poller.targets["bad"].connects == 1
+
+    sim.disconnect_clients()
+    _run_until(poller, lambda rs: poller.targets["good"].connects >= 2 and received[-1].error is None)
+    assert poller.targets["good"].connects >= 2
+    assert any(r.error is not None for r in received)
+    assert received[-1].values == {"D0": 0}
+
+
+def test_callback_error():
+  """コールバックの例外を対象ごとに集計し、他の対象の通知とポーリングを継続すること"""
+  def failing(result):
+    raise RuntimeError("callback failed")
+
+  with PLCSimulator() as sim, MultiPoller(timeout=0.5) as poller:
+    received = []
+    poller.add("bad", *sim.address, ["D0"], period=0.05, callback=failing)
+    poller.add("good", *sim.address, ["D1"], period=0.05, callback=received.append)
+
+    _run_until(poller, lambda rs: len(received) >= 3 and poller.targets["bad"].callback_errors >= 3)
+    bad = poller.targets["bad"]
+    assert len(received) >= 3
+    assert bad.callback_errors >= 3
+    assert isinstance(bad.last_callback_error, RuntimeError)
+    assert poller.stats()["bad"]["callback_errors"] == bad.callback_errors
+
+
+def test_remove_while_running():
+  """ポーリング中に削除した対象は、ポーリングスレッドで切断され再接続されないこと"""
+  with PLCSimulator() as sim, MultiPoller(timeout=0.5, reconnect_interval=0.01) as poller:
+    target = poller.add("a", *sim.address, ["D0"], period=0.01)
+    poller.add("b", *sim.address, ["D1"], period=0.01)
+    poller.start()
+    deadline = time.monotonic() + 3
+    while target.polls < 3 and time.monotonic() < deadline:
+      time.sleep(0.01)
+    assert target.polls >= 3
+
+    poller.remove("a")
+    time.sleep(0.1)
+    polls = target.polls
+    assert target.sock is None and target.state == "disconnected"
+    assert [key.data for key in poller._selector.get_map().values() if key.data is target] == []
+    time.sleep(0.1)
+    assert target.polls == polls
+    assert poller.targets["b"].polls > 3
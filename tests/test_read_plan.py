@@ -0,0 +1,38 @@
+import pytest
+
+from pymcprotocol_fxseries import ReadPlan
+
+
+def test_plan_blocks():
+  """近いアドレスは連結され、空きが大きい/上限を超える場合は分割されること"""
+  plan = ReadPlan(["D12", "D15", "D300", "D20", "M8000", "M8003", "X17"], gap=8)
+  assert [(b.headdevice, b.size) for b in plan.blocks] == [
+    ("D12", 9), ("D300", 1), ("M8000", 4), ("X17", 1)]
+
+  plan = ReadPlan([f"D{i}" for i in range(0, 200, 2)], gap=1, wordread_points=64)
+  assert [(b.headdevice, b.size) for b in plan.blocks] == [
+    ("D0", 63), ("D64", 63), ("D128", 63), ("D192", 7)]
+
+  with pytest.raises(Exception):
+    ReadPlan(["Q0"])
+
+
+def test_plan_read(plc):
+  """プランで読んだ値が元のデバイス名で取得できること"""
+  plc.fake.words.update({12: 120, 15: 150, 300: 3000})
+  plc.fake.bits.update({8003: 1})
+  plan = ReadPlan(["D300", "D12", "D15", "M8003", "M8000", "D012"], gap=8)
+  assert plan.read(plc) == {
+    "D300": 3000, "D12": 120, "D15": 150, "M8003": 1, "M8000": 0, "D012": 120}
+  # 3ブロック = 3フレーム
+  assert len(plc.fake.frames) == 3
+
+
+def test_plan_widths():
+  """複数ワードのデバイスがブロックをまたがないこと"""
+  plan = ReadPlan(["D0", "D6", "D10"], gap=8, wordread_points=8, widths={"D6": 2, "D10": 4})
+  assert [(b.headdevice, b.size) for b in plan.blocks] == [("D0", 8), ("D10", 4)]
+  assert plan.locate("D6") == (0, 6)
+
+  with pytest.raises(ValueError):
+    ReadPlan(["D0"], wordread_points=2, widths={"D0": 4})
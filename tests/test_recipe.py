@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+
+from pymcprotocol_fxseries import AsyncType1E, PLCSimulator, Type1E, VerifyError
+
+
+def test_download_recipe():
+  """変更のある範囲のみ書き込み、近い範囲はまとめること"""
+  with PLCSimulator() as sim, Type1E(*sim.address) as plc:
+    current = list(range(1000))
+    sim.set_words("D0", current)
+    recipe = list(current)
+    recipe[10] = -1
+    recipe[12] = -2       # D10 と空き1点 -> まとめる
+    recipe[500] = 7       # 離れているので別の書き込み
+    recipe[999] = 8
+
+    count = sim.request_count
+    result = plc.download_recipe("D0", recipe, gap=4)
+    assert result == {"points": 1000, "changed": 4, "blocks": 3, "written": 5}
+    # 読み込み 16フレーム (64点ずつ) + 書き込み 3フレーム
+    assert sim.request_count == count + 16 + 3
+    assert sim.get_words("D0", 1000) == [v & 0xFFFF for v in recipe]
+
+    count = sim.request_count
+    assert plc.download_recipe("D0", recipe)["blocks"] == 0
+    assert sim.request_count == count + 16
+
+
+def test_download_recipe_verify():
+  """read-back で不一致を検出し、asyncio 版でも使えること"""
+  with PLCSimulator() as sim:
+    # 書き込みを反映しないデバイスを模擬
+    handle_request = sim.handle_request
+    sim.handle_request = lambda frame: handle_request(frame) if frame[0] != 0x03 else b"\x83\x00"
+
+    with Type1E(*sim.address) as plc:
+      with pytest.raises(VerifyError) as e:
+        plc.download_recipe("D100", [0, 5, 0], verify=True)
+      assert e.value.mismatches == [("D101", 5, 0)]
+
+    sim.handle_request = handle_request
+
+    async def main():
+      async with AsyncType1E(*sim.address) as plc:
+        return await plc.download_recipe("D100", [0, 5, 6], verify=True)
+
+    assert asyncio.run(main())["written"] == 2
+    assert sim.get_words("D100", 3) == [0, 5, 6]
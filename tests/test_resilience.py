@@ -0,0 +1,123 @@
+import socket
+import threading
+import time
+
+import pytest
+
+from pymcprotocol_fxseries import Metrics, PLCSimulator, Type1E
+from pymcprotocol_fxseries.resilience import ReconnectPolicy, RttEstimator, backoff_delay
+
+
+def test_backoff_and_rtt():
+  """指数バックオフ (上限・ジッター) と往復時間からのタイムアウト計算"""
+  assert [backoff_delay(n, 0.1, 0.5, 0) for n in range(4)] == [0.1, 0.2, 0.4, 0.5]
+  assert 0.1 <= backoff_delay(1, 0.1, 5.0, 0.5) <= 0.2
+
+  rtt = RttEstimator(2.0, min_timeout=0.05, max_timeout=2.0)
+  assert rtt.timeout == 2.0
+  rtt.update(0.01)
+  assert rtt.srtt == 0.01 and rtt.timeout == pytest.approx(0.05)
+  for _ in range(20):
+    rtt.update(0.1)
+  assert 0.1 < rtt.timeout < 0.2
+  rtt.on_timeout()
+  assert 0.2 < rtt.timeout < 0.4
+
+
+def test_force_connect_backoff(monkeypatch):
+  """force_connect のリトライ間隔が指数的に延びること"""
+  delays = []
+  monkeypatch.setattr(time, "sleep", delays.append)
+  with PLCSimulator() as sim:
+    address = sim.address
+  plc = Type1E(*address)
+  with pytest.raises(ConnectionError):
+    plc.force_connect(retries=4, delay=0.1, jitter=0)
+  assert delays == [0.1, 0.2, 0.4]
+
+
+def test_read_retry():
+  """切断後の読み込みは自動で再接続・再送されること"""
+  metrics = Metrics()
+  with PLCSimulator() as sim, Type1E(*sim.address) as plc:
+    sim.set_words("D0", [5, 6])
+    plc.set_metrics(metrics)
+    plc.set_reconnect(ReconnectPolicy(base_delay=0.01))
+
+    assert plc.batchread_wordunits("D0", 2) == [5, 6]
+    sim.disconnect_clients()
+    assert plc.batchread_wordunits("D0", 2) == [5, 6]
+    plc.set_metrics(None)
+    sim.disconnect_clients()
+    assert plc.batchread_wordunits("D0", 2) == [5, 6]
+    assert metrics.reconnects == 1
+
+    # 送信前に切断を検出した場合は書き込みも送信する
+    sim.disconnect_clients()
+    time.sleep(0.05)
+    plc.batchwrite_wordunits("D0", [7])
+    assert sim.get_words("D0", 1) == [7]
+
+
+def test_write_not_retried():
+  """送信後に切断された書き込みは再送しないこと"""
+  server = socket.socket()
+  server.bind(("127.0.0.1", 0))
+  server.listen()
+  received = []
+
+  def serve():
+    try:
+      while True:
+        conn, _ = server.accept()
+        received.append(conn.recv(1024))
+        conn.close()
+    except OSError:
+      pass
+
+  thread = threading.Thread(target=serve, daemon=True)
+  thread.start()
+  with Type1E(*server.getsockname()) as plc:
+    plc.set_reconnect(ReconnectPolicy(retries=3, base_delay=0.01))
+    with pytest.raises(ConnectionError):
+      plc.batchwrite_wordunits("D0", [1])
+    assert len(received) == 1
+    # 読み込みは再送される (初回 + 3回)
+    with pytest.raises(ConnectionError):
+      plc.batchread_wordunits("D0", 1)
+    assert len(received) == 5
+  server.close()
+
+
+def test_adaptive_timeout():
+  """往復時間から受信タイムアウトが短縮されること"""
+  with PLCSimulator() as sim, Type1E(*sim.address, timeout=2) as plc:
+    plc.set_reconnect(ReconnectPolicy(adaptive_timeout=True, min_timeout=0.05))
+    for _ in range(10):
+      plc.batchread_wordunits("D0", 1)
+    assert plc.rtt.timeout < 0.5
+    assert plc.sock.gettimeout() == plc.rtt.timeout
+
+
+def test_adaptive_timeout_write():
+  """書き込みは適応タイムアウトではなく接続時のタイムアウトで待つこと"""
+  with PLCSimulator() as sim, Type1E(*sim.address, timeout=2) as plc:
+    plc.set_reconnect(ReconnectPolicy(adaptive_timeout=True, min_timeout=0.05))
+    for _ in range(30):
+      plc.batchread_wordunits("D0", 1)
+    assert plc.rtt.timeout == pytest.approx(0.05)
+
+    sim.latency = 0.08
+    plc.batchwrite_wordunits("D5", [42])
+    assert sim.get_words("D5", 1) == [42]
+    # 読み込みはタイムアウト後に再送する
+    assert plc.batchread_wordunits("D5", 1) == [42]
+
+
+def test_adaptive_timeout_default():
+  """適応タイムアウトはデフォルトで無効であること"""
+  with PLCSimulator() as sim, Type1E(*sim.address, timeout=2) as plc:
+    plc.set_reconnect(ReconnectPolicy())
+    assert plc.rtt is None
+    plc.batchread_wordunits("D0", 1)
+    assert plc.sock.gettimeout() == 2
@@ -0,0 +1,72 @@
+import queue
+import time
+
+from pymcprotocol_fxseries import ScanScheduler
+
+
+def test_merge_due_groups(plc):
+  """同時期に期限を迎えたグループが1回の読み込みにまとめられること"""
+  plc.fake.words.update({100: 1, 101: 2})
+  results = queue.Queue()
+  received = []
+  sched = ScanScheduler(plc, result_queue=results)
+  sched.add_group("fast", ["M0", "M1"], period=0.05, callback=received.append)
+  sched.add_group("slow", [("D100", 2)], period=10)
+
+  sched.run_pending()
+  # D と M の2ブロック = 2フレーム
+  assert len(plc.fake.frames) == 2
+  assert received[0].values == {"M0": 0, "M1": 0}
+  assert results.get_nowait().values == {"D100": 1, "D101": 2}
+
+  # 次回は fast のみ
+  time.sleep(0.06)
+  sched.run_pending()
+  assert len(received) == 2 and results.empty()
+  assert sched.stats()["fast"]["scans"] == 2
+
+
+def test_overrun(plc):
+  """周期を超過した回が overrun として集計されること"""
+  sched = ScanScheduler(plc)
+  group = sched.add_group("fast", ["D0"], period=0.01)
+  sched.run_pending()
+  time.sleep(0.055)
+  result = sched.run_pending()[0]
+  assert result.jitter > 0.03
+  assert group.overruns >= 3
+  assert group.next_due > time.monotonic() - 0.01
+
+
+def test_thread(plc):
+  """別スレッドで周期実行できること"""
+  received = []
+  sched = ScanScheduler(plc)
+  sched.add_group("fast", ["D0"], period=0.01, callback=received.append)
+  sched.start()
+  time.sleep(0.1)
+  sched.stop()
+  assert len(received) >= 3
+
+
+def test_callback_error(plc):
+  """コールバックが例外を送出しても、集計してスケジュールを継続すること"""
+  received = []
+
+  def failing(result):
+    raise RuntimeError("callback failed")
+
+  sched = ScanScheduler(plc)
+  bad = sched.add_group("bad", ["D0"], period=0.01, callback=failing)
+  sched.add_group("good", ["D1"], period=0.01, callback=received.append)
+  sched.run_pending()
+  assert len(received) == 1
+  assert bad.callback_errors == 1
+  assert isinstance(bad.last_callback_error, RuntimeError)
+  assert len(sched._heap) == 2
+
+  sched.start()
+  time.sleep(0.1)
+  sched.stop()
+  assert bad.scans >= 3 and bad.callback_errors == bad.scans
+  assert len(received) >= 3
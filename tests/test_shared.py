@@ -0,0 +1,134 @@
+import threading
+
+import pytest
+
+from pymcprotocol_fxseries import MCProtocolError, PLCSimulator, SharedType1E
+
+
+@pytest.fixture
+def sim():
+  with PLCSimulator() as simulator:
+    yield simulator
+
+
+def _hold(plc):
+  """I/O スレッドを止めておき、要求をキューに溜める"""
+  event = threading.Event()
+  plc.submit(lambda _: event.wait(5))
+  return event
+
+
+def test_threads(sim):
+  """複数スレッドから同時に読み書きできること"""
+  sim.set_words("D0", list(range(100)))
+  errors = []
+
+  with SharedType1E(*sim.address) as plc:
+    def worker(n):
+      try:
+        for _ in range(20):
+          assert plc.batchread_wordunits(f"D{n * 10}", 10) == list(range(n * 10, n * 10 + 10))
+        plc.batchwrite_wordunits(f"D{200 + n}", [n])
+      except Exception as e:
+        errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for t in threads:
+      t.start()
+    for t in threads:
+      t.join()
+
+  assert not errors
+  assert sim.get_words("D200", 8) == list(range(8))
+
+
+def test_merge_reads(sim):
+  """キューに溜まった隣接・重複する読み込みが1フレームにまとめられること"""
+  sim.set_words("D0", list(range(100)))
+  sim.set_bits("M0", [1, 0, 0, 1, 1] * 4)
+
+  with SharedType1E(*sim.address) as plc:
+    event = _hold(plc)
+    words = [plc.submit_batchread_wordunits(f"D{n}", 10) for n in (20, 0, 10, 5)]
+    bits = [plc.submit_batchread_bitunits("M3", 5), plc.submit_batchread_bitunits("M0", 4, output="bytes")]
+    other = plc.submit_batchread_wordunits("R0", 1)
+    count = sim.request_count
+    event.set()
+
+    assert words[0].result() == list(range(20, 30))
+    assert words[1].result() == list(range(10))
+    assert words[3].result() == list(range(5, 15))
+    assert bits[0].result() == [1, 1, 1, 0, 0]
+    assert bits[1].result() == b"\x01\x00\x00\x01"
+    assert other.result() == [0]
+    assert sim.request_count - count == 3
+    assert plc.frames_saved == 4
+
+
+def test_write_order(sim):
+  """読み込みは前後の書き込みを越えて結合されないこと"""
+  with SharedType1E(*sim.address) as plc:
+    event = _hold(plc)
+    before = plc.submit_batchread_wordunits("D0", 2)
+    plc.submit_batchwrite_wordunits("D0", [7, 8])
+    after = plc.submit_batchread_wordunits("D1", 1)
+    event.set()
+    assert before.result() == [0, 0]
+    assert after.result() == [8]
+
+
+def test_errors(sim):
+  """要求ごとのエラーは該当する Future にのみ設定されること"""
+  with SharedType1E(*sim.address) as plc:
+    event = _hold(plc)
+    bad = plc.submit_batchread_wordunits("D8510", 10)
+    good = plc.submit_batchread_wordunits("D0", 1)
+    event.set()
+    with pytest.raises(MCProtocolError):
+      bad.result()
+    assert good.result() == [0]
+
+  with pytest.raises(ConnectionError):
+    plc.batchread_wordunits("D0", 1)
+
+
+def test_close_while_submitting(sim):
+  """close() と同時に要求しても、全ての Future が完了するかエラーになること"""
+  plc = SharedType1E(*sim.address)
+  plc.connect()
+  futures = []
+  errors = []
+
+  def worker():
+    for _ in range(200):
+      try:
+        futures.append(plc.submit_batchread_wordunits("D0", 1))
+      except ConnectionError as e:
+        errors.append(e)
+
+  threads = [threading.Thread(target=worker) for _ in range(4)]
+  for t in threads:
+    t.start()
+  plc.close()
+  for t in threads:
+    t.join()
+
+  for future in futures:
+    try:
+      assert future.result(timeout=5) == [0]
+    except ConnectionError:
+      pass
+  assert len(futures) + len(errors) == 800
+
+
+def test_timeout_then_read(sim):
+  """タイムアウト後に遅れて届いた応答を、次の要求の応答としないこと"""
+  sim.set_words("D0", [111])
+  sim.set_words("D10", [222])
+  sim.latency = 0.3
+  with SharedType1E(*sim.address, timeout=0.1) as plc:
+    with pytest.raises(TimeoutError):
+      plc.batchread_wordunits("D0", 1)
+    sim.latency = 0
+    assert plc.batchread_wordunits("D10", 1) == [222]
+    assert plc.batchread_wordunits("D10", 1) == [222]
@@ -0,0 +1,102 @@
+import asyncio
+import socket
+import time
+
+import pytest
+
+from pymcprotocol_fxseries import AsyncType1E, MCProtocolError, PLCSimulator, Type1E
+from pymcprotocol_fxseries.utility import recv_exact
+
+
+@pytest.fixture
+def sim():
+  with PLCSimulator() as simulator:
+    yield simulator
+
+
+def test_words_and_bits(sim):
+  """ワード/ビットの読み書きがメモリイメージに反映されること"""
+  sim.set_words("R100", [1, 2, 3])
+  with Type1E(*sim.address) as plc:
+    assert plc.batchread_wordunits("R100", 3) == [1, 2, 3]
+    plc.batchwrite_wordunits("D0", list(range(-100, 200)))
+    assert sim.get_words("D0", 2) == [65436, 65437]
+    assert plc.batchread_wordunits("D0", 300) == list(range(-100, 200))
+
+    plc.batchwrite_bitunits("Y0", [1, 0, 1])
+    assert sim.get_bits("Y0", 3) == [1, 0, 1]
+    sim.set_bits("S10", [1, 1])
+    assert plc.batchread_bitunits("S9", 4) == [0, 1, 1, 0]
+
+
+def test_bitdevice_wordunits(sim):
+  """ビットデバイスのワード単位アクセスは 1ワード = 16点となること"""
+  with Type1E(*sim.address) as plc:
+    plc.batchwrite_wordunits("M16", [0x8001])
+    assert sim.get_bits("M16", 16) == [1] + [0] * 14 + [1]
+    assert plc.batchread_wordunits("M0", 2, signed=False) == [0, 0x8001]
+
+
+def test_end_codes(sim):
+  """不正なデバイス・範囲外は終了コードで応答し、接続は継続すること"""
+  with Type1E(*sim.address) as plc:
+    with pytest.raises(MCProtocolError) as e:
+      plc.batchread_bitunits("D0", 1)
+    assert e.value.errorcode == "0x8056"
+    with pytest.raises(MCProtocolError) as e:
+      plc.batchread_wordunits("D8500", 20)
+    assert e.value.errorcode == "0x8158"
+    assert plc.batchread_wordunits("D8500", 12) == [0] * 12
+
+
+def test_latency():
+  """応答遅延が設定できること"""
+  with PLCSimulator(latency=0.05) as sim, Type1E(*sim.address) as plc:
+    start = time.perf_counter()
+    plc.batchread_wordunits("D0", 1)
+    assert time.perf_counter() - start >= 0.05
+
+
+def test_asyncio_server():
+  """asyncio で同一プロセス内に起動できること"""
+  sim = PLCSimulator()
+
+  async def main():
+    server = await sim.start_async()
+    async with AsyncType1E(*sim.address) as plc:
+      await plc.batchwrite_typed("D10", [1.25], "float32")
+      assert await plc.batchread_typed("D10", 1, "float32") == [1.25]
+    server.close()
+    await server.wait_closed()
+
+  asyncio.run(main())
+  assert sim.request_count == 2
+
+
+def test_recv_exact():
+  """分割して届いたデータをそろえて受信し、途中の切断は EOFError とすること"""
+  a, b = socket.socketpair()
+  with a, b:
+    a.sendall(b"\x01\x02")
+    assert recv_exact(b, 2) == b"\x01\x02"
+    a.sendall(b"\x03")
+    a.sendall(b"\x04\x05")
+    assert recv_exact(b, 3) == b"\x03\x04\x05"
+    a.sendall(b"\x06")
+    a.shutdown(socket.SHUT_WR)
+    with pytest.raises(EOFError):
+      recv_exact(b, 2)
+
+
+def test_disconnect_clients(sim):
+  """接続数の取得と、クライアントの切断ができること"""
+  with Type1E(*sim.address) as plc1, Type1E(*sim.address) as plc2:
+    plc1.batchread_wordunits("D0", 1)
+    plc2.batchread_wordunits("D0", 1)
+    assert sim.connection_count == 2
+    assert sim.disconnect_clients(1) == 1
+    deadline = time.monotonic() + 2
+    while sim.connection_count > 1 and time.monotonic() < deadline:
+      time.sleep(0.01)
+    assert sim.connection_count == 1
+    assert sim.disconnect_clients() == 1
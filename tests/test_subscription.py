@@ -0,0 +1,32 @@
+from pymcprotocol_fxseries import Subscription
+
+
+def test_changes_only(plc):
+  """初回は全点、以降は変化した点のみ通知されること"""
+  notified = []
+  sub = Subscription(plc, callback=notified.append)
+  sub.add_range("D0", 4)
+  sub.add("M10")
+
+  assert sub.poll() == {"D0": 0, "D1": 0, "D2": 0, "D3": 0, "M10": 0}
+  assert sub.poll() == {}
+  assert len(notified) == 1
+
+  plc.fake.words[2] = -5 & 0xFFFF
+  plc.fake.bits[10] = 1
+  assert sub.poll() == {"D2": -5, "M10": 1}
+  assert sub.values()["D2"] == -5
+
+
+def test_deadband(plc):
+  """不感帯以内の変化は通知されず、前回通知値からの累積で判定されること"""
+  sub = Subscription(plc)
+  sub.add("D0", deadband=5)
+  sub.add("D1", deadband_pct=10)
+  plc.fake.words.update({0: 100, 1: 100})
+  sub.poll()
+
+  plc.fake.words.update({0: 104, 1: 109})
+  assert sub.poll() == {}
+  plc.fake.words.update({0: 106, 1: 111})
+  assert sub.poll() == {"D0": 106, "D1": 111}
@@ -0,0 +1,86 @@
+import io
+
+import pytest
+
+from pymcprotocol_fxseries import PLCSimulator, TagDatabase, Type1E
+from pymcprotocol_fxseries.datatype import encode_words
+
+
+CSV = """\
+Label Setting
+Label Name,Data Type,Device,Comment,Scale,Offset
+Tank1.Level,Word[Signed],D100,level,0.1,
+Tank1.Total,DINT,D102,,,
+Tank1.Temp,REAL,D120,,,-273.15
+Pump1.Run,Bit,M10,,,
+Pump1.Alarm,BOOL,X11,,,
+
+Counter,,D130,,,
+"""
+
+
+def test_load_csv():
+  """GX Works 形式の CSV を読み込み、型名を変換できること"""
+  tags = TagDatabase.from_csv(io.StringIO(CSV))
+  assert len(tags) == 6
+  assert [tag.dtype for tag in tags] == ["int16", "int32", "float32", "bool", "bool", "int16"]
+  assert tags["Tank1.Level"].scale == 0.1
+  assert tags["Tank1.Temp"].offset == -273.15
+  assert tags["Tank1.Total"].width == 2
+
+
+@pytest.mark.parametrize("row", [
+  "A,INT,Q0",           # 未対応デバイス
+  "A,INT,D8511\nA,INT,D0",  # タグ名の重複
+  "A,DINT,D8511",       # 範囲外 (2ワード)
+  "A,BOOL,D0",          # ワードデバイスに bool
+  "A,INT,M0",           # ビットデバイスにワード型
+  "A,STRING,D0",        # 未対応の型
+])
+def test_validation(row):
+  """不正な行は行番号付きで ValueError になること"""
+  with pytest.raises(ValueError, match="line"):
+    TagDatabase.from_csv(io.StringIO("name,type,device\n" + row))
+
+  with pytest.raises(ValueError):
+    TagDatabase.from_csv(io.StringIO("foo,bar\n1,2\n"))
+
+
+def test_read():
+  """最小限のフレームで全タグを読み込み、スケーリングした値を返すこと"""
+  tags = TagDatabase.from_csv(io.StringIO(CSV), gap=16)
+  with PLCSimulator() as sim, Type1E(*sim.address) as plc:
+    sim.set_words("D100", [1234])
+    sim.set_words("D102", [-100000 & 0xFFFF, (-100000 >> 16) & 0xFFFF])
+    sim.set_words("D120", list(memoryview(encode_words([300.0], "float32")).cast("H")))
+    sim.set_words("D130", [-5])
+    sim.set_bits("M10", [1])
+    sim.set_bits("X11", [1])
+
+    count = sim.request_count
+    values = tags.read(plc)
+    # D100~D131, M10, X11 の3フレーム
+    assert sim.request_count == count + 3
+
+  assert values["Tank1.Level"] == pytest.approx(123.4)
+  assert values["Tank1.Total"] == -100000
+  assert values["Tank1.Temp"] == pytest.approx(26.85)
+  assert values["Counter"] == -5
+  assert values["Pump1.Run"] is True
+  assert values["Pump1.Alarm"] is True
+
+
+def test_overlapping_tags():
+  """同じ先頭デバイスのタグは、最も幅の広い型でブロックを分割すること"""
+  tags = TagDatabase(gap=16, wordread_points=6)
+  tags.add("Head", "D97")
+  tags.add("Value", "D100", "float64")
+  tags.add("Value.Low", "D100", "int32")
+  with PLCSimulator() as sim, Type1E(*sim.address) as plc:
+    sim.set_words("D97", [7])
+    sim.set_words("D100", list(memoryview(encode_words([1.5], "float64")).cast("H")))
+    values = tags.read(plc)
+
+  assert values["Head"] == 7
+  assert values["Value"] == 1.5
+  assert values["Value.Low"] == 0
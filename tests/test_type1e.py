@@ -0,0 +1,94 @@
+import pytest
+
+from pymcprotocol_fxseries import MCProtocolError
+
+
+def test_wordunits_chunked(plc):
+  """上限を超えるワード読み書きが最小フレーム数に分割されること"""
+  values = [(i * 7) % 65536 - 32768 for i in range(300)]
+  plc.batchwrite_wordunits("D100", values)
+  assert plc.batchread_wordunits("D100", 300) == values
+
+  # 300ワード / 64ワード = 5フレーム (書き込み5 + 読み込み5)
+  assert [f[2] for f in plc.fake.frames] == [64, 64, 64, 64, 44] * 2
+  assert [f[1] for f in plc.fake.frames[:5]] == [100, 164, 228, 292, 356]
+
+
+def test_bitunits_chunked(plc):
+  """上限を超えるビット読み書きが分割され、1つの結果に再構成されること"""
+  values = [(i // 3) % 2 for i in range(401)]
+  plc.batchwrite_bitunits("M0", values)
+  assert plc.batchread_bitunits("M0", 401) == values
+  assert [f[2] for f in plc.fake.frames] == [160, 160, 81, 256, 145]
+
+
+def test_set_chunksize(plc):
+  """分割サイズを変更できること"""
+  plc.set_chunksize(wordread=256)
+  plc.batchread_wordunits("D0", 512)
+  assert [f[2] for f in plc.fake.frames] == [256, 256]
+
+  with pytest.raises(ValueError):
+    plc.set_chunksize(bitread=255)
+  with pytest.raises(ValueError):
+    plc.set_chunksize(wordwrite=257)
+
+
+def test_split_response(plc):
+  """TCPで分割された応答も1フレーム分そろえて受信できること"""
+  plc.fake.words.update({i: i for i in range(10)})
+  plc.fake.split = True
+  assert plc.batchread_wordunits("D0", 10) == list(range(10))
+  assert plc.batchread_bitunits("M0", 3) == [0, 0, 0]
+
+
+def test_abnormal_response(plc):
+  """異常応答の後も送受信がずれないこと"""
+  plc.fake.abnormal = 0x56
+  with pytest.raises(MCProtocolError):
+    plc.batchread_wordunits("D0", 10)
+  plc.fake.abnormal = None
+  plc.fake.words[0] = 5
+  assert plc.batchread_wordunits("D0", 1) == [5]
+
+
+def test_word_output_modes(plc):
+  """array / memoryview / numpy 形式で読み書きできること"""
+  from array import array
+
+  plc.batchwrite_wordunits("D0", array("h", [-1, 2, 3]))
+  assert plc.batchread_wordunits("D0", 3, output="array") == array("h", [-1, 2, 3])
+  assert plc.batchread_wordunits("D0", 3, output="array", signed=False) == array("H", [65535, 2, 3])
+  assert plc.batchread_wordunits("D0", 3, output="memoryview").tolist() == [-1, 2, 3]
+
+  plc.batchwrite_wordunits("D0", b"\x05\x00\x06\x00")
+  assert plc.batchread_wordunits("D0", 2) == [5, 6]
+  plc.batchwrite_wordunits("D0", [-1, 65534])
+  assert plc.batchread_wordunits("D0", 2, signed=False) == [65535, 65534]
+
+  with pytest.raises(ValueError):
+    plc.batchwrite_wordunits("D0", array("i", [1]))
+  with pytest.raises(ValueError):
+    plc.batchread_wordunits("D0", 1, output="tuple")
+
+
+def test_word_output_numpy(plc):
+  """numpy.ndarray で読み書きできること"""
+  numpy = pytest.importorskip("numpy")
+  plc.batchwrite_wordunits("D0", numpy.array([1, -2, 3], dtype=numpy.int16))
+  values = plc.batchread_wordunits("D0", 3, output="numpy")
+  assert values.dtype == numpy.int16 and values.tolist() == [1, -2, 3]
+
+
+def test_bit_output_modes(plc):
+  """bytes / int / array 形式で読み書きできること"""
+  from array import array
+
+  plc.batchwrite_bitunits("M0", b"\x01\x00\x01\x01\x00")
+  assert plc.batchread_bitunits("M0", 5) == [1, 0, 1, 1, 0]
+  assert plc.batchread_bitunits("M0", 5, output="bytes") == b"\x01\x00\x01\x01\x00"
+  assert plc.batchread_bitunits("M0", 5, output="int") == 0b01101
+  assert plc.batchread_bitunits("M0", 5, output="array") == array("B", [1, 0, 1, 1, 0])
+
+  plc.batchwrite_bitunits("M0", [True, False, 0x11])
+  assert plc.batchread_bitunits("M0", 3) == [1, 0, 1]
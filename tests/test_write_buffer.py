@@ -0,0 +1,83 @@
+import pytest
+
+from pymcprotocol_fxseries import MCProtocolError, PLCSimulator, Type1E, WriteBuffer
+
+
+def test_coalesce():
+  """隣接・重複する書き込みがブロックにまとまり、後の書き込みが優先されること"""
+  with PLCSimulator() as sim, Type1E(*sim.address) as plc:
+    writes = WriteBuffer(plc, window=None)
+    futures = [
+      writes.batchwrite_wordunits("D10", [1]),
+      writes.batchwrite_wordunits("D11", [2]),
+      writes.batchwrite_wordunits("D12", [3, 4]),
+      writes.batchwrite_wordunits("D11", [-1]),
+      writes.batchwrite_wordunits("D20", [5]),
+      writes.batchwrite_bitunits("M0", [1]),
+      writes.batchwrite_bitunits("M1", [0, 1]),
+    ]
+    assert sim.request_count == 0
+    writes.flush()
+    # D10~D13, D20, M0~M2
+    assert sim.request_count == 3
+    assert all(f.done() and f.result() is None for f in futures)
+    assert sim.get_words("D10", 4) == [1, 0xFFFF, 3, 4]
+    assert sim.get_words("D20", 1) == [5]
+    assert sim.get_bits("M0", 3) == [1, 0, 1]
+    assert writes.stats() == {"writes": 7, "blocks": 3, "flushes": 1, "pending": 0}
+
+
+def test_errors_and_ordering():
+  """エラーは該当ブロックの書き込みにのみ返り、ビット/ワードの重なりは順序が保たれること"""
+  with PLCSimulator() as sim, Type1E(*sim.address) as plc:
+    writes = WriteBuffer(plc, window=None)
+    ok = writes.batchwrite_wordunits("D0", [1])
+    bad = writes.batchwrite_wordunits("D8511", [1, 2])
+    writes.flush()
+    assert ok.result() is None
+    with pytest.raises(MCProtocolError):
+      bad.result()
+
+    writes.batchwrite_bitunits("M5", [1])
+    # 重なるワード単位の書き込みの前に、ビット単位の書き込みを送信
+    writes.batchwrite_wordunits("M0", [0x0001])
+    assert sim.get_bits("M5", 1) == [1]
+    writes.flush()
+    assert sim.get_bits("M0", 6) == [1, 0, 0, 0, 0, 0]
+
+
+def test_deadline():
+  """window 秒後に自動で送信されること"""
+  with PLCSimulator() as sim, Type1E(*sim.address) as plc:
+    with WriteBuffer(plc, window=0.02) as writes:
+      future = writes.batchwrite_wordunits("D0", [7])
+      writes.batchwrite_wordunits("D1", [8])
+      future.result(timeout=2)
+      assert sim.get_words("D0", 2) == [7, 8]
+      assert sim.request_count == 1
+      last = writes.batchwrite_wordunits("D2", [9])
+    # close() で残りを送信
+    assert last.done()
+    assert sim.get_words("D2", 1) == [9]
+    with pytest.raises(ConnectionError):
+      writes.batchwrite_wordunits("D0", [1])
+
+
+def test_cancel():
+  """取り消した書き込みは送信せず、送信中の書き込みは取り消せないこと"""
+  with PLCSimulator() as sim, Type1E(*sim.address) as plc:
+    writes = WriteBuffer(plc, window=None)
+    kept = writes.batchwrite_wordunits("D0", [1, 2])
+    cancelled = writes.batchwrite_wordunits("D1", [9])
+    assert cancelled.cancel()
+
+    write = plc.batchwrite_wordunits
+    def cancel_during_write(headdevice, values):
+      # 送信中の書き込みは取り消せない
+      assert not kept.cancel()
+      write(headdevice, values)
+    plc.batchwrite_wordunits = cancel_during_write
+
+    writes.flush()
+    assert kept.result() is None
+    assert sim.get_words("D0", 2) == [1, 2]